@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import logging
+
+from aiohttp import web
+
+from homeassistant.core import HomeAssistant
+from homeassistant.components.http import HomeAssistantView
+
+from ..processing.snapshot_store import SNAPSHOT_URL_BASE, valid_snapshot_name
+from .gallery_http_impl import _resolve_entry_and_processor
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AFRSnapshotView(HomeAssistantView):
+    """Annotated scan snapshot, rendered on first request (lazy_render) and cached."""
+
+    url = SNAPSHOT_URL_BASE + r"/{filename}"
+    name = "api:amazon_face_recognition:snapshot"
+    requires_auth = True
+
+    async def get(self, request: web.Request, filename: str) -> web.StreamResponse:
+        hass: HomeAssistant = request.app["hass"]
+        if not valid_snapshot_name(filename):
+            raise web.HTTPNotFound(text="invalid snapshot name")
+
+        entry_id = (request.query.get("entry_id") or "").strip() or None
+        _client, proc = _resolve_entry_and_processor(hass, entry_id)
+        if proc is None:
+            raise web.HTTPServiceUnavailable(text="processor not ready")
+
+        try:
+            path = await hass.async_add_executor_job(proc.render_snapshot, filename)
+        except Exception as e:
+            _LOGGER.error("snapshot view: render failed for %s: %s", filename, e)
+            raise web.HTTPInternalServerError(text="render failed")
+
+        if path is None:
+            raise web.HTTPNotFound(text="snapshot not found")
+
+        # latest is overwritten by every scan; timestamped snapshots only change with the render settings
+        cache = "no-cache" if filename == "recognition_latest.jpg" else "private, max-age=300"
+        return web.FileResponse(path=str(path), headers={"Cache-Control": cache})
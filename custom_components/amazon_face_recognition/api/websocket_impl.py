@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+from datetime import timedelta
 from typing import Any, Dict
 
 import voluptuous as vol
 
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.components import websocket_api
+from homeassistant.components.http.auth import async_sign_path
 from homeassistant.util import dt as dt_util
 from homeassistant.config_entries import ConfigEntry
 
@@ -20,6 +22,7 @@ from ..const import (
     WS_GET_FACES_INDEX,
     WS_SUBSCRIBE_FACES,
     EVENT_GALLERY_UPDATED,
+    EVENT_SNAPSHOT_SAVED,
     WS_GET_GALLERY,
     WS_SUBSCRIBE_GALLERY,
     WS_SYNC_FACE_GALLERY,
@@ -36,10 +39,34 @@ from ..const import (
 )
 
 from ..core.runtime import get_locks
+from ..processing.snapshot_store import SNAPSHOT_URL_BASE
 
 DEFAULT_INDEX: Dict[str, Any] = {"updated_at": None, "items": []}
 DEFAULT_FACES_INDEX: Dict[str, Any] = {"updated_at": None, "persons": {}}
 
+# lazy_render snapshot URLs point to an authenticated view: <img src> needs a signed path
+SNAPSHOT_SIGN_EXPIRATION = timedelta(hours=24)
+
+
+@callback
+def _sign_snapshot_urls(hass: HomeAssistant, connection, item: dict) -> dict:
+    """Copy of `item` with snapshot view URLs signed for this connection's user."""
+    if not isinstance(item, dict):
+        return item
+    out = item
+    for key in ("image_url", "latest_url"):
+        url = item.get(key)
+        if isinstance(url, str) and url.startswith(SNAPSHOT_URL_BASE + "/"):
+            if out is item:
+                out = dict(item)
+            try:
+                out[key] = async_sign_path(
+                    hass, url, SNAPSHOT_SIGN_EXPIRATION, refresh_token_id=connection.refresh_token_id
+                )
+            except Exception:
+                out[key] = url
+    return out
+
 def _is_scan_cars_enabled(hass: HomeAssistant) -> bool:
     """Return scan_cars flag.
 
@@ -106,7 +133,7 @@ async def ws_get_last_result(hass, connection, msg) -> None:
     opts = d.get("options") or {}
     last["scan_cars_enabled"] = bool(opts.get(CONF_SCAN_CARS, False))
 
-    connection.send_result(msg["id"], last)
+    connection.send_result(msg["id"], _sign_snapshot_urls(hass, connection, last))
 
 
 @websocket_api.websocket_command(
@@ -122,7 +149,7 @@ async def ws_get_index(hass, connection, msg) -> None:
     index = d.get("index") or DEFAULT_INDEX
 
     limit = max(1, min(int(msg.get("limit", 20)), 500))
-    items = (index.get("items") or [])[:limit]
+    items = [_sign_snapshot_urls(hass, connection, it) for it in (index.get("items") or [])[:limit]]
 
     connection.send_result(
         msg["id"],
@@ -146,7 +173,16 @@ def _subscribe_event(hass: HomeAssistant, connection, msg_id: int, event_type: s
 )
 @websocket_api.async_response
 async def ws_subscribe_updates(hass, connection, msg) -> None:
-    unsub = _subscribe_event(hass, connection, msg["id"], EVENT_UPDATED)
+    msg_id = msg["id"]
+
+    @callback
+    def _forward(event) -> None:
+        data = event.data
+        if isinstance(data.get("last_result"), dict):
+            data = {**data, "last_result": _sign_snapshot_urls(hass, connection, data["last_result"])}
+        connection.send_message(websocket_api.event_message(msg_id, data))
+
+    unsub = hass.bus.async_listen(EVENT_UPDATED, _forward)
     connection.subscriptions[msg["id"]] = unsub
     connection.send_result(msg["id"], {"subscribed": True})
 
@@ -211,6 +247,25 @@ def publish_update(
     if payload:
         hass.bus.async_fire(EVENT_UPDATED, payload)
 
+@callback
+def publish_snapshot_saved(hass: HomeAssistant, last_result: dict, index_data: dict | None) -> None:
+    """Write-behind follow-up: files are on disk.
+
+    last_result is refreshed only if it is still the current one (a newer scan
+    may already have been published); EVENT_UPDATED carries the new index.
+    """
+    d = _data(hass)
+    cur = d.get("last_result") or {}
+    same_scan = (
+        cur.get("timestamp") == last_result.get("timestamp")
+        and cur.get("camera_entity") == last_result.get("camera_entity")
+    )
+    publish_update(hass, last_result=last_result if same_scan else None, index_data=index_data)
+    hass.bus.async_fire(
+        EVENT_SNAPSHOT_SAVED,
+        {k: last_result.get(k) for k in ("camera_entity", "id", "file", "image_url", "latest_url", "timestamp")},
+    )
+
 @callback
 def publish_gallery_update(hass: HomeAssistant, gallery: dict) -> None:
     hass.data[DOMAIN]["gallery"] = gallery
@@ -413,12 +468,48 @@ def publish_roi_update(hass: HomeAssistant, payload: dict) -> None:
     hass.bus.async_fire(EVENT_ROI_UPDATED, payload)
 
 
+@callback
+def apply_roi_proposal(hass: HomeAssistant, camera_entity: str, roi: dict) -> bool:
+    """Store a learned ROI for a camera that has none configured (roi_auto_apply).
+
+    Never overwrites ROIs drawn by the user. Returns True when the entry was updated.
+    """
+    entry = _get_first_entry(hass)
+    if entry is None:
+        return False
+
+    new_opts = dict(entry.options or {})
+    by_camera = new_opts.get("roi_by_camera")
+    by_camera = dict(by_camera) if isinstance(by_camera, dict) else {}
+    if by_camera.get(camera_entity):
+        return False
+
+    by_camera[camera_entity] = [
+        {
+            "id": str(roi.get("id") or "auto"),
+            "name": str(roi.get("name") or ""),
+            "x": float(roi["x"]),
+            "y": float(roi["y"]),
+            "w": float(roi["w"]),
+            "h": float(roi["h"]),
+        }
+    ]
+    new_opts["roi_by_camera"] = by_camera
+    hass.config_entries.async_update_entry(entry, options=new_opts)
+
+    payload = {"updated_at": dt_util.utcnow().replace(microsecond=0).isoformat() + "Z", "by_camera": by_camera}
+    publish_roi_update(hass, payload)
+    return True
+
+
 @websocket_api.websocket_command({vol.Required("type"): WS_GET_ROI})
 @websocket_api.async_response
 async def ws_get_roi(hass, connection, msg) -> None:
     entry = _get_first_entry(hass)
     # We do NOT update entry.options here; only read.
     payload = _roi_payload_from_entry(entry)
+    # auto-learned proposals (detection heatmaps); accepted by the editor via set_roi
+    payload["proposals"] = dict(_data(hass).get("roi_proposals") or {})
     connection.send_result(msg["id"], payload)
 
 
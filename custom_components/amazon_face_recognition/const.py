@@ -33,6 +33,10 @@ AFR_SCAN_DIRNAME = "amazon_face_recognition_scan"
 # Folder under /config used to store training cache (images uploaded for indexing).
 TRAINING_ROOT_DIRNAME = "amazon_face_gallery"
 
+# Folder under /config (NOT exposed under /local) used by lazy rendering:
+# raw frames + detection sidecars (raw/) and rendered snapshots (render/).
+AFR_SNAPSHOT_DIRNAME = "amazon_face_recognition_snapshots"
+
 # Optional Cloud Gallery (S3)
 CONF_CLOUD_GALLERY_ENABLED = "cloud_gallery_enabled"
 CONF_CLOUD_GALLERY_PREFIX = "cloud_gallery_prefix"
@@ -75,6 +79,107 @@ CONF_SCAN_CARS = "scan_cars"
 CONF_VEHICLE_AREA_ABS_MIN = "vehicle_area_abs_min"
 CONF_MAX_VEHICLES_TO_SCAN = "max_vehicles_to_scan"
 
+# --- Scan pipeline tuning ---
+# Max number of search_faces_by_image calls running in parallel for one frame.
+CONF_FACE_SEARCH_CONCURRENCY = "face_search_concurrency"
+
+# Plate reading strategy:
+# - "per_vehicle": one detect_text per vehicle crop (+ refine call on the plate)
+# - "regions": one detect_text on the ROI frame with every vehicle plate area passed
+#   as RegionsOfInterest; tiny plates fall back to the per-vehicle crop.
+CONF_PLATE_READ_MODE = "plate_read_mode"
+PLATE_READ_MODE_PER_VEHICLE = "per_vehicle"
+PLATE_READ_MODE_REGIONS = "regions"
+# In "regions" mode, plate areas narrower than this (work-image pixels) use the per-vehicle crop.
+CONF_PLATE_REGION_MIN_PX = "plate_region_min_px"
+
+# Frame gate: skip AWS calls when the ROI did not change since the last analysed frame.
+# Threshold is the mean luma difference in percent (0 disables the gate).
+CONF_FRAME_GATE_THRESHOLD = "frame_gate_threshold"
+# Max age (seconds) of the previous result that can be reused.
+CONF_FRAME_GATE_MAX_AGE = "frame_gate_max_age"
+
+# Face identity cache (skip search_faces_by_image for a face matched moments ago).
+# TTL in seconds (0 disables the cache, the default: opt-in), size = max cached faces.
+CONF_FACE_CACHE_TTL = "face_cache_ttl"
+CONF_FACE_CACHE_SIZE = "face_cache_size"
+
+# Object tracking across scans (per camera). A tracked person / vehicle whose face
+# or plate was read with confidence >= this value reuses it instead of calling AWS
+# again (0 = always re-read; tracks are still assigned). Max age in seconds.
+CONF_TRACK_REUSE_MIN_CONFIDENCE = "track_reuse_min_confidence"
+CONF_TRACK_MAX_AGE = "track_max_age"
+
+# Plate read cache (vehicle crop signature -> plate). TTL in seconds (0 disables the
+# cache, the default: opt-in), size = max cached vehicles.
+CONF_PLATE_CACHE_TTL = "plate_cache_ttl"
+CONF_PLATE_CACHE_SIZE = "plate_cache_size"
+
+# How multiple ROIs of a camera are sent to Rekognition:
+# - union: one crop = bounding rectangle of all ROIs
+# - mosaic: ROI rectangles packed into one compact image (per-tile box mapping)
+# - mask: union crop with everything outside the ROI rectangles blanked; detections
+#   whose centroid falls in a blanked area are rejected
+CONF_ROI_MODE = "roi_mode"
+ROI_MODE_UNION = "union"
+ROI_MODE_MOSAIC = "mosaic"
+ROI_MODE_MASK = "mask"
+
+# Byte budget of the JPEG payloads sent to Rekognition, per API
+# (labels: detect_labels/detect_faces image, faces: face search crops, text: detect_text).
+# Quality is lowered first, then resolution (never below a per-API minimum detail).
+CONF_PAYLOAD_BUDGETS = "payload_budgets"
+
+# Adaptive per-camera analysis scale (learned from observed face / person sizes):
+# smallest scale that keeps faces >= min_face_px. scale_by_camera = {camera: scale}
+# pins a camera to a fixed scale (overrides both `scale` and the adaptive one).
+CONF_ADAPTIVE_SCALE = "adaptive_scale"
+CONF_MIN_FACE_PX = "min_face_px"
+CONF_SCALE_BY_CAMERA = "scale_by_camera"
+
+# Auto-learned ROI: per-camera heatmap of detected persons / faces / vehicles.
+# A proposal (rectangle keeping roi_learn_coverage of past detections) is shown in
+# the ROI editor; roi_auto_apply writes it to roi_by_camera for cameras without ROIs.
+# Opt-in (extra work on every scan); the heatmap is kept in /config/.storage.
+CONF_ROI_LEARNING = "roi_learning"
+CONF_ROI_LEARN_COVERAGE = "roi_learn_coverage"
+CONF_ROI_AUTO_APPLY = "roi_auto_apply"
+
+# detect_labels parameters derived from the targets (MinConfidence, exclusion filters).
+# targets_only: request / keep only targets_confidence labels + person (+ vehicles
+# when scan_cars) via LabelInclusionFilters and MaxLabels.
+CONF_LABEL_PUSHDOWN = "label_pushdown"
+CONF_TARGETS_ONLY = "targets_only"
+
+# Cost-aware call planner: single person -> direct face search (no detect_faces),
+# persons too small for a usable face -> no face call (the person still alerts).
+# face_only (without scan_cars) also skips detect_labels: detect_faces runs on the work
+# image directly and alerts come from unrecognized faces only (a person whose face is
+# not visible does not alert, person boxes / red boxes are not drawn). Opt-in.
+CONF_CALL_PLANNER = "call_planner"
+CONF_FACE_ONLY = "face_only"
+
+# Face gate before search_faces_by_image (detect_faces Quality / Pose / Confidence).
+# Rejected faces are marked "unsearchable" (no search, no unknown-face alert).
+# min_px: smaller face side in full-frame pixels; yaw/pitch: max absolute degrees.
+CONF_FACE_GATE_MIN_PX = "face_gate_min_px"
+CONF_FACE_GATE_MIN_SHARPNESS = "face_gate_min_sharpness"
+CONF_FACE_GATE_MAX_YAW = "face_gate_max_yaw"
+CONF_FACE_GATE_MAX_PITCH = "face_gate_max_pitch"
+CONF_FACE_GATE_MIN_CONFIDENCE = "face_gate_min_confidence"
+
+# Lazy snapshot rendering: scans store the raw camera frame + a detection sidecar
+# under /config/<AFR_SNAPSHOT_DIRNAME>; annotated images are rendered on first
+# request (/api/amazon_face_recognition/snapshot/<file>) and kept in a bounded
+# disk cache (render_cache_size files).
+CONF_LAZY_RENDER = "lazy_render"
+CONF_RENDER_CACHE_SIZE = "render_cache_size"
+
+# Write-behind: publish the scan result as soon as recognition completes; snapshot
+# encode, index update, retention and S3 upload run afterwards on an ordered
+# background writer, which fires EVENT_SNAPSHOT_SAVED with the final file URL.
+CONF_WRITE_BEHIND = "write_behind"
+
 
 
 
@@ -111,10 +216,44 @@ DEFAULT_EXCLUDED_OBJECT_LABELS: list[str] = []
 DEFAULT_VEHICLE_AREA_ABS_MIN = 0.01     # 1% dell'immagine
 DEFAULT_MAX_VEHICLES_TO_SCAN = 6
 
+# --- Scan pipeline tuning ---
+DEFAULT_FACE_SEARCH_CONCURRENCY = 4
+DEFAULT_PLATE_READ_MODE = PLATE_READ_MODE_PER_VEHICLE
+DEFAULT_PLATE_REGION_MIN_PX = 320
+DEFAULT_FRAME_GATE_THRESHOLD = 0.0
+DEFAULT_FRAME_GATE_MAX_AGE = 300
+DEFAULT_FACE_CACHE_TTL = 0
+DEFAULT_FACE_CACHE_SIZE = 256
+DEFAULT_TRACK_REUSE_MIN_CONFIDENCE = 0.0
+DEFAULT_TRACK_MAX_AGE = 120
+DEFAULT_PLATE_CACHE_TTL = 0
+DEFAULT_PLATE_CACHE_SIZE = 64
+DEFAULT_ROI_MODE = ROI_MODE_UNION
+DEFAULT_PAYLOAD_BUDGETS = {"labels": 1_000_000, "faces": 200_000, "text": 600_000}
+DEFAULT_ADAPTIVE_SCALE = False
+DEFAULT_MIN_FACE_PX = 48
+DEFAULT_ROI_LEARNING = False
+DEFAULT_ROI_LEARN_COVERAGE = 0.99
+DEFAULT_ROI_AUTO_APPLY = False
+DEFAULT_LABEL_PUSHDOWN = True
+DEFAULT_TARGETS_ONLY = False
+DEFAULT_CALL_PLANNER = False
+DEFAULT_FACE_ONLY = False
+DEFAULT_FACE_GATE_MIN_PX = 24
+DEFAULT_FACE_GATE_MIN_SHARPNESS = 0.0
+DEFAULT_FACE_GATE_MAX_YAW = 90.0
+DEFAULT_FACE_GATE_MAX_PITCH = 90.0
+DEFAULT_FACE_GATE_MIN_CONFIDENCE = 0.0
+DEFAULT_LAZY_RENDER = False
+DEFAULT_RENDER_CACHE_SIZE = 50
+DEFAULT_WRITE_BEHIND = True
+
 # Extra events (image_processing platform)
 EVENT_OBJECT_DETECTED = f"{DOMAIN}.object_detected"
 EVENT_FACE_DETECTED = f"{DOMAIN}.face_detected"
 EVENT_GALLERY_UPDATED = f"{DOMAIN}.gallery_updated"
+# write-behind: snapshot + index written (payload: camera_entity, id, file, image_url, latest_url, timestamp)
+EVENT_SNAPSHOT_SAVED = f"{DOMAIN}.snapshot_saved"
 
 # Saved file attribute key used in events
 SAVED_FILE = "saved_file"
@@ -9,6 +9,7 @@ use core.runtime.get_domain_data() instead.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from pathlib import Path
 from typing import Optional, Tuple
@@ -43,13 +44,16 @@ from ..const import (
 
 from ..core.runtime import get_domain_data
 from ..core.options import get_entry_options, merge_defaults
+from ..core.scan_queue import AFRScanQueue
 from ..processing.processor_impl import AFRProcessor
+from ..processing.burst import MAX_BURST, pick_best_frame, roi_union
 from ..api.websocket_impl import async_register_websockets
 from ..api.gallery_http_impl import (
     AFRGalleryUploadView,
     AFRGalleryImageView,
     AFRGalleryManageView,
 )
+from ..api.snapshot_http_impl import AFRSnapshotView
 from ..stores.gallery_store_impl import AFRGalleryStore
 from ..stores.plates_store_impl import AFRPlatesStore
 from ..sync.face_gallery_s3_impl import async_face_gallery_sync_from_s3
@@ -101,6 +105,7 @@ def _register_views_once(hass: HomeAssistant) -> None:
     hass.http.register_view(AFRGalleryUploadView)
     hass.http.register_view(AFRGalleryImageView)
     hass.http.register_view(AFRGalleryManageView)
+    hass.http.register_view(AFRSnapshotView)
 
     data["_views_registered"] = True
 
@@ -244,6 +249,14 @@ def _resolve_entry_and_processor(
     return entry, processors.get(first_entry_id)
 
 
+def _get_scan_queue(hass: HomeAssistant) -> AFRScanQueue:
+    data = get_domain_data(hass)
+    queue = data.get("scan_queue")
+    if not isinstance(queue, AFRScanQueue):
+        queue = data["scan_queue"] = AFRScanQueue(hass)
+    return queue
+
+
 def _register_services_once(hass: HomeAssistant) -> None:
     data = get_domain_data(hass)
     if data.get("_services_registered"):
@@ -267,13 +280,51 @@ def _register_services_once(hass: HomeAssistant) -> None:
             return
 
         entity_id = call.data["entity_id"]
-        img = await async_get_image(hass, entity_id)
-        if img is None:
-            _LOGGER.error("%s: scan: unable to get image from %s", DOMAIN, entity_id)
-            return
+        burst = int(call.data.get("burst", 1))
+        burst_interval = float(call.data.get("burst_interval", 0.2))
+
+        async def _fetch_one(delay: float) -> bytes | None:
+            if delay > 0:
+                await asyncio.sleep(delay)
+            img = await async_get_image(hass, entity_id)
+            return img.content if img is not None else None
+
+        # The snapshot is fetched by the scan queue only when this request actually runs
+        # (latest-wins per camera: bursts of calls collapse onto the newest frame).
+        async def _fetch() -> bytes | None:
+            if burst <= 1:
+                image = await _fetch_one(0.0)
+            else:
+                image = await _fetch_burst()
+            if image is None:
+                _LOGGER.error("%s: scan: unable to get image from %s", DOMAIN, entity_id)
+            return image
+
+        # Burst mode: K snapshots fetched concurrently (staggered by burst_interval),
+        # only the sharpest / best exposed one (scored over the camera ROI) is processed.
+        async def _fetch_burst() -> bytes | None:
+            results = await asyncio.gather(
+                *(_fetch_one(i * burst_interval) for i in range(burst)), return_exceptions=True
+            )
+            frames = [r if isinstance(r, (bytes, bytearray)) else None for r in results]
+            roi_by_camera = _get_options(entry2).get("roi_by_camera")
+            roi = roi_union(roi_by_camera.get(entity_id) or []) if isinstance(roi_by_camera, dict) else None
+            best, scores = await hass.async_add_executor_job(pick_best_frame, frames, roi)
+            _LOGGER.debug(
+                "%s: scan: burst %s x%d -> frame %s (scores %s)",
+                DOMAIN,
+                entity_id,
+                burst,
+                best,
+                [round(s, 1) for s in scores],
+            )
+            return frames[best] if best is not None else None
 
-        processor2.update_options(_get_options(entry2))
-        await processor2.async_process_camera_image(entity_id, img.content)
+        async def _process(camera_entity: str, image: bytes) -> None:
+            processor2.update_options(_get_options(entry2))
+            await processor2.async_process_camera_image(camera_entity, image)
+
+        await _get_scan_queue(hass).async_submit(entity_id, _fetch, _process)
         await _persist_usage_if_possible()
 
     async def _svc_refresh_faces_index(call: ServiceCall) -> None:
@@ -389,6 +440,8 @@ def _register_services_once(hass: HomeAssistant) -> None:
             {
                 vol.Required("entity_id"): cv.entity_id,
                 vol.Optional("entry_id"): cv.string,
+                vol.Optional("burst", default=1): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_BURST)),
+                vol.Optional("burst_interval", default=0.2): vol.All(vol.Coerce(float), vol.Range(min=0.0, max=2.0)),
             }
         ),
     )
@@ -660,7 +713,16 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     if unload_ok:
         data = get_domain_data(hass)
-        data.get("processors", {}).pop(entry.entry_id, None)
+        proc = data.get("processors", {}).pop(entry.entry_id, None)
+        if proc is not None:
+            try:
+                await hass.async_add_executor_job(proc.flush_roi_heatmap)
+            except Exception as e:
+                _LOGGER.debug("%s: roi heatmap flush failed: %s", DOMAIN, e)
+            try:
+                await hass.async_add_executor_job(proc.flush_writes)
+            except Exception as e:
+                _LOGGER.debug("%s: snapshot write-behind flush failed: %s", DOMAIN, e)
         data.get("clients", {}).pop(entry.entry_id, None)
         data.get("s3", {}).pop(entry.entry_id, None)
 
@@ -31,6 +31,36 @@ from ..const import (
     CONF_SCAN_CARS,
     CONF_VEHICLE_AREA_ABS_MIN,
     CONF_MAX_VEHICLES_TO_SCAN,
+    CONF_FACE_SEARCH_CONCURRENCY,
+    CONF_PLATE_READ_MODE,
+    CONF_PLATE_REGION_MIN_PX,
+    CONF_FRAME_GATE_THRESHOLD,
+    CONF_FRAME_GATE_MAX_AGE,
+    CONF_FACE_CACHE_TTL,
+    CONF_FACE_CACHE_SIZE,
+    CONF_TRACK_REUSE_MIN_CONFIDENCE,
+    CONF_TRACK_MAX_AGE,
+    CONF_PLATE_CACHE_TTL,
+    CONF_PLATE_CACHE_SIZE,
+    CONF_ROI_MODE,
+    CONF_PAYLOAD_BUDGETS,
+    CONF_ADAPTIVE_SCALE,
+    CONF_MIN_FACE_PX,
+    CONF_ROI_LEARNING,
+    CONF_ROI_LEARN_COVERAGE,
+    CONF_ROI_AUTO_APPLY,
+    CONF_LABEL_PUSHDOWN,
+    CONF_TARGETS_ONLY,
+    CONF_CALL_PLANNER,
+    CONF_FACE_ONLY,
+    CONF_FACE_GATE_MIN_PX,
+    CONF_FACE_GATE_MIN_SHARPNESS,
+    CONF_FACE_GATE_MAX_YAW,
+    CONF_FACE_GATE_MAX_PITCH,
+    CONF_FACE_GATE_MIN_CONFIDENCE,
+    CONF_LAZY_RENDER,
+    CONF_RENDER_CACHE_SIZE,
+    CONF_WRITE_BEHIND,
     CONF_CLOUD_GALLERY_ENABLED,
     CONF_CLOUD_GALLERY_PREFIX,
     CONF_CLOUD_GALLERY_SYNC_ON_STARTUP,
@@ -52,6 +82,36 @@ from ..const import (
     DEFAULT_LABEL_FONT_LEVEL,
     DEFAULT_VEHICLE_AREA_ABS_MIN,
     DEFAULT_MAX_VEHICLES_TO_SCAN,
+    DEFAULT_FACE_SEARCH_CONCURRENCY,
+    DEFAULT_PLATE_READ_MODE,
+    DEFAULT_PLATE_REGION_MIN_PX,
+    DEFAULT_FRAME_GATE_THRESHOLD,
+    DEFAULT_FRAME_GATE_MAX_AGE,
+    DEFAULT_FACE_CACHE_TTL,
+    DEFAULT_FACE_CACHE_SIZE,
+    DEFAULT_TRACK_REUSE_MIN_CONFIDENCE,
+    DEFAULT_TRACK_MAX_AGE,
+    DEFAULT_PLATE_CACHE_TTL,
+    DEFAULT_PLATE_CACHE_SIZE,
+    DEFAULT_ROI_MODE,
+    DEFAULT_PAYLOAD_BUDGETS,
+    DEFAULT_ADAPTIVE_SCALE,
+    DEFAULT_MIN_FACE_PX,
+    DEFAULT_ROI_LEARNING,
+    DEFAULT_ROI_LEARN_COVERAGE,
+    DEFAULT_ROI_AUTO_APPLY,
+    DEFAULT_LABEL_PUSHDOWN,
+    DEFAULT_TARGETS_ONLY,
+    DEFAULT_CALL_PLANNER,
+    DEFAULT_FACE_ONLY,
+    DEFAULT_FACE_GATE_MIN_PX,
+    DEFAULT_FACE_GATE_MIN_SHARPNESS,
+    DEFAULT_FACE_GATE_MAX_YAW,
+    DEFAULT_FACE_GATE_MAX_PITCH,
+    DEFAULT_FACE_GATE_MIN_CONFIDENCE,
+    DEFAULT_LAZY_RENDER,
+    DEFAULT_RENDER_CACHE_SIZE,
+    DEFAULT_WRITE_BEHIND,
 )
 
 
@@ -74,6 +134,36 @@ DEFAULTS: Dict[str, Any] = {
     CONF_SCAN_CARS: False,
     CONF_VEHICLE_AREA_ABS_MIN: DEFAULT_VEHICLE_AREA_ABS_MIN,
     CONF_MAX_VEHICLES_TO_SCAN: DEFAULT_MAX_VEHICLES_TO_SCAN,
+    CONF_FACE_SEARCH_CONCURRENCY: DEFAULT_FACE_SEARCH_CONCURRENCY,
+    CONF_PLATE_READ_MODE: DEFAULT_PLATE_READ_MODE,
+    CONF_PLATE_REGION_MIN_PX: DEFAULT_PLATE_REGION_MIN_PX,
+    CONF_FRAME_GATE_THRESHOLD: DEFAULT_FRAME_GATE_THRESHOLD,
+    CONF_FRAME_GATE_MAX_AGE: DEFAULT_FRAME_GATE_MAX_AGE,
+    CONF_FACE_CACHE_TTL: DEFAULT_FACE_CACHE_TTL,
+    CONF_FACE_CACHE_SIZE: DEFAULT_FACE_CACHE_SIZE,
+    CONF_TRACK_REUSE_MIN_CONFIDENCE: DEFAULT_TRACK_REUSE_MIN_CONFIDENCE,
+    CONF_TRACK_MAX_AGE: DEFAULT_TRACK_MAX_AGE,
+    CONF_PLATE_CACHE_TTL: DEFAULT_PLATE_CACHE_TTL,
+    CONF_PLATE_CACHE_SIZE: DEFAULT_PLATE_CACHE_SIZE,
+    CONF_ROI_MODE: DEFAULT_ROI_MODE,
+    CONF_PAYLOAD_BUDGETS: DEFAULT_PAYLOAD_BUDGETS,
+    CONF_ADAPTIVE_SCALE: DEFAULT_ADAPTIVE_SCALE,
+    CONF_MIN_FACE_PX: DEFAULT_MIN_FACE_PX,
+    CONF_ROI_LEARNING: DEFAULT_ROI_LEARNING,
+    CONF_ROI_LEARN_COVERAGE: DEFAULT_ROI_LEARN_COVERAGE,
+    CONF_ROI_AUTO_APPLY: DEFAULT_ROI_AUTO_APPLY,
+    CONF_LABEL_PUSHDOWN: DEFAULT_LABEL_PUSHDOWN,
+    CONF_TARGETS_ONLY: DEFAULT_TARGETS_ONLY,
+    CONF_CALL_PLANNER: DEFAULT_CALL_PLANNER,
+    CONF_FACE_ONLY: DEFAULT_FACE_ONLY,
+    CONF_FACE_GATE_MIN_PX: DEFAULT_FACE_GATE_MIN_PX,
+    CONF_FACE_GATE_MIN_SHARPNESS: DEFAULT_FACE_GATE_MIN_SHARPNESS,
+    CONF_FACE_GATE_MAX_YAW: DEFAULT_FACE_GATE_MAX_YAW,
+    CONF_FACE_GATE_MAX_PITCH: DEFAULT_FACE_GATE_MAX_PITCH,
+    CONF_FACE_GATE_MIN_CONFIDENCE: DEFAULT_FACE_GATE_MIN_CONFIDENCE,
+    CONF_LAZY_RENDER: DEFAULT_LAZY_RENDER,
+    CONF_RENDER_CACHE_SIZE: DEFAULT_RENDER_CACHE_SIZE,
+    CONF_WRITE_BEHIND: DEFAULT_WRITE_BEHIND,
     # cloud flags (keep previous behavior: enabled+sync by default)
     CONF_CLOUD_GALLERY_ENABLED: True,
     CONF_CLOUD_GALLERY_SYNC_ON_STARTUP: True,
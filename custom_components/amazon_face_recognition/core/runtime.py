@@ -33,12 +33,22 @@ def _default_public_state() -> Dict[str, Any]:
         "plates": {"updated_at": None, "items": {}},
         "plates_store": None,
         "_plates_loaded": False,
+        "scan_queue_stats": {},
+        "face_cache_stats": {"hits": 0, "misses": 0, "invalidations": 0, "entries": 0},
+        "plate_cache_stats": {"hits": 0, "misses": 0, "invalidations": 0, "entries": 0},
+        "payload_stats": {},
+        "roi_proposals": {},
+        "planner_stats": {},
+        "render_cache_stats": {},
+        "write_behind_stats": {},
         "usage": {
             "month": None,
             "scans_month": 0,
             "aws_calls_month": 0,
             "last_month_scans": 0,
             "last_month_api_calls": 0,
+            "gate_skips_month": 0,
+            "last_month_gate_skips": 0,
         },
     }
 
@@ -0,0 +1,103 @@
+"""Per-camera scan admission (latest-wins).
+
+Motion automations can call `amazon_face_recognition.scan` several times per
+second for the same camera. Processing every call queues redundant Rekognition
+work, so scans are admitted per camera:
+
+- at most ONE scan in flight per camera
+- while a scan runs, further requests are parked in a single pending slot;
+  a newer request replaces the parked one (latest wins)
+- the snapshot is fetched only when the parked request actually runs, so the
+  frame processed is the newest available one
+- every caller is released when the scan that covers its request completes
+
+Counters (per camera, in hass.data[DOMAIN]["scan_queue_stats"]):
+- requested: scan calls received
+- processed: scans actually run through the processor
+- coalesced: calls parked behind an in-flight scan
+- dropped:   parked calls superseded by a newer one before running
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from homeassistant.core import HomeAssistant
+
+from .runtime import get_domain_data
+
+_LOGGER = logging.getLogger(__name__)
+
+FetchFn = Callable[[], Awaitable[Optional[bytes]]]
+ProcessFn = Callable[[str, bytes], Awaitable[None]]
+
+
+@dataclass(slots=True)
+class _CameraSlot:
+    running: bool = False
+    pending: Optional[tuple[FetchFn, ProcessFn]] = None
+    waiters: List[asyncio.Future] = field(default_factory=list)
+
+
+def _empty_stats() -> Dict[str, int]:
+    return {"requested": 0, "processed": 0, "coalesced": 0, "dropped": 0}
+
+
+class AFRScanQueue:
+    """Latest-wins, one-in-flight scan admission per camera."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._slots: Dict[str, _CameraSlot] = {}
+
+    def _stats(self, camera_entity: str) -> Dict[str, int]:
+        stats = get_domain_data(self.hass).setdefault("scan_queue_stats", {})
+        return stats.setdefault(camera_entity, _empty_stats())
+
+    def in_flight(self, camera_entity: str) -> bool:
+        slot = self._slots.get(camera_entity)
+        return bool(slot and slot.running)
+
+    async def async_submit(self, camera_entity: str, fetch: FetchFn, process: ProcessFn) -> None:
+        """Admit a scan request; returns once a scan covering it has completed."""
+        slot = self._slots.setdefault(camera_entity, _CameraSlot())
+        stats = self._stats(camera_entity)
+        stats["requested"] += 1
+
+        if slot.pending is not None:
+            stats["dropped"] += 1
+        elif slot.running:
+            stats["coalesced"] += 1
+
+        slot.pending = (fetch, process)
+        fut: asyncio.Future = self.hass.loop.create_future()
+        slot.waiters.append(fut)
+
+        if not slot.running:
+            slot.running = True
+            self.hass.async_create_task(self._async_worker(camera_entity, slot))
+
+        await fut
+
+    async def _async_worker(self, camera_entity: str, slot: _CameraSlot) -> None:
+        stats = self._stats(camera_entity)
+        try:
+            while slot.pending is not None:
+                (fetch, process), waiters = slot.pending, slot.waiters
+                slot.pending, slot.waiters = None, []
+                try:
+                    image = await fetch()
+                    if image:
+                        await process(camera_entity, image)
+                        stats["processed"] += 1
+                except Exception as e:
+                    _LOGGER.error("scan queue: scan of %s failed: %s", camera_entity, e)
+                finally:
+                    for w in waiters:
+                        if not w.done():
+                            w.set_result(None)
+        finally:
+            slot.running = False
@@ -747,7 +747,7 @@ const Vt=(t,e)=>"method"===e.kind&&e.descriptor&&!("value"in e.descriptor)?{...e
       ha-formfield {
         --mdc-theme-text-primary-on-background: var(--primary-text-color);
       }
-    `}};t([Bt({attribute:!1})],Jt.prototype,"hass",void 0),t([Wt()],Jt.prototype,"_config",void 0),Jt=t([(t=>e=>"function"==typeof e?((t,e)=>(customElements.define(t,e),e))(t,e):((t,e)=>{const{kind:i,elements:s}=e;return{kind:i,elements:s,finisher(e){customElements.define(t,e)}}})(t,e))(Yt)],Jt);console.info("%c  AWS Face Recognition Card  \n%c  version: v@AWS Face Recognition Card@  ","color: orange; font-weight: bold; background: black","color: white; font-weight: bold; background: dimgray");const te="/local/amazon_face_recognition_scan",ee=["amazon_face_recognition/get_index","amazon_face_recognition/index"],ie=["amazon_face_recognition/get_last_result","amazon_face_recognition/last_result"];class se extends Lt{constructor(){super(...arguments),this._items=[],this._index=0,this._lastResult=null,this._error=null,this._loading=!1,this._scale=1,this._tx=0,this._ty=0,this._dragging=!1,this._scanCarsEnabled=!1,this._live=!1,this._autoplayTimer=null,this._pointers=new Map,this._start={scale:1,tx:0,ty:0},this._pinchStartDist=0,this._pinchCenter={x:0,y:0},this._lastTapTime=0,this._doubleTapDelay=300,this._hasConfig=!1,this._initDone=!1,this._unsubUpdates=null,this._warnedObsolete=!1,this._toggleLive=()=>{this._live=!this._live,this._resetZoom()},this._toggleAutoplay=()=>{const t=!this._config.autoplay;this._config=Object.assign(Object.assign({},this._config),{autoplay:t}),this._stopAutoplay(),this._startAutoplay()},this._prev=()=>{this._items.length&&(this._resetZoom(),this._index=(this._index-1+this._items.length)%this._items.length,this._preloadNeighborImages(),this._live=!1)},this._next=()=>{this._items.length&&(this._resetZoom(),this._index=(this._index+1)%this._items.length,this._preloadNeighborImages(),this._live=!1)},this._resetZoom=()=>{this._scale=1,this._tx=0,this._ty=0},this._onWheel=t=>{t.preventDefault();const e=t.currentTarget.getBoundingClientRect(),i=t.clientX-e.left,s=t.clientY-e.top,o=this._scale,n=t.deltaY>0?.9:1.1,r=this._clamp(o*n,1,6);this._tx=i-(i-this._tx)*(r/o),this._ty=s-(s-this._ty)*(r/o),this._scale=r,this._normalizeAfterZoom(),this._applyBounds()},this._onPointerDown=t=>{if("touch"===t.pointerType){const t=Date.now(),e=t-this._lastTapTime;if(this._lastTapTime=t,e>0&&e<this._doubleTapDelay)return void(this._scale>1?this._resetZoom():this._zoom2xAtCenter())}if(t.currentTarget.setPointerCapture(t.pointerId),this._pointers.set(t.pointerId,{x:t.clientX,y:t.clientY}),this._start={scale:this._scale,tx:this._tx,ty:this._ty},1===this._pointers.size&&(this._dragging=!0),2===this._pointers.size){const t=Array.from(this._pointers.values()),e=t[0].x-t[1].x,i=t[0].y-t[1].y;this._pinchStartDist=Math.hypot(e,i),this._pinchCenter={x:(t[0].x+t[1].x)/2,y:(t[0].y+t[1].y)/2}}},this._onPointerMove=t=>{var e;const i=this._pointers.get(t.pointerId);if(!i)return;const s={x:t.clientX,y:t.clientY};if(this._pointers.set(t.pointerId,s),1===this._pointers.size){if(this._scale<=1)return;return this._tx+=s.x-i.x,this._ty+=s.y-i.y,void this._applyBounds()}if(2===this._pointers.size){const t=null===(e=this.shadowRoot)||void 0===e?void 0:e.querySelector(".viewer");if(!t)return;const i=t.getBoundingClientRect(),s=Array.from(this._pointers.values()),o=s[0].x-s[1].x,n=s[0].y-s[1].y,r=Math.hypot(o,n),a=r/(this._pinchStartDist||r),l=this._clamp(this._start.scale*a,1,6),d=this._pinchCenter.x-i.left,c=this._pinchCenter.y-i.top,h=this._scale;this._tx=d-(d-this._tx)*(l/h),this._ty=c-(c-this._ty)*(l/h),this._scale=l,this._normalizeAfterZoom(),this._applyBounds()}},this._onPointerUp=t=>{this._pointers.delete(t.pointerId),0===this._pointers.size&&(this._dragging=!1)},this._onDblClick=()=>{this._resetZoom()}}set hass(t){this._hass=t,this._tryInit()}get hass(){return this._hass}static get styles(){return Ft}static getConfigElement(){return document.createElement(Yt)}setConfig(t){this._hasConfig=!0,this._config=Object.assign({autoplay:!1,autoplay_seconds:3,show_object_list:!1},t),this._stopAutoplay(),this._startAutoplay(),this._tryInit()}connectedCallback(){super.connectedCallback(),this._tryInit()}disconnectedCallback(){super.disconnectedCallback(),this._stopAutoplay(),this._cleanupWs(),this._initDone=!1}_tryInit(){var t;this._initDone||this._hasConfig&&(null===(t=this._hass)||void 0===t?void 0:t.connection)&&(this._initDone=!0,this._initWsAndLoad())}async _initWsAndLoad(){var t;try{await this._loadFromWs(),await this._subscribeUpdates()}catch(e){this._error=`${Qt(this.hass,"error")}: ${null!==(t=null==e?void 0:e.message)&&void 0!==t?t:e}`}}_cleanupWs(){var t;try{null===(t=this._unsubUpdates)||void 0===t||t.call(this)}catch(t){}this._unsubUpdates=null,this._loading=!1}_downloadCurrent(){var t,e;const i=this._items.length?this._items[this._index]:null,s=null==i?void 0:i.file;let o=s?`${te}/${encodeURIComponent(s)}?v=${s}`:"";if(!o){const i=(null===(t=this._lastResult)||void 0===t?void 0:t.image_url)||(null===(e=this._lastResult)||void 0===e?void 0:e.latest_url)||"";o=i?`${i}${i.includes("?")?"&":"?"}v=${Date.now()}`:""}if(!o)return;const n=document.createElement("a");n.href=o,n.download=s||"recognition.jpg",n.rel="noopener",n.target="_blank",document.body.appendChild(n),n.click(),n.remove()}_startAutoplay(){var t,e,i;if(!(null===(t=this._config)||void 0===t?void 0:t.autoplay))return;const s=Number(null!==(i=null===(e=this._config)||void 0===e?void 0:e.autoplay_seconds)&&void 0!==i?i:3);s>0&&(this._autoplayTimer=window.setInterval(()=>this._next(),1e3*s))}_stopAutoplay(){this._autoplayTimer&&window.clearInterval(this._autoplayTimer),this._autoplayTimer=null}async _wsSend(t){var e;if(!(null===(e=this.hass)||void 0===e?void 0:e.connection))throw new Error("No hass.connection");return await this.hass.connection.sendMessagePromise(t)}async _wsSendFirstOk(t,e){let i=null;for(const s of t)try{return await this._wsSend(Object.assign({type:s},e))}catch(t){i=t}throw null!=i?i:new Error("WebSocket call failed")}async _loadFromWs(){var t;if(!this._loading){this._loading=!0;try{const t=await this._wsSendFirstOk(ee,{limit:100}),e=[...Array.isArray(t.items)?t.items:[]].sort((t,e)=>(e.timestamp||"").localeCompare(t.timestamp||"")),i=await this._wsSendFirstOk(ie,{});this._items=e,this._updatedAt=null==t?void 0:t.updated_at,this._lastResult=i||null,this._scanCarsEnabled=!!(null==i?void 0:i.scan_cars_enabled),this._error=null;const s=null==i?void 0:i.file;if(s&&e.length){const t=e.findIndex(t=>t.file===s);this._index=t>=0?t:0}else this._index=0;this._preloadNeighborImages()}catch(e){this._error=`${Qt(this.hass,"error")}: ${null!==(t=null==e?void 0:e.message)&&void 0!==t?t:e}`}finally{this._loading=!1}}}async _subscribeUpdates(){this._unsubUpdates||(this._unsubUpdates=await this.hass.connection.subscribeMessage(t=>{(null==t?void 0:t.updated_at)&&(this._updatedAt=t.updated_at),(null==t?void 0:t.last_result)&&(this._lastResult=t.last_result),this._loadFromWs(),this._resetZoom()},{type:"amazon_face_recognition/subscribe_updates"}))}_preloadNeighborImages(){if(!this._items.length)return;const t=(this._index+1)%this._items.length,e=(this._index-1+this._items.length)%this._items.length,i=t=>{var e;const i=null===(e=this._items[t])||void 0===e?void 0:e.file;if(!i)return;(new Image).src=`${te}/${encodeURIComponent(i)}?v=${i}`};i(t),i(e)}_clamp(t,e,i){return Math.max(e,Math.min(i,t))}_normalizeAfterZoom(){this._scale<=1.001&&(this._scale=1,this._tx=0,this._ty=0)}_applyBounds(){const t=2e3;this._tx=this._clamp(this._tx,-2e3,t),this._ty=this._clamp(this._ty,-2e3,t)}_zoom2xAtCenter(){var t;const e=null===(t=this.shadowRoot)||void 0===t?void 0:t.querySelector(".viewer");if(!e)return;const i=e.getBoundingClientRect(),s=i.width/2,o=i.height/2,n=this._scale;this._tx=s-(s-this._tx)*(2/n),this._ty=o-(o-this._ty)*(2/n),this._scale=2,this._applyBounds()}getCardSize(){return 3}_imgUrlForItem(t){var e,i;const s=null==t?void 0:t.file;if(s)return`${te}/${encodeURIComponent(s)}?v=${s}`;const o=(null===(e=this._lastResult)||void 0===e?void 0:e.image_url)||(null===(i=this._lastResult)||void 0===i?void 0:i.latest_url)||"";return o?`${o}${o.includes("?")?"&":"?"}v=${Date.now()}`:""}_renderPlatesSection(t){var e,i,s,o,n;const r=null!==(n=null!==(s=null!==(e=null==t?void 0:t.plates)&&void 0!==e?e:null===(i=this._lastResult)||void 0===i?void 0:i.plates)&&void 0!==s?s:null===(o=this._lastResult)||void 0===o?void 0:o.detected_plates)&&void 0!==n?n:[],a=Array.isArray(r)?r:[];return a.length?yt`
+    `}};t([Bt({attribute:!1})],Jt.prototype,"hass",void 0),t([Wt()],Jt.prototype,"_config",void 0),Jt=t([(t=>e=>"function"==typeof e?((t,e)=>(customElements.define(t,e),e))(t,e):((t,e)=>{const{kind:i,elements:s}=e;return{kind:i,elements:s,finisher(e){customElements.define(t,e)}}})(t,e))(Yt)],Jt);console.info("%c  AWS Face Recognition Card  \n%c  version: v@AWS Face Recognition Card@  ","color: orange; font-weight: bold; background: black","color: white; font-weight: bold; background: dimgray");const te="/local/amazon_face_recognition_scan",ee=["amazon_face_recognition/get_index","amazon_face_recognition/index"],ie=["amazon_face_recognition/get_last_result","amazon_face_recognition/last_result"];class se extends Lt{constructor(){super(...arguments),this._items=[],this._index=0,this._lastResult=null,this._error=null,this._loading=!1,this._scale=1,this._tx=0,this._ty=0,this._dragging=!1,this._scanCarsEnabled=!1,this._live=!1,this._autoplayTimer=null,this._pointers=new Map,this._start={scale:1,tx:0,ty:0},this._pinchStartDist=0,this._pinchCenter={x:0,y:0},this._lastTapTime=0,this._doubleTapDelay=300,this._hasConfig=!1,this._initDone=!1,this._unsubUpdates=null,this._warnedObsolete=!1,this._toggleLive=()=>{this._live=!this._live,this._resetZoom()},this._toggleAutoplay=()=>{const t=!this._config.autoplay;this._config=Object.assign(Object.assign({},this._config),{autoplay:t}),this._stopAutoplay(),this._startAutoplay()},this._prev=()=>{this._items.length&&(this._resetZoom(),this._index=(this._index-1+this._items.length)%this._items.length,this._preloadNeighborImages(),this._live=!1)},this._next=()=>{this._items.length&&(this._resetZoom(),this._index=(this._index+1)%this._items.length,this._preloadNeighborImages(),this._live=!1)},this._resetZoom=()=>{this._scale=1,this._tx=0,this._ty=0},this._onWheel=t=>{t.preventDefault();const e=t.currentTarget.getBoundingClientRect(),i=t.clientX-e.left,s=t.clientY-e.top,o=this._scale,n=t.deltaY>0?.9:1.1,r=this._clamp(o*n,1,6);this._tx=i-(i-this._tx)*(r/o),this._ty=s-(s-this._ty)*(r/o),this._scale=r,this._normalizeAfterZoom(),this._applyBounds()},this._onPointerDown=t=>{if("touch"===t.pointerType){const t=Date.now(),e=t-this._lastTapTime;if(this._lastTapTime=t,e>0&&e<this._doubleTapDelay)return void(this._scale>1?this._resetZoom():this._zoom2xAtCenter())}if(t.currentTarget.setPointerCapture(t.pointerId),this._pointers.set(t.pointerId,{x:t.clientX,y:t.clientY}),this._start={scale:this._scale,tx:this._tx,ty:this._ty},1===this._pointers.size&&(this._dragging=!0),2===this._pointers.size){const t=Array.from(this._pointers.values()),e=t[0].x-t[1].x,i=t[0].y-t[1].y;this._pinchStartDist=Math.hypot(e,i),this._pinchCenter={x:(t[0].x+t[1].x)/2,y:(t[0].y+t[1].y)/2}}},this._onPointerMove=t=>{var e;const i=this._pointers.get(t.pointerId);if(!i)return;const s={x:t.clientX,y:t.clientY};if(this._pointers.set(t.pointerId,s),1===this._pointers.size){if(this._scale<=1)return;return this._tx+=s.x-i.x,this._ty+=s.y-i.y,void this._applyBounds()}if(2===this._pointers.size){const t=null===(e=this.shadowRoot)||void 0===e?void 0:e.querySelector(".viewer");if(!t)return;const i=t.getBoundingClientRect(),s=Array.from(this._pointers.values()),o=s[0].x-s[1].x,n=s[0].y-s[1].y,r=Math.hypot(o,n),a=r/(this._pinchStartDist||r),l=this._clamp(this._start.scale*a,1,6),d=this._pinchCenter.x-i.left,c=this._pinchCenter.y-i.top,h=this._scale;this._tx=d-(d-this._tx)*(l/h),this._ty=c-(c-this._ty)*(l/h),this._scale=l,this._normalizeAfterZoom(),this._applyBounds()}},this._onPointerUp=t=>{this._pointers.delete(t.pointerId),0===this._pointers.size&&(this._dragging=!1)},this._onDblClick=()=>{this._resetZoom()}}set hass(t){this._hass=t,this._tryInit()}get hass(){return this._hass}static get styles(){return Ft}static getConfigElement(){return document.createElement(Yt)}setConfig(t){this._hasConfig=!0,this._config=Object.assign({autoplay:!1,autoplay_seconds:3,show_object_list:!1},t),this._stopAutoplay(),this._startAutoplay(),this._tryInit()}connectedCallback(){super.connectedCallback(),this._tryInit()}disconnectedCallback(){super.disconnectedCallback(),this._stopAutoplay(),this._cleanupWs(),this._initDone=!1}_tryInit(){var t;this._initDone||this._hasConfig&&(null===(t=this._hass)||void 0===t?void 0:t.connection)&&(this._initDone=!0,this._initWsAndLoad())}async _initWsAndLoad(){var t;try{await this._loadFromWs(),await this._subscribeUpdates()}catch(e){this._error=`${Qt(this.hass,"error")}: ${null!==(t=null==e?void 0:e.message)&&void 0!==t?t:e}`}}_cleanupWs(){var t;try{null===(t=this._unsubUpdates)||void 0===t||t.call(this)}catch(t){}this._unsubUpdates=null,this._loading=!1}_downloadCurrent(){var t,e;const i=this._items.length?this._items[this._index]:null,s=null==i?void 0:i.file;let o=(null==i?void 0:i.image_url)||(s?`${te}/${encodeURIComponent(s)}?v=${s}`:"");if(!o){const i=(null===(t=this._lastResult)||void 0===t?void 0:t.image_url)||(null===(e=this._lastResult)||void 0===e?void 0:e.latest_url)||"";o=i?`${i}${i.includes("?")?"&":"?"}v=${Date.now()}`:""}if(!o)return;const n=document.createElement("a");n.href=o,n.download=s||"recognition.jpg",n.rel="noopener",n.target="_blank",document.body.appendChild(n),n.click(),n.remove()}_startAutoplay(){var t,e,i;if(!(null===(t=this._config)||void 0===t?void 0:t.autoplay))return;const s=Number(null!==(i=null===(e=this._config)||void 0===e?void 0:e.autoplay_seconds)&&void 0!==i?i:3);s>0&&(this._autoplayTimer=window.setInterval(()=>this._next(),1e3*s))}_stopAutoplay(){this._autoplayTimer&&window.clearInterval(this._autoplayTimer),this._autoplayTimer=null}async _wsSend(t){var e;if(!(null===(e=this.hass)||void 0===e?void 0:e.connection))throw new Error("No hass.connection");return await this.hass.connection.sendMessagePromise(t)}async _wsSendFirstOk(t,e){let i=null;for(const s of t)try{return await this._wsSend(Object.assign({type:s},e))}catch(t){i=t}throw null!=i?i:new Error("WebSocket call failed")}async _loadFromWs(){var t;if(!this._loading){this._loading=!0;try{const t=await this._wsSendFirstOk(ee,{limit:100}),e=[...Array.isArray(t.items)?t.items:[]].sort((t,e)=>(e.timestamp||"").localeCompare(t.timestamp||"")),i=await this._wsSendFirstOk(ie,{});this._items=e,this._updatedAt=null==t?void 0:t.updated_at,this._lastResult=i||null,this._scanCarsEnabled=!!(null==i?void 0:i.scan_cars_enabled),this._error=null;const s=null==i?void 0:i.file;if(s&&e.length){const t=e.findIndex(t=>t.file===s);this._index=t>=0?t:0}else this._index=0;this._preloadNeighborImages()}catch(e){this._error=`${Qt(this.hass,"error")}: ${null!==(t=null==e?void 0:e.message)&&void 0!==t?t:e}`}finally{this._loading=!1}}}async _subscribeUpdates(){this._unsubUpdates||(this._unsubUpdates=await this.hass.connection.subscribeMessage(t=>{(null==t?void 0:t.updated_at)&&(this._updatedAt=t.updated_at),(null==t?void 0:t.last_result)&&(this._lastResult=t.last_result),this._loadFromWs(),this._resetZoom()},{type:"amazon_face_recognition/subscribe_updates"}))}_preloadNeighborImages(){if(!this._items.length)return;const t=(this._index+1)%this._items.length,e=(this._index-1+this._items.length)%this._items.length,i=t=>{var e;const i=null===(e=this._items[t])||void 0===e?void 0:e.file;if(!i)return;(new Image).src=`${te}/${encodeURIComponent(i)}?v=${i}`};i(t),i(e)}_clamp(t,e,i){return Math.max(e,Math.min(i,t))}_normalizeAfterZoom(){this._scale<=1.001&&(this._scale=1,this._tx=0,this._ty=0)}_applyBounds(){const t=2e3;this._tx=this._clamp(this._tx,-2e3,t),this._ty=this._clamp(this._ty,-2e3,t)}_zoom2xAtCenter(){var t;const e=null===(t=this.shadowRoot)||void 0===t?void 0:t.querySelector(".viewer");if(!e)return;const i=e.getBoundingClientRect(),s=i.width/2,o=i.height/2,n=this._scale;this._tx=s-(s-this._tx)*(2/n),this._ty=o-(o-this._ty)*(2/n),this._scale=2,this._applyBounds()}getCardSize(){return 3}_imgUrlForItem(t){var e,i;const s=null==t?void 0:t.file;if(null==t?void 0:t.image_url)return t.image_url;if(s)return`${te}/${encodeURIComponent(s)}?v=${s}`;const o=(null===(e=this._lastResult)||void 0===e?void 0:e.image_url)||(null===(i=this._lastResult)||void 0===i?void 0:i.latest_url)||"";return o?`${o}${o.includes("?")?"&":"?"}v=${Date.now()}`:""}_renderPlatesSection(t){var e,i,s,o,n;const r=null!==(n=null!==(s=null!==(e=null==t?void 0:t.plates)&&void 0!==e?e:null===(i=this._lastResult)||void 0===i?void 0:i.plates)&&void 0!==s?s:null===(o=this._lastResult)||void 0===o?void 0:o.detected_plates)&&void 0!==n?n:[],a=Array.isArray(r)?r:[];return a.length?yt`
       <div class="sectionCard">
         <div class="sectionHead">
           <div class="sectionTitle">${Qt(this.hass,"plates")}</div>
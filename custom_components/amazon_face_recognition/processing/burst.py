@@ -0,0 +1,112 @@
+"""Burst capture: pick the sharpest, best-exposed snapshot of a short burst.
+
+The scan service can fetch K snapshots a few hundred milliseconds apart; only
+the best one goes through the processor, so AWS calls do not multiply.
+
+Scoring is local and cheap: each JPEG is draft-decoded to grayscale at about
+SCORE_WIDTH pixels (DCT scaling, no full decode), cropped to the camera ROI,
+and scored as
+
+    variance of the 4-neighbour Laplacian (vectorized NumPy)
+    x exposure factor (mid-gray mean, few clipped pixels)
+
+Without NumPy the Laplacian is replaced by PIL's FIND_EDGES filter.
+"""
+
+from __future__ import annotations
+
+import io
+from typing import List, Optional, Sequence, Tuple
+
+from PIL import Image, ImageFilter, ImageStat
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ships with Home Assistant
+    np = None
+
+MAX_BURST = 10
+SCORE_WIDTH = 320
+# luma outside [CLIP_LOW, CLIP_HIGH] counts as clipped
+CLIP_LOW = 8
+CLIP_HIGH = 247
+
+
+def roi_union(rois: Sequence[dict]) -> Optional[Tuple[float, float, float, float]]:
+    """Normalized (x_min, y_min, x_max, y_max) covering the camera ROIs, or None (full frame)."""
+    boxes = []
+    for r in rois or []:
+        if not isinstance(r, dict):
+            continue
+        try:
+            x, y, w, h = (float(r.get(k, 0.0)) for k in ("x", "y", "w", "h"))
+        except (TypeError, ValueError):
+            continue
+        if w > 0 and h > 0:
+            boxes.append((x, y, x + w, y + h))
+    if not boxes:
+        return None
+    return (
+        max(0.0, min(b[0] for b in boxes)),
+        max(0.0, min(b[1] for b in boxes)),
+        min(1.0, max(b[2] for b in boxes)),
+        min(1.0, max(b[3] for b in boxes)),
+    )
+
+
+def _gray_preview(data: bytes, roi: Optional[Tuple[float, float, float, float]]) -> Image.Image:
+    img = Image.open(io.BytesIO(data))
+    if img.format == "JPEG":
+        img.draft("L", (SCORE_WIDTH, max(1, SCORE_WIDTH * img.height // max(1, img.width))))
+    img = img.convert("L")
+    if roi is not None:
+        w, h = img.size
+        box = (int(roi[0] * w), int(roi[1] * h), max(int(roi[0] * w) + 1, int(roi[2] * w)), max(int(roi[1] * h) + 1, int(roi[3] * h)))
+        img = img.crop(box)
+    if img.width > SCORE_WIDTH:
+        img = img.resize((SCORE_WIDTH, max(1, img.height * SCORE_WIDTH // img.width)), Image.BILINEAR)
+    return img
+
+
+def _exposure_factor(mean: float, clipped: float) -> float:
+    # 1.0 at mid-gray, 0.5 at black / white; minus the clipped share
+    return max(0.05, (1.0 - abs(mean - 128.0) / 256.0) * (1.0 - clipped))
+
+
+def score_frame(data: bytes, roi: Optional[Tuple[float, float, float, float]] = None) -> float:
+    """Sharpness x exposure score of a snapshot (higher is better; 0 when undecodable)."""
+    try:
+        img = _gray_preview(data, roi)
+    except Exception:
+        return 0.0
+    if img.width < 3 or img.height < 3:
+        return 0.0
+
+    if np is not None:
+        a = np.asarray(img, dtype=np.float32)
+        lap = (
+            a[1:-1, :-2] + a[1:-1, 2:] + a[:-2, 1:-1] + a[2:, 1:-1] - 4.0 * a[1:-1, 1:-1]
+        )
+        sharpness = float(lap.var())
+        mean = float(a.mean())
+        clipped = float(np.count_nonzero((a < CLIP_LOW) | (a > CLIP_HIGH))) / a.size
+    else:
+        sharpness = float(ImageStat.Stat(img.filter(ImageFilter.FIND_EDGES)).var[0])
+        mean = float(ImageStat.Stat(img).mean[0])
+        hist = img.histogram()
+        clipped = (sum(hist[:CLIP_LOW]) + sum(hist[CLIP_HIGH + 1:])) / float(img.width * img.height)
+
+    return sharpness * _exposure_factor(mean, clipped)
+
+
+def pick_best_frame(
+    frames: Sequence[Optional[bytes]], roi: Optional[Tuple[float, float, float, float]] = None
+) -> Tuple[Optional[int], List[float]]:
+    """(index of the best frame or None, per-frame scores). Missing frames score 0."""
+    scores = [score_frame(f, roi) if f else 0.0 for f in frames]
+    candidates = [i for i, f in enumerate(frames) if f]
+    if not candidates:
+        return None, scores
+    # ties -> latest frame (freshest)
+    best = max(candidates, key=lambda i: (scores[i], i))
+    return best, scores
@@ -0,0 +1,171 @@
+"""Budgeted JPEG encoding for Rekognition payloads.
+
+Every image sent to AWS goes through `encode_to_budget`: the payload must fit
+a per-API byte budget while keeping a minimum amount of detail (long side in
+pixels). Quality is lowered first (bisection between max and min quality);
+only when the minimum quality still does not fit is the image downscaled,
+never below the API's minimum long side: the per-API budget gives way to
+that detail floor (`fits=False` in the result, the payload is still usable).
+
+Rekognition's 5 MB inline limit is a hard limit: while the payload is above it
+the image keeps shrinking (past the detail floor and the pass limit, down to
+_HARD_FLOOR_PX), so every returned payload is within REKOGNITION_MAX_BYTES.
+
+APIs (budget keys):
+- labels: work image for detect_labels / detect_faces
+- faces:  face crops for search_faces_by_image
+- text:   vehicle / plate crops and the work image for detect_text
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import io
+import math
+import threading
+from typing import Dict, Tuple
+
+from PIL import Image
+
+REKOGNITION_MAX_BYTES = 5 * 1024 * 1024
+
+API_LABELS = "labels"
+API_FACES = "faces"
+API_TEXT = "text"
+
+# minimum detail per API (long side, pixels): below this, results degrade
+MIN_LONG_SIDE: Dict[str, int] = {
+    API_LABELS: 640,
+    API_FACES: 160,
+    API_TEXT: 480,
+}
+
+# plates need sharp edges: text payloads start from a higher quality
+MAX_QUALITY: Dict[str, int] = {
+    API_LABELS: 90,
+    API_FACES: 90,
+    API_TEXT: 95,
+}
+
+MIN_QUALITY = 60
+# downscale passes spent on the (soft) per-API budget
+_MAX_PASSES = 4
+# last resort for the 5 MB limit: a JPEG this small is a few KB at any quality
+_HARD_FLOOR_PX = 64
+
+
+def encode_jpeg(img: Image.Image, quality: int = 90, **kwargs) -> bytes:
+    """Encode a PIL image as JPEG bytes (RGB)."""
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    with io.BytesIO() as out:
+        img.save(out, format="JPEG", quality=int(quality), **kwargs)
+        return out.getvalue()
+
+
+@dataclass(frozen=True, slots=True)
+class PayloadBudget:
+    api: str
+    max_bytes: int
+    min_long_side: int
+    max_quality: int = 90
+    min_quality: int = MIN_QUALITY
+
+    @classmethod
+    def for_api(cls, api: str, max_bytes: int) -> "PayloadBudget":
+        max_bytes = int(max_bytes or 0)
+        if max_bytes <= 0 or max_bytes > REKOGNITION_MAX_BYTES:
+            max_bytes = REKOGNITION_MAX_BYTES
+        return cls(
+            api=api,
+            max_bytes=max_bytes,
+            min_long_side=MIN_LONG_SIDE.get(api, 640),
+            max_quality=MAX_QUALITY.get(api, 90),
+        )
+
+
+@dataclass(slots=True)
+class EncodedPayload:
+    data: bytes
+    quality: int
+    size: Tuple[int, int]
+    encodes: int
+    # within budget.max_bytes (False: detail floor reached first; still <= REKOGNITION_MAX_BYTES)
+    fits: bool = True
+
+
+def _fit_quality(img: Image.Image, budget: PayloadBudget) -> Tuple[bytes, int, int, bool]:
+    """Highest quality that fits the budget -> (data, quality, encodes, fits)."""
+    data = encode_jpeg(img, quality=budget.max_quality)
+    if len(data) <= budget.max_bytes:
+        return data, budget.max_quality, 1, True
+
+    low = encode_jpeg(img, quality=budget.min_quality)
+    if len(low) > budget.max_bytes:
+        return low, budget.min_quality, 2, False
+
+    best, best_q, encodes = low, budget.min_quality, 2
+    lo, hi = budget.min_quality + 1, budget.max_quality - 1
+    for _ in range(3):
+        if lo > hi:
+            break
+        q = (lo + hi) // 2
+        data = encode_jpeg(img, quality=q)
+        encodes += 1
+        if len(data) <= budget.max_bytes:
+            best, best_q, lo = data, q, q + 1
+        else:
+            hi = q - 1
+    return best, best_q, encodes, True
+
+
+def encode_to_budget(img: Image.Image, budget: PayloadBudget) -> EncodedPayload:
+    """Encode `img` as JPEG within `budget` (see module docstring)."""
+    cur = img
+    total = 0
+    passes = 0
+    while True:
+        data, q, n, fits = _fit_quality(cur, budget)
+        total += n
+        passes += 1
+        if fits:
+            return EncodedPayload(data=data, quality=q, size=cur.size, encodes=total)
+
+        long_side = max(cur.size)
+        hard_ok = len(data) <= REKOGNITION_MAX_BYTES
+        if hard_ok and (passes >= _MAX_PASSES or long_side <= budget.min_long_side):
+            break
+        floor = budget.min_long_side if hard_ok else _HARD_FLOOR_PX
+        if long_side <= floor:
+            break
+
+        # JPEG size is roughly proportional to the pixel count (every pass shrinks by >= 10%)
+        target = budget.max_bytes if hard_ok else REKOGNITION_MAX_BYTES
+        factor = min(0.9, max(0.5, math.sqrt(target / max(1, len(data))) * 0.95))
+        new_long = max(floor, int(long_side * factor))
+        ratio = new_long / float(long_side)
+        w, h = cur.size
+        # always resample from the source image (no cumulative blur)
+        cur = img.resize((max(1, int(w * ratio)), max(1, int(h * ratio))), Image.LANCZOS)
+
+    return EncodedPayload(data=data, quality=q, size=cur.size, encodes=total, fits=False)
+
+
+class AFRPayloadStats:
+    """Bytes actually sent to AWS, per API (since startup)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def record(self, api: str, nbytes: int) -> None:
+        with self._lock:
+            s = self._stats.setdefault(api, {"calls": 0, "bytes": 0, "last_bytes": 0, "max_bytes": 0})
+            s["calls"] += 1
+            s["bytes"] += int(nbytes)
+            s["last_bytes"] = int(nbytes)
+            s["max_bytes"] = max(s["max_bytes"], int(nbytes))
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {k: dict(v) for k, v in self._stats.items()}
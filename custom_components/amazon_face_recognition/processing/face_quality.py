@@ -0,0 +1,63 @@
+"""Face quality / size gate applied before search_faces_by_image.
+
+detect_faces (Attributes=["DEFAULT"]) already returns Confidence, Pose and
+Quality for every face. Faces that cannot produce a reliable match (tiny,
+blurry, turned away) are marked "unsearchable" instead of being cropped,
+upscaled and searched: no AWS call, and no "Unknown" face (which would raise
+an unknown-person alert).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+FACE_UNSEARCHABLE = "unsearchable"
+
+
+def face_quality(detail: Mapping) -> dict:
+    """Fields of a Rekognition FaceDetail used by the gate (rounded, for last_result)."""
+    quality = detail.get("Quality") or {}
+    pose = detail.get("Pose") or {}
+    return {
+        "confidence": round(float(detail.get("Confidence") or 0.0), 2),
+        "sharpness": round(float(quality.get("Sharpness") or 0.0), 2),
+        "brightness": round(float(quality.get("Brightness") or 0.0), 2),
+        "yaw": round(float(pose.get("Yaw") or 0.0), 1),
+        "pitch": round(float(pose.get("Pitch") or 0.0), 1),
+    }
+
+
+@dataclass(frozen=True, slots=True)
+class FaceGate:
+    min_px: float = 0.0
+    min_sharpness: float = 0.0
+    max_yaw: float = 90.0
+    max_pitch: float = 90.0
+    min_confidence: float = 0.0
+
+    @property
+    def needs_details(self) -> bool:
+        """True when a gate other than size is active (needs detect_faces Quality / Pose)."""
+        return (
+            self.min_sharpness > 0
+            or self.max_yaw < 90
+            or self.max_pitch < 90
+            or self.min_confidence > 0
+        )
+
+    def reject_reason(self, face_px: float, quality: Optional[Mapping] = None) -> Optional[str]:
+        """None when the face is worth a search, else a short reason."""
+        if face_px < self.min_px:
+            return f"size {face_px:.0f}px < {self.min_px:.0f}px"
+        if not quality:
+            return None
+        if float(quality.get("confidence", 100.0)) < self.min_confidence:
+            return f"confidence {quality['confidence']} < {self.min_confidence}"
+        if float(quality.get("sharpness", 100.0)) < self.min_sharpness:
+            return f"sharpness {quality['sharpness']} < {self.min_sharpness}"
+        if abs(float(quality.get("yaw", 0.0))) > self.max_yaw:
+            return f"yaw {quality['yaw']} > {self.max_yaw}"
+        if abs(float(quality.get("pitch", 0.0))) > self.max_pitch:
+            return f"pitch {quality['pitch']} > {self.max_pitch}"
+        return None
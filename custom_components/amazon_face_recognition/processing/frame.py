@@ -0,0 +1,337 @@
+"""Decoded camera frame used by the scan pipeline.
+
+A camera snapshot is decoded exactly once into an RGB working buffer. Every
+derived image (ROI crop, scaled analysis image, face / vehicle crops, annotated
+snapshot) is produced from that buffer; JPEG encoding only happens where bytes
+leave the process (AWS payloads, files on disk).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import io
+import math
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from .encoder import EncodedPayload, PayloadBudget, encode_to_budget
+from .mosaic import AFRMosaic
+from .roi_mask import apply_rect_mask
+
+
+class AFRFrame:
+    """One camera frame + lazily derived views.
+
+    - `image`: full-resolution RGB buffer, decoded once and only when needed
+      (face / vehicle crops, annotated snapshot)
+    - analysis image: the frame decoded at reduced resolution (JPEG draft mode,
+      1/2 .. 1/8 in the DCT domain) when the analysis scale allows it
+    - ROI view: ROI crop of the analysis image, optionally blanked outside the
+      ROI rectangles, or packed multi-ROI mosaic; computed once
+    - work view: ROI view at the analysis `scale`, computed once
+    - work payload: JPEG fitted to a byte budget, encoded once per budget and
+      reused for every AWS call
+    """
+
+    def __init__(self, image: Image.Image | None = None, data: bytes | None = None) -> None:
+        self._data = data
+        self._decode_lock = threading.Lock()
+        self._image: Optional[Image.Image] = None
+        if image is not None:
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            self._image = image
+            self.width, self.height = image.size
+        else:
+            # header only: size is known without decoding pixels
+            with Image.open(io.BytesIO(data or b"")) as probe:
+                self.width, self.height = probe.size
+
+        self.roi_px: Tuple[int, int, int, int] = (0, 0, self.width, self.height)
+        self.mosaic: Optional[AFRMosaic] = None
+        # "mask" ROI mode: full-frame pixel rectangles kept visible inside the ROI crop
+        self.mask_rects: List[Tuple[int, int, int, int]] = []
+        self._analysis_img: Optional[Image.Image] = None
+        self._roi_img: Optional[Image.Image] = None
+        self._work_scale: float = 1.0
+        self._work_img: Optional[Image.Image] = None
+        self._work_payload: Dict[PayloadBudget, EncodedPayload] = {}
+        self._rgba: Optional[Image.Image] = None
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "AFRFrame":
+        return cls(data=data)
+
+    # --------------------------
+    # Decoding
+    # --------------------------
+    @property
+    def image(self) -> Image.Image:
+        """Full-resolution RGB buffer (decoded on first access)."""
+        if self._image is None:
+            with self._decode_lock:
+                if self._image is None:
+                    img = Image.open(io.BytesIO(self._data or b""))
+                    img.load()
+                    self._image = img if img.mode == "RGB" else img.convert("RGB")
+        return self._image
+
+    @property
+    def full_decoded(self) -> bool:
+        return self._image is not None
+
+    def _analysis_image(self) -> Image.Image:
+        """Frame at the smallest resolution that still covers the analysis scale."""
+        if self._image is not None:
+            return self._image
+        if self._analysis_img is not None:
+            return self._analysis_img
+
+        if self._work_scale < 1.0 and self._data:
+            req = (
+                max(1, int(math.ceil(self.width * self._work_scale))),
+                max(1, int(math.ceil(self.height * self._work_scale))),
+            )
+            img = Image.open(io.BytesIO(self._data))
+            # JPEG only (no-op for other formats): decode at 1/2, 1/4 or 1/8 while size >= req
+            img.draft("RGB", req)
+            if img.size != (self.width, self.height):
+                img.load()
+                self._analysis_img = img if img.mode == "RGB" else img.convert("RGB")
+                return self._analysis_img
+
+        return self.image
+
+    # --------------------------
+    # ROI / work views
+    # --------------------------
+    def set_roi(self, roi_px: Tuple[int, int, int, int]) -> None:
+        """Set the ROI pixel box (left, top, right, bottom) and drop derived views."""
+        left, top, right, bottom = (int(v) for v in roi_px)
+        self.roi_px = (left, top, right, bottom)
+        self.mosaic = None
+        self.mask_rects = []
+        self._roi_img = None
+        self._work_img = None
+        self._work_payload = {}
+
+    def set_mosaic(self, mosaic: AFRMosaic, union_px: Tuple[int, int, int, int]) -> None:
+        """Use a packed multi-ROI mosaic as ROI view (union_px kept for reference)."""
+        self.set_roi(union_px)
+        self.mosaic = mosaic
+
+    def set_mask(self, union_px: Tuple[int, int, int, int], rects_px: List[Tuple[int, int, int, int]]) -> None:
+        """Crop to union_px and blank everything outside rects_px (full-frame pixels)."""
+        self.set_roi(union_px)
+        self.mask_rects = [tuple(int(v) for v in r) for r in rects_px]
+
+    def in_mask(self, box: dict) -> bool:
+        """True if the centroid of a normalized full-frame box lies in a visible area."""
+        if not self.mask_rects:
+            return True
+        cx = (float(box.get("x_min", 0.0)) + float(box.get("x_max", 0.0))) / 2.0 * self.width
+        cy = (float(box.get("y_min", 0.0)) + float(box.get("y_max", 0.0))) / 2.0 * self.height
+        return any(left <= cx <= right and top <= cy <= bottom for left, top, right, bottom in self.mask_rects)
+
+    @property
+    def roi_is_full(self) -> bool:
+        return self.mosaic is None and not self.mask_rects and self.roi_px == (0, 0, self.width, self.height)
+
+    @property
+    def roi_image(self) -> Image.Image:
+        """ROI view at analysis resolution (may be smaller than roi_size)."""
+        if self._roi_img is None:
+            src = self._analysis_image()
+            f = src.size[0] / float(self.width)
+
+            def _px(box: Tuple[int, int, int, int]) -> Tuple[int, int, int, int]:
+                return tuple(int(round(v * f)) for v in box)  # type: ignore[return-value]
+
+            if self.mosaic is not None:
+                self._roi_img = self.mosaic.render(src, factor=f)
+            elif self.mask_rects:
+                left, top, _r, _b = _px(self.roi_px)
+                local = [
+                    (l - left, t - top, r - left, b - top) for l, t, r, b in (_px(m) for m in self.mask_rects)
+                ]
+                self._roi_img = apply_rect_mask(src.crop(_px(self.roi_px)), local)
+            else:
+                self._roi_img = src if self.roi_is_full else src.crop(_px(self.roi_px))
+        return self._roi_img
+
+    @property
+    def roi_size(self) -> Tuple[int, int]:
+        if self.mosaic is not None:
+            return self.mosaic.width, self.mosaic.height
+        left, top, right, bottom = self.roi_px
+        return right - left, bottom - top
+
+    def set_work_scale(self, scale: float) -> None:
+        scale = float(scale or 1.0)
+        if scale <= 0:
+            scale = 1.0
+        if scale != self._work_scale:
+            self._work_scale = scale
+            self._analysis_img = None
+            self._roi_img = None
+            self._work_img = None
+            self._work_payload = {}
+
+    @property
+    def work_image(self) -> Image.Image:
+        """ROI view resized by the analysis scale (this is what AWS sees)."""
+        if self._work_img is None:
+            base = self.roi_image
+            rw, rh = self.roi_size
+            newsize = (max(1, int(rw * self._work_scale)), max(1, int(rh * self._work_scale)))
+            if base.size != newsize:
+                base = base.resize(newsize, Image.LANCZOS)
+            self._work_img = base
+        return self._work_img
+
+    def work_payload(self, budget: PayloadBudget) -> EncodedPayload:
+        """JPEG payload of the work view fitted to `budget` (encoded once per budget)."""
+        payload = self._work_payload.get(budget)
+        if payload is None:
+            payload = encode_to_budget(self.work_image, budget)
+            self._work_payload[budget] = payload
+        return payload
+
+    # --------------------------
+    # Crops (full-frame pixel coords)
+    # --------------------------
+    def crop(self, box_px: Tuple[int, int, int, int]) -> Image.Image:
+        return self.image.crop(box_px)
+
+    def source_bytes(self) -> bytes:
+        """Original camera bytes (JPEG-encoded from the buffer when built from an image)."""
+        if self._data is None:
+            buf = io.BytesIO()
+            self.image.save(buf, format="JPEG", quality=90)
+            self._data = buf.getvalue()
+        return self._data
+
+    def rgba(self) -> Image.Image:
+        """Full frame as RGBA (base layer of the annotated snapshot), converted once."""
+        if self._rgba is None:
+            self._rgba = self.image.convert("RGBA")
+        return self._rgba
+
+
+def _clamp(v: float, lo: float = 0.0, hi: float = 1.0) -> float:
+    return max(lo, min(hi, v))
+
+
+@dataclass(slots=True)
+class AFRFrameContext:
+    """Per-scan state.
+
+    One instance is created for every `_process_bytes_sync` invocation and passed
+    through all stages, so the processor itself holds no per-frame state and
+    several cameras can be scanned concurrently on executor threads.
+    """
+
+    camera_entity: str
+    frame: AFRFrame
+
+    objects: List[dict] = field(default_factory=list)
+    labels: List[dict] = field(default_factory=list)
+    targets_found: List[dict] = field(default_factory=list)
+    faces: List[dict] = field(default_factory=list)
+    person_labels: List[dict] = field(default_factory=list)
+    confidence_details: Dict[str, float] = field(default_factory=dict)
+    person_found: bool = False
+
+    # live tracks touched by this scan (track_id -> AFRTrack)
+    tracks: Dict[str, Any] = field(default_factory=dict)
+
+    # work->full mapping context (pixels)
+    roi_ctx: Dict[str, Any] = field(default_factory=dict)
+
+    def set_roi_ctx(self) -> None:
+        """Snapshot ROI geometry of the frame (used by map_box_work_to_full)."""
+        f = self.frame
+        rw, rh = f.roi_size
+        self.roi_ctx = {
+            "roi_left_px": int(f.roi_px[0]),
+            "roi_top_px": int(f.roi_px[1]),
+            "roi_w_px": int(rw),
+            "roi_h_px": int(rh),
+            "full_w": int(f.width),
+            "full_h": int(f.height),
+        }
+
+    def map_box_full_to_work(self, bb: dict) -> dict:
+        """Inverse of map_box_work_to_full (clamped to the work image)."""
+        mosaic = self.frame.mosaic
+        if mosaic is not None:
+            mb = mosaic.map_from_full(bb) or {"x_min": 0.0, "y_min": 0.0, "x_max": 0.0, "y_max": 0.0}
+            return {k: _clamp(v) for k, v in mb.items()}
+
+        full_w, full_h = self.frame.width, self.frame.height
+        rx = float(self.roi_ctx.get("roi_left_px", 0))
+        ry = float(self.roi_ctx.get("roi_top_px", 0))
+        rw = max(1.0, float(self.roi_ctx.get("roi_w_px", full_w)))
+        rh = max(1.0, float(self.roi_ctx.get("roi_h_px", full_h)))
+        fw = float(self.roi_ctx.get("full_w", full_w))
+        fh = float(self.roi_ctx.get("full_h", full_h))
+        return {
+            "x_min": _clamp((float(bb.get("x_min", 0.0)) * fw - rx) / rw),
+            "y_min": _clamp((float(bb.get("y_min", 0.0)) * fh - ry) / rh),
+            "x_max": _clamp((float(bb.get("x_max", 1.0)) * fw - rx) / rw),
+            "y_max": _clamp((float(bb.get("y_max", 1.0)) * fh - ry) / rh),
+        }
+
+    def map_box_work_to_full(self, bb: dict) -> Optional[dict]:
+        """Map a normalized bounding box from ROI-work image to full-frame normalized coords.
+
+        In mosaic mode the box goes through the transform of the tile it overlaps
+        most; None is returned when it only covers the gutter between tiles.
+        """
+        try:
+            mosaic = self.frame.mosaic
+            if mosaic is not None:
+                mapped = mosaic.map_to_full(bb)
+                if mapped is None:
+                    return None
+                x_min_f = _clamp(mapped["x_min"])
+                y_min_f = _clamp(mapped["y_min"])
+                x_max_f = _clamp(mapped["x_max"])
+                y_max_f = _clamp(mapped["y_max"])
+            else:
+                full_w, full_h = self.frame.width, self.frame.height
+                rx = float(self.roi_ctx.get("roi_left_px", 0))
+                ry = float(self.roi_ctx.get("roi_top_px", 0))
+                rw = float(self.roi_ctx.get("roi_w_px", full_w))
+                rh = float(self.roi_ctx.get("roi_h_px", full_h))
+                fw = float(self.roi_ctx.get("full_w", full_w))
+                fh = float(self.roi_ctx.get("full_h", full_h))
+
+                x_min_w = float(bb.get("x_min", 0.0))
+                y_min_w = float(bb.get("y_min", 0.0))
+                x_max_w = float(bb.get("x_max", 1.0))
+                y_max_w = float(bb.get("y_max", 1.0))
+
+                x_min_f = _clamp((rx + x_min_w * rw) / fw)
+                y_min_f = _clamp((ry + y_min_w * rh) / fh)
+                x_max_f = _clamp((rx + x_max_w * rw) / fw)
+                y_max_f = _clamp((ry + y_max_w * rh) / fh)
+
+            # Guard degenerate mapping
+            if x_max_f <= x_min_f:
+                x_max_f = _clamp(x_min_f + 0.001)
+            if y_max_f <= y_min_f:
+                y_max_f = _clamp(y_min_f + 0.001)
+
+            return {
+                "x_min": x_min_f,
+                "y_min": y_min_f,
+                "x_max": x_max_f,
+                "y_max": y_max_f,
+                "width": _clamp(x_max_f - x_min_f),
+                "height": _clamp(y_max_f - y_min_f),
+            }
+        except Exception:
+            return bb
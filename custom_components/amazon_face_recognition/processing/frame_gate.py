@@ -0,0 +1,87 @@
+"""Per-camera "nothing changed" gate.
+
+Before any AWS call the ROI view of the frame is reduced to a tiny luma
+signature (grayscale, 32x24) and compared with the signature of the last frame
+that was actually analysed for the same camera. If the mean absolute
+difference is below the configured threshold (and the previous analysis is
+recent enough) the previous result is reused and Rekognition is not called.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import threading
+import time
+from typing import Dict, Optional
+
+from PIL import Image, ImageChops, ImageStat
+
+SIGNATURE_SIZE = (32, 24)
+
+
+def luma_signature(img: Image.Image) -> Image.Image:
+    """Downscaled grayscale signature of an image (cheap, noise tolerant)."""
+    small = img
+    # reduce() (box average by an integer factor) is much cheaper than a full resize on big frames
+    factor = max(1, min(img.size[0] // (SIGNATURE_SIZE[0] * 4), img.size[1] // (SIGNATURE_SIZE[1] * 4)))
+    if factor > 1:
+        small = img.reduce(factor)
+    return small.convert("L").resize(SIGNATURE_SIZE, Image.BILINEAR)
+
+
+def signature_diff(a: Image.Image, b: Image.Image) -> float:
+    """Mean absolute luma difference in percent (0..100)."""
+    if a.size != b.size:
+        return 100.0
+    diff = ImageChops.difference(a, b)
+    return float(ImageStat.Stat(diff).mean[0]) * 100.0 / 255.0
+
+
+@dataclass(slots=True)
+class _GateEntry:
+    signature: Image.Image
+    last_result: dict
+    analysed_at: float
+
+
+class AFRFrameGate:
+    """Remembers, per camera, the signature + result of the last analysed frame."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _GateEntry] = {}
+
+    def check(
+        self, camera_entity: str, signature: Image.Image, threshold: float, max_age: float
+    ) -> tuple[Optional[dict], float]:
+        """Return (previous_last_result | None, diff_percent).
+
+        A result is returned only when the frame is "unchanged": diff below
+        `threshold` and previous analysis not older than `max_age` seconds.
+        """
+        with self._lock:
+            entry = self._entries.get(camera_entity)
+        if entry is None:
+            return None, 100.0
+
+        diff = signature_diff(signature, entry.signature)
+        if threshold <= 0 or diff >= threshold:
+            return None, diff
+        if max_age > 0 and (time.monotonic() - entry.analysed_at) > max_age:
+            return None, diff
+        return entry.last_result, diff
+
+    def remember(self, camera_entity: str, signature: Image.Image, last_result: dict) -> None:
+        with self._lock:
+            self._entries[camera_entity] = _GateEntry(
+                signature=signature,
+                last_result=dict(last_result or {}),
+                analysed_at=time.monotonic(),
+            )
+
+    def forget(self, camera_entity: Optional[str] = None) -> None:
+        with self._lock:
+            if camera_entity is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(camera_entity, None)
@@ -0,0 +1,199 @@
+"""Short-lived result caches keyed by a perceptual hash of an image crop.
+
+Used to avoid paying AWS again for something that was read moments ago:
+
+- AFRFaceCache: face crop -> search_faces_by_image match
+- AFRPlateCache: vehicle crop -> detect_text plate read
+
+Entries are kept in a bounded LRU+TTL cache keyed by:
+
+- camera entity
+- coarse position (center of the box on a grid)
+- perceptual hash (dHash, 64 bit) of the crop, compared by Hamming distance
+
+A lookup checks the box's grid cell and its 8 neighbours, so small movements
+between scans still hit. Subclasses can also require the cached box to
+overlap the query box (min_iou).
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+HASH_SIZE = 8
+
+_Key = Tuple[str, int, int]
+
+
+def dhash(img: Image.Image, size: int = HASH_SIZE) -> int:
+    """Difference hash: sign of horizontal gradients on a (size+1)x(size) luma thumbnail."""
+    small = img.convert("L").resize((size + 1, size), Image.BILINEAR)
+    px = small.tobytes()
+    row = size + 1
+    h = 0
+    for y in range(size):
+        base = y * row
+        for x in range(size):
+            h = (h << 1) | (1 if px[base + x] > px[base + x + 1] else 0)
+    return h
+
+
+def _hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _iou(a: dict, b: dict) -> float:
+    try:
+        ix = max(0.0, min(float(a["x_max"]), float(b["x_max"])) - max(float(a["x_min"]), float(b["x_min"])))
+        iy = max(0.0, min(float(a["y_max"]), float(b["y_max"])) - max(float(a["y_min"]), float(b["y_min"])))
+        inter = ix * iy
+        area_a = (float(a["x_max"]) - float(a["x_min"])) * (float(a["y_max"]) - float(a["y_min"]))
+        area_b = (float(b["x_max"]) - float(b["x_min"])) * (float(b["y_max"]) - float(b["y_min"]))
+        union = area_a + area_b - inter
+        return inter / union if union > 0 else 0.0
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+
+def _cell(box: dict, grid: int) -> Tuple[int, int]:
+    cx = (float(box.get("x_min", 0.0)) + float(box.get("x_max", 0.0))) / 2.0
+    cy = (float(box.get("y_min", 0.0)) + float(box.get("y_max", 0.0))) / 2.0
+    gx = max(0, min(grid - 1, int(cx * grid)))
+    gy = max(0, min(grid - 1, int(cy * grid)))
+    return gx, gy
+
+
+@dataclass(slots=True)
+class _CacheEntry:
+    crop_hash: int
+    match: dict
+    stored_at: float
+    box: dict
+
+
+class AFRHashCache:
+    """Thread-safe LRU+TTL cache of results keyed by (camera, grid cell, crop hash)."""
+
+    grid = 8
+    max_hamming = 8
+    # minimum IoU between cached and query box (0 = position cell only)
+    min_iou = 0.0
+
+    def __init__(self, max_entries: int = 256, ttl: float = 60.0) -> None:
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[_Key, _CacheEntry]" = OrderedDict()
+        self.max_entries = int(max_entries)
+        self.ttl = float(ttl)
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def configure(self, max_entries: int, ttl: float) -> None:
+        with self._lock:
+            self.max_entries = max(0, int(max_entries))
+            self.ttl = max(0.0, float(ttl))
+            self._evict_locked()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    def get(self, camera_entity: str, box: dict, crop_hash: int) -> Optional[dict]:
+        """Return a cached result for this crop, or None (counts hit/miss)."""
+        if not self.enabled:
+            return None
+        gx, gy = _cell(box, self.grid)
+        now = time.monotonic()
+        with self._lock:
+            best: Optional[Tuple[int, _Key]] = None
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    key = (camera_entity, gx + dx, gy + dy)
+                    entry = self._entries.get(key)
+                    if entry is None:
+                        continue
+                    if now - entry.stored_at > self.ttl:
+                        del self._entries[key]
+                        continue
+                    if self.min_iou > 0 and _iou(box, entry.box) < self.min_iou:
+                        continue
+                    dist = _hamming(crop_hash, entry.crop_hash)
+                    if dist <= self.max_hamming and (best is None or dist < best[0]):
+                        best = (dist, key)
+
+            if best is None:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            self._entries.move_to_end(best[1])
+            return dict(self._entries[best[1]].match)
+
+    def put(self, camera_entity: str, box: dict, crop_hash: int, match: dict) -> None:
+        if not self.enabled or not match:
+            return
+        gx, gy = _cell(box, self.grid)
+        with self._lock:
+            key = (camera_entity, gx, gy)
+            self._entries[key] = _CacheEntry(
+                crop_hash=crop_hash, match=dict(match), stored_at=time.monotonic(), box=dict(box)
+            )
+            self._entries.move_to_end(key)
+            self._evict_locked()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            if self._entries:
+                self._entries.clear()
+            self._invalidations += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "invalidations": self._invalidations,
+                "entries": len(self._entries),
+            }
+
+    def _evict_locked(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class AFRFaceCache(AFRHashCache):
+    """Face crop -> collection match.
+
+    Only positive matches are cached: a miss may come from a transient AWS error
+    or a poor crop and is worth asking again. Must be invalidated whenever the
+    Rekognition collection changes (see AFRProcessor.async_refresh_faces_index).
+
+    A hit returns a *name* without asking AWS, so matching is strict: near
+    identical crop (Hamming <= 4 of 64) AND the same place in the frame
+    (IoU >= 0.5 with the cached box). Disabled by default (face_cache_ttl=0).
+    """
+
+    max_hamming = 4
+    min_iou = 0.5
+
+
+class AFRPlateCache(AFRHashCache):
+    """Vehicle crop -> plate read ({"plate": str | None, "confidence": float}).
+
+    Empty reads are cached too (a parked car whose plate is not visible would
+    otherwise cost a detect_text on every scan); failed calls are not.
+
+    A hit hands a plate (and its owner) to automations without reading it, so
+    matching is as strict as the face cache: near identical crop (Hamming <= 5
+    of 64, a little slack for lighting drift on a parked car) AND the same
+    place in the frame (IoU >= 0.5). Disabled by default (plate_cache_ttl=0).
+    """
+
+    max_hamming = 5
+    min_iou = 0.5
@@ -0,0 +1,79 @@
+"""detect_labels request parameters derived from the configured targets.
+
+Without parameters Rekognition returns every generic label (and instance) it
+finds, most of which the targets filter throws away right after parsing.
+`plan_detect_labels` pushes that filtering to the service:
+
+- MinConfidence: lowest threshold that can still keep a target. Never below
+  Rekognition's own default (55) so enabling pushdown never returns *more*
+  labels than before.
+- Settings.GeneralLabels.LabelExclusionFilters: `exclude_targets`.
+- targets_only: LabelInclusionFilters = targets_confidence keys + person
+  (+ vehicle labels when scan_cars) and MaxLabels = number of included labels.
+
+Label filters are not available in every region / SDK version: the caller
+retries without `Settings` (and filters locally) when they are rejected.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Mapping, Optional, Set
+
+# Rekognition applies MinConfidence=55 when the parameter is omitted
+REKOGNITION_DEFAULT_MIN_CONFIDENCE = 55.0
+# Settings.GeneralLabels filters accept at most 100 entries each
+MAX_FILTER_ITEMS = 100
+
+
+def rekognition_label_name(name: str) -> str:
+    """Lower-case option label -> Rekognition label name ("license plate" -> "License Plate")."""
+    return " ".join(w.capitalize() for w in str(name).split())
+
+
+@dataclass(slots=True)
+class LabelRequest:
+    params: Dict[str, Any]
+    # labels kept locally (None = every label not excluded)
+    targets: Optional[Set[str]]
+
+    @property
+    def has_settings(self) -> bool:
+        return "Settings" in self.params
+
+
+def plan_detect_labels(
+    targets_confidence: Mapping[str, float],
+    default_min_conf: float,
+    exclude_targets: Iterable[str],
+    vehicle_labels: Iterable[str],
+    scan_cars: bool,
+    targets_only: bool,
+) -> LabelRequest:
+    """Build the detect_labels keyword arguments (besides Image) for this configuration."""
+    excluded = {str(x).strip().lower() for x in exclude_targets if str(x).strip()}
+    params: Dict[str, Any] = {}
+    general: Dict[str, Any] = {}
+    targets: Optional[Set[str]] = None
+
+    if targets_only:
+        targets = {str(k).strip().lower() for k in targets_confidence if str(k).strip()}
+        targets.add("person")
+        if scan_cars:
+            targets.update(str(x).strip().lower() for x in vehicle_labels if str(x).strip())
+        targets -= excluded
+        thresholds = [float(targets_confidence.get(t, default_min_conf)) for t in targets]
+        if targets and len(targets) <= MAX_FILTER_ITEMS:
+            general["LabelInclusionFilters"] = sorted(rekognition_label_name(t) for t in targets)
+            params["MaxLabels"] = len(targets)
+    else:
+        thresholds = [float(default_min_conf), *(float(v) for v in targets_confidence.values())]
+        if excluded:
+            general["LabelExclusionFilters"] = sorted(rekognition_label_name(t) for t in excluded)[:MAX_FILTER_ITEMS]
+
+    if thresholds:
+        params["MinConfidence"] = max(REKOGNITION_DEFAULT_MIN_CONFIDENCE, min(100.0, min(thresholds)))
+    if general:
+        params["Features"] = ["GENERAL_LABELS"]
+        params["Settings"] = {"GeneralLabels": general}
+    return LabelRequest(params=params, targets=targets)
@@ -0,0 +1,189 @@
+"""Multi-ROI mosaic.
+
+With several ROIs per camera the union bounding rectangle can be almost the
+whole frame (two small zones in opposite corners). In "mosaic" ROI mode every
+ROI rectangle is cut out of the frame and packed into one compact image that is
+sent to Rekognition instead. Each tile keeps its own transform, so boxes
+detected on the mosaic are mapped back exactly onto full-frame coordinates.
+
+Tiles are separated by a black gutter so a detection cannot silently span two
+unrelated zones; a box that crosses tiles is clipped to the tile it overlaps
+most.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import math
+from typing import List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+GUTTER_PX = 8
+
+PixelBox = Tuple[int, int, int, int]
+
+
+@dataclass(slots=True)
+class MosaicTile:
+    # source rectangle in the full frame (left, top, right, bottom), pixels
+    src: PixelBox
+    # top-left corner of the tile inside the mosaic, pixels
+    dst_x: int
+    dst_y: int
+
+    @property
+    def width(self) -> int:
+        return self.src[2] - self.src[0]
+
+    @property
+    def height(self) -> int:
+        return self.src[3] - self.src[1]
+
+    @property
+    def dst(self) -> PixelBox:
+        return (self.dst_x, self.dst_y, self.dst_x + self.width, self.dst_y + self.height)
+
+
+def _overlap(a: Sequence[float], b: Sequence[float]) -> float:
+    ix = min(a[2], b[2]) - max(a[0], b[0])
+    iy = min(a[3], b[3]) - max(a[1], b[1])
+    return ix * iy if ix > 0 and iy > 0 else 0.0
+
+
+def _clip(box: Sequence[float], to: Sequence[float]) -> Tuple[float, float, float, float]:
+    return (
+        min(max(box[0], to[0]), to[2]),
+        min(max(box[1], to[1]), to[3]),
+        max(min(box[2], to[2]), to[0]),
+        max(min(box[3], to[3]), to[1]),
+    )
+
+
+def merge_overlapping(rects: List[PixelBox]) -> List[PixelBox]:
+    """Merge overlapping rectangles (a zone must not be sent twice)."""
+    out = [tuple(r) for r in rects]
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(out)):
+            for j in range(i + 1, len(out)):
+                if _overlap(out[i], out[j]) > 0:
+                    a, b = out[i], out[j]
+                    out[i] = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                    del out[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return out  # type: ignore[return-value]
+
+
+class AFRMosaic:
+    """Packed layout of ROI rectangles + mosaic <-> full-frame box mapping."""
+
+    def __init__(self, tiles: List[MosaicTile], width: int, height: int, full_w: int, full_h: int) -> None:
+        self.tiles = tiles
+        self.width = int(width)
+        self.height = int(height)
+        self.full_w = int(full_w)
+        self.full_h = int(full_h)
+
+    @property
+    def area(self) -> int:
+        return self.width * self.height
+
+    @classmethod
+    def pack(cls, rects: List[PixelBox], full_w: int, full_h: int, gutter: int = GUTTER_PX) -> "AFRMosaic":
+        """Shelf packing (tallest first) into a roughly square canvas."""
+        rects = [r for r in rects if r[2] > r[0] and r[3] > r[1]]
+        order = sorted(range(len(rects)), key=lambda i: rects[i][3] - rects[i][1], reverse=True)
+
+        total_area = sum((r[2] - r[0] + gutter) * (r[3] - r[1] + gutter) for r in rects)
+        widest = max((r[2] - r[0] for r in rects), default=1)
+        shelf_w = max(widest, int(math.ceil(math.sqrt(total_area))))
+
+        placed: List[MosaicTile] = [None] * len(rects)  # type: ignore[list-item]
+        x = y = shelf_h = 0
+        canvas_w = 0
+        for i in order:
+            w = rects[i][2] - rects[i][0]
+            h = rects[i][3] - rects[i][1]
+            if x > 0 and x + w > shelf_w:
+                y += shelf_h + gutter
+                x = shelf_h = 0
+            placed[i] = MosaicTile(src=rects[i], dst_x=x, dst_y=y)
+            x += w + gutter
+            shelf_h = max(shelf_h, h)
+            canvas_w = max(canvas_w, x - gutter)
+
+        return cls(placed, max(1, canvas_w), max(1, y + shelf_h), full_w, full_h)
+
+    def render(self, image: Image.Image, factor: float = 1.0) -> Image.Image:
+        """Paste every tile of `image` into the mosaic.
+
+        `factor` is the resolution of `image` relative to the full frame (reduced
+        decoding); the mosaic is rendered at the same relative resolution.
+        """
+        if factor == 1.0:
+            canvas = Image.new(image.mode, (self.width, self.height))
+            for t in self.tiles:
+                canvas.paste(image.crop(t.src), (t.dst_x, t.dst_y))
+            return canvas
+
+        def _s(v: int) -> int:
+            return int(round(v * factor))
+
+        canvas = Image.new(image.mode, (max(1, _s(self.width)), max(1, _s(self.height))))
+        for t in self.tiles:
+            dst = tuple(_s(v) for v in t.dst)
+            tile = image.crop(tuple(_s(v) for v in t.src))
+            size = (max(1, dst[2] - dst[0]), max(1, dst[3] - dst[1]))
+            if tile.size != size:
+                tile = tile.resize(size, Image.BILINEAR)
+            canvas.paste(tile, (dst[0], dst[1]))
+        return canvas
+
+    def map_to_full(self, bb: dict) -> Optional[dict]:
+        """Normalized mosaic box -> normalized full-frame box (None if it only covers the gutter)."""
+        mb = (
+            float(bb.get("x_min", 0.0)) * self.width,
+            float(bb.get("y_min", 0.0)) * self.height,
+            float(bb.get("x_max", 1.0)) * self.width,
+            float(bb.get("y_max", 1.0)) * self.height,
+        )
+        best = max(self.tiles, key=lambda t: _overlap(mb, t.dst), default=None)
+        if best is None or _overlap(mb, best.dst) <= 0:
+            return None
+
+        x0, y0, x1, y1 = _clip(mb, best.dst)
+        dx = best.src[0] - best.dst_x
+        dy = best.src[1] - best.dst_y
+        return {
+            "x_min": (x0 + dx) / self.full_w,
+            "y_min": (y0 + dy) / self.full_h,
+            "x_max": (x1 + dx) / self.full_w,
+            "y_max": (y1 + dy) / self.full_h,
+        }
+
+    def map_from_full(self, bb: dict) -> Optional[dict]:
+        """Normalized full-frame box -> normalized mosaic box (clipped to the tile it overlaps most)."""
+        fb = (
+            float(bb.get("x_min", 0.0)) * self.full_w,
+            float(bb.get("y_min", 0.0)) * self.full_h,
+            float(bb.get("x_max", 1.0)) * self.full_w,
+            float(bb.get("y_max", 1.0)) * self.full_h,
+        )
+        best = max(self.tiles, key=lambda t: _overlap(fb, t.src), default=None)
+        if best is None or _overlap(fb, best.src) <= 0:
+            return None
+
+        x0, y0, x1, y1 = _clip(fb, best.src)
+        dx = best.dst_x - best.src[0]
+        dy = best.dst_y - best.src[1]
+        return {
+            "x_min": (x0 + dx) / self.width,
+            "y_min": (y0 + dy) / self.height,
+            "x_max": (x1 + dx) / self.width,
+            "y_max": (y1 + dy) / self.height,
+        }
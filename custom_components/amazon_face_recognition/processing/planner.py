@@ -0,0 +1,137 @@
+"""Cost-aware AWS call planning for one scan.
+
+The fixed sequence (detect_labels -> detect_faces when a person is found ->
+one search per face -> detect_text per vehicle) is refined with what is
+already known about the frame:
+
+- face_only (and no plate reading): detect_labels is skipped, detect_faces
+  runs on the work image directly.
+- exactly one person still to identify: detect_faces is skipped and
+  search_faces_by_image runs on the person's head region (Rekognition
+  searches the largest face of the image and returns its box).
+- persons too small to yield a usable face (estimated face height below half
+  of min_face_px): no face call at all.
+
+Skipping a call never hides a person: like a face rejected by the quality
+gate, a person skipped as too small counts as a person without a recognized
+face (alert / unknown_person_found still fire). With face_only there are no
+person boxes; every unrecognized face stands in for one, so a person whose
+face is not visible at all does not alert in that mode.
+
+Tracked / cached identities are already handled by the stages; the planner
+only decides which face *calls* to make. The plan and the calls it saved are
+logged per scan and counted in planner stats.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import threading
+from typing import Dict, List, Optional
+
+FACES_NONE = "none"
+FACES_DETECT = "detect"
+FACES_DIRECT = "direct"
+
+# face height / person height (same estimate as the resolution planner)
+FACE_PER_PERSON = 0.13
+# a person whose estimated face is below min_face_px * SMALL_FACE_RATIO is not worth a call
+SMALL_FACE_RATIO = 0.5
+
+
+@dataclass(slots=True)
+class AFRScanPlan:
+    labels: bool = True
+    faces: str = FACES_NONE
+    direct_person: Optional[dict] = None
+    saved: int = 0
+    notes: List[str] = field(default_factory=list)
+
+    def steps(self) -> List[str]:
+        out = []
+        if self.labels:
+            out.append("detect_labels")
+        if self.faces == FACES_DETECT:
+            out.append("detect_faces+search")
+        elif self.faces == FACES_DIRECT:
+            out.append("search_faces_direct")
+        return out
+
+    def describe(self) -> str:
+        notes = f" ({'; '.join(self.notes)})" if self.notes else ""
+        return f"{' -> '.join(self.steps()) or 'no calls'}, saved={self.saved}{notes}"
+
+    def as_dict(self) -> dict:
+        return {"steps": self.steps(), "saved": self.saved, "notes": list(self.notes)}
+
+
+class AFRCallPlanner:
+    """Plans the face calls of a scan and counts the calls saved (since startup)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"scans": 0, "calls_saved": 0, "labels_skipped": 0, "direct_searches": 0}
+
+    def begin(self, *, enabled: bool, face_only: bool, scan_cars: bool, has_collection: bool) -> AFRScanPlan:
+        """Pre-labels decision: is detect_labels needed at all?"""
+        plan = AFRScanPlan()
+        if enabled and face_only and not scan_cars and has_collection:
+            plan.labels = False
+            plan.faces = FACES_DETECT
+            plan.saved += 1
+            plan.notes.append("face_only: labels skipped")
+        return plan
+
+    def plan_faces(
+        self,
+        plan: AFRScanPlan,
+        *,
+        enabled: bool,
+        persons: List[dict],
+        carried_track_ids: set,
+        frame_height: int,
+        min_face_px: float,
+        allow_direct: bool = True,
+    ) -> AFRScanPlan:
+        """Post-labels decision: how to identify the persons still unknown."""
+        if not plan.labels:
+            return plan
+        pending = [p for p in persons if p.get("track_id") not in carried_track_ids]
+        if not pending:
+            plan.faces = FACES_NONE
+            return plan
+        plan.faces = FACES_DETECT
+        if not enabled:
+            return plan
+
+        def _face_px(p: dict) -> float:
+            bb = p.get("bounding_box") or {}
+            try:
+                return (float(bb["y_max"]) - float(bb["y_min"])) * frame_height * FACE_PER_PERSON
+            except (KeyError, TypeError, ValueError):
+                return float("inf")
+
+        usable = [p for p in pending if _face_px(p) >= float(min_face_px) * SMALL_FACE_RATIO]
+        if not usable:
+            plan.faces = FACES_NONE
+            plan.saved += 1
+            plan.notes.append(f"{len(pending)} person(s) too small for a face")
+        elif len(usable) == 1 and allow_direct:
+            plan.faces = FACES_DIRECT
+            plan.direct_person = usable[0]
+            plan.saved += 1
+            plan.notes.append("single person: detect_faces skipped")
+        return plan
+
+    def record(self, plan: AFRScanPlan) -> None:
+        with self._lock:
+            self._stats["scans"] += 1
+            self._stats["calls_saved"] += plan.saved
+            if not plan.labels:
+                self._stats["labels_skipped"] += 1
+            if plan.faces == FACES_DIRECT:
+                self._stats["direct_searches"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
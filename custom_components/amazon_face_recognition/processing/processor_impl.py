@@ -2,18 +2,18 @@
 from __future__ import annotations
 
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 import datetime
-import io
 import json
 import logging
-from functools import lru_cache
-from typing import Any, Dict, Optional, Tuple
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
 import re
 
 import botocore
-from PIL import Image, ImageDraw, ImageFont, UnidentifiedImageError
+from PIL import Image, UnidentifiedImageError
 
 from homeassistant.core import HomeAssistant
 
@@ -30,7 +30,72 @@ from ..const import (
     CONF_MAX_VEHICLES_TO_SCAN,
     DEFAULT_VEHICLE_AREA_ABS_MIN,
     DEFAULT_MAX_VEHICLES_TO_SCAN,
+    CONF_FACE_SEARCH_CONCURRENCY,
+    DEFAULT_FACE_SEARCH_CONCURRENCY,
+    CONF_PLATE_READ_MODE,
+    CONF_PLATE_REGION_MIN_PX,
+    DEFAULT_PLATE_READ_MODE,
+    DEFAULT_PLATE_REGION_MIN_PX,
+    PLATE_READ_MODE_REGIONS,
+    CONF_FRAME_GATE_THRESHOLD,
+    CONF_FRAME_GATE_MAX_AGE,
+    DEFAULT_FRAME_GATE_THRESHOLD,
+    DEFAULT_FRAME_GATE_MAX_AGE,
+    CONF_FACE_CACHE_TTL,
+    CONF_FACE_CACHE_SIZE,
+    DEFAULT_FACE_CACHE_TTL,
+    DEFAULT_FACE_CACHE_SIZE,
+    CONF_TRACK_REUSE_MIN_CONFIDENCE,
+    CONF_TRACK_MAX_AGE,
+    DEFAULT_TRACK_REUSE_MIN_CONFIDENCE,
+    DEFAULT_TRACK_MAX_AGE,
+    CONF_PLATE_CACHE_TTL,
+    CONF_PLATE_CACHE_SIZE,
+    DEFAULT_PLATE_CACHE_TTL,
+    DEFAULT_PLATE_CACHE_SIZE,
+    CONF_ROI_MODE,
+    DEFAULT_ROI_MODE,
+    ROI_MODE_MOSAIC,
+    ROI_MODE_MASK,
+    CONF_PAYLOAD_BUDGETS,
+    DEFAULT_PAYLOAD_BUDGETS,
+    CONF_ADAPTIVE_SCALE,
+    CONF_MIN_FACE_PX,
+    CONF_SCALE_BY_CAMERA,
+    DEFAULT_ADAPTIVE_SCALE,
+    DEFAULT_MIN_FACE_PX,
+    CONF_ROI_LEARNING,
+    CONF_ROI_LEARN_COVERAGE,
+    CONF_ROI_AUTO_APPLY,
+    DEFAULT_ROI_LEARNING,
+    DEFAULT_ROI_LEARN_COVERAGE,
+    DEFAULT_ROI_AUTO_APPLY,
+    CONF_LABEL_PUSHDOWN,
+    CONF_TARGETS_ONLY,
+    DEFAULT_LABEL_PUSHDOWN,
+    DEFAULT_TARGETS_ONLY,
+    CONF_CALL_PLANNER,
+    CONF_FACE_ONLY,
+    DEFAULT_CALL_PLANNER,
+    DEFAULT_FACE_ONLY,
+    CONF_FACE_GATE_MIN_PX,
+    CONF_FACE_GATE_MIN_SHARPNESS,
+    CONF_FACE_GATE_MAX_YAW,
+    CONF_FACE_GATE_MAX_PITCH,
+    CONF_FACE_GATE_MIN_CONFIDENCE,
+    DEFAULT_FACE_GATE_MIN_PX,
+    DEFAULT_FACE_GATE_MIN_SHARPNESS,
+    DEFAULT_FACE_GATE_MAX_YAW,
+    DEFAULT_FACE_GATE_MAX_PITCH,
+    DEFAULT_FACE_GATE_MIN_CONFIDENCE,
+    CONF_LAZY_RENDER,
+    CONF_RENDER_CACHE_SIZE,
+    DEFAULT_LAZY_RENDER,
+    DEFAULT_RENDER_CACHE_SIZE,
+    CONF_WRITE_BEHIND,
+    DEFAULT_WRITE_BEHIND,
     AFR_SCAN_DIRNAME,
+    AFR_SNAPSHOT_DIRNAME,
     CONF_S3_BUCKET,
     CONF_CLOUD_GALLERY_ENABLED,
     CONF_CLOUD_GALLERY_PREFIX,
@@ -40,11 +105,30 @@ from ..const import (
 )
 
 from ..core.options import merge_defaults
-
-from ..api.websocket_impl import publish_faces_update, publish_update
+from .frame import AFRFrame, AFRFrameContext
+from .encoder import API_FACES, API_LABELS, API_TEXT, AFRPayloadStats, PayloadBudget, encode_to_budget
+from .stages import run_branches
+from .frame_gate import AFRFrameGate, luma_signature
+from .hash_cache import AFRFaceCache, AFRPlateCache, dhash
+from .tracker import AFRObjectTracker, AFRTrack
+from .mosaic import AFRMosaic, merge_overlapping
+from .resolution import AFRResolutionPlanner
+from .roi_heatmap import HEATMAP_FILENAME, AFRRoiHeatmap
+from .label_filters import LabelRequest, plan_detect_labels
+from .planner import FACE_PER_PERSON, FACES_DIRECT, FACES_NONE, AFRCallPlanner, AFRScanPlan
+from .face_quality import FACE_UNSEARCHABLE, FaceGate, face_quality
+from .annotate import AFRAnnotator, render_detections, with_alpha  # noqa: F401 (with_alpha: compat re-export)
+from .snapshot_store import LATEST_NAME, AFRSnapshotStore, snapshot_url, valid_snapshot_name
+from .write_behind import AFRWriteBehind
+from .recognition_index import INDEX_FILENAME, JOURNAL_FILENAME, AFRRecognitionIndex
+
+from ..api.websocket_impl import apply_roi_proposal, publish_faces_update, publish_snapshot_saved, publish_update
 
 _LOGGER = logging.getLogger(__name__)
 
+# face names that are not an identity
+_UNIDENTIFIED_FACE_NAMES = ("Unknown", FACE_UNSEARCHABLE)
+
 
 def _log_aws_response(prefix: str, resp: dict, max_chars: int = 8000) -> None:
     """Logga la response AWS in JSON (DEBUG), limitando dimensione e rimuovendo campi pesanti."""
@@ -173,9 +257,10 @@ def _pick_best_plate_from_detect_text(resp: dict, min_conf: float = 70.0):
     return best_plate, float(best_conf), best_geom
 
 
-def _crop_by_geometry(img: Image.Image, geom: dict, pad: float = 0.25) -> bytes:
+def _crop_by_geometry(img: Image.Image, geom: dict, pad: float = 0.25) -> Image.Image:
     """
     geom è Geometry di detect_text. Ritaglia area testo con padding.
+    Ritorna l'immagine (l'encoding JPEG lo fa il chiamante, solo se serve).
     """
     base = img.convert("RGB") if img.mode != "RGB" else img
 
@@ -213,15 +298,14 @@ def _crop_by_geometry(img: Image.Image, geom: dict, pad: float = 0.25) -> bytes:
         scale = min_w / max(1, cw)
         crop = crop.resize((int(cw * scale), int(ch * scale)), Image.LANCZOS)
 
-    with io.BytesIO() as out:
-        crop.save(out, format="JPEG", quality=95)
-        return out.getvalue()
+    return crop
 
 
-def _crop_vehicle_for_plate(img: Image.Image, vehicle_box: dict) -> bytes:
+def _crop_vehicle_for_plate(img: Image.Image, vehicle_box: dict) -> Image.Image:
     """
     Crop robusto e 'worldwide': prende la parte bassa del veicolo,
     dove statisticamente sta la targa (front/back).
+    Ritorna l'immagine (l'encoding JPEG lo fa il chiamante, solo se serve).
     """
     base = img.convert("RGB") if img.mode != "RGB" else img
     w, h = base.size
@@ -253,15 +337,30 @@ def _crop_vehicle_for_plate(img: Image.Image, vehicle_box: dict) -> bytes:
         scale = min_side / max(cw, ch)
         crop = crop.resize((int(cw * scale), int(ch * scale)), Image.LANCZOS)
 
-    with io.BytesIO() as out:
-        crop.save(out, format="JPEG", quality=95)
-        return out.getvalue()
+    return crop
+
+
+def _vehicle_plate_region(vehicle_box: dict) -> dict:
+    """
+    Area normalizzata (full-frame) dove cercare la targa: stessa geometria di
+    _crop_vehicle_for_plate (parte bassa del veicolo, +5% ai lati).
+    """
+    x1 = float(vehicle_box["x_min"])
+    y1 = float(vehicle_box["y_min"])
+    x2 = float(vehicle_box["x_max"])
+    y2 = float(vehicle_box["y_max"])
+    vw = max(0.0, x2 - x1)
+    vh = max(0.0, y2 - y1)
+    return {
+        "x_min": _clamp(x1 - vw * 0.05),
+        "y_min": _clamp(y1 + vh * 0.45),
+        "x_max": _clamp(x2 + vw * 0.05),
+        "y_max": _clamp(y2),
+    }
 
 
-def with_alpha(color, opacity: float):
-    r, g, b = color
-    a = int(255 * max(0.0, min(1.0, opacity)))
-    return (r, g, b, a)
+# detect_text accepts at most 10 RegionsOfInterest per request
+_MAX_TEXT_REGIONS = 10
 
 
 def _utc_iso_now() -> str:
@@ -273,16 +372,15 @@ def _utc_iso_now() -> str:
     )
 
 
-def _clamp(v: float, lo: float = 0.0, hi: float = 1.0) -> float:
-    return max(lo, min(hi, v))
+def _snapshot_stamp(camera_entity: str) -> str:
+    """YYYYmmdd_HHMMSS_mmm_<camera object_id>: unique across cameras scanning in the same second."""
+    now = datetime.datetime.now()
+    camera = re.sub(r"[^0-9A-Za-z_]", "_", str(camera_entity or "").split(".", 1)[-1]) or "camera"
+    return f"{now.strftime('%Y%m%d_%H%M%S')}_{now.microsecond // 1000:03d}_{camera}"
 
 
-def _atomic_write_json(path: Path, data: dict) -> None:
-    tmp_path = path.with_suffix(path.suffix + ".tmp")
-    with tmp_path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-        f.write("\n")
-    tmp_path.replace(path)
+def _clamp(v: float, lo: float = 0.0, hi: float = 1.0) -> float:
+    return max(lo, min(hi, v))
 
 
 def _load_json_index(path: Path) -> dict:
@@ -392,9 +490,17 @@ def _s3_sync_down_sync(s3_client, bucket: str, prefix: str, directory: Path, lim
         _LOGGER.debug("%s: s3 sync-down failed: %s", DOMAIN, e)
 
 
-def _read_bootstrap_from_disk(directory: Path, always_save_latest: bool):
-    index_path = directory / "recognition_index.json"
-    index_data = _load_json_index(index_path)
+def _read_bootstrap_from_disk(
+    directory: Path,
+    always_save_latest: bool,
+    index: Optional[AFRRecognitionIndex] = None,
+    exists: Optional[Callable[[str], bool]] = None,
+):
+    if index is not None:
+        # snapshot + journal replay
+        index_data = index.load(exists)
+    else:
+        index_data = _load_json_index(directory / "recognition_index.json")
 
     items = index_data.get("items") or []
     latest = None
@@ -409,7 +515,7 @@ def _read_bootstrap_from_disk(directory: Path, always_save_latest: bool):
     if latest:
         base = _folder_to_local_base(directory)
         file = latest.get("file")
-        image_url = f"{base}/{file}" if file else None
+        image_url = latest.get("image_url") or (f"{base}/{file}" if file else None)
         unknown = int(latest.get("unrecognized_count") or 0) > 0
         last_result = {
             "id": Path(file).stem if file else None,
@@ -438,7 +544,8 @@ def _cleanup_old_recognition_files(directory: Path, keep: int, prefix: str = "re
             [
                 p
                 for p in directory.glob(f"{prefix}*")
-                if p.is_file() and p.name not in ("recognition_latest.jpg", "recognition.jpg")
+                if p.is_file()
+                and p.name not in ("recognition_latest.jpg", "recognition.jpg", INDEX_FILENAME, JOURNAL_FILENAME)
             ],
             key=lambda p: p.stat().st_mtime,
             reverse=True,
@@ -486,7 +593,7 @@ def map_recognized_faces_to_person_ids(persons: list[dict], faces: list[dict]) -
 
     for f in (faces or []):
         name = f.get("name")
-        if not name or name == "Unknown":
+        if not name or name in _UNIDENTIFIED_FACE_NAMES:
             continue
         fb = f.get("bounding_box")
         if not fb:
@@ -509,53 +616,29 @@ def map_recognized_faces_to_person_ids(persons: list[dict], faces: list[dict]) -
     return recognized_person_ids
 
 
-def _update_recognition_index(
-    directory: Path,
+def _recognition_index_item(
     filename: str,
     timestamp_iso: str,
     recognized: list,
     unknown_person_found: bool,
-    keep: int,
     objects: Optional[Dict[str, Any]] = None,
     plates: Optional[list] = None,
     camera_entity: Optional[str] = None,
+    image_url: Optional[str] = None,
 ) -> dict:
-    index_path = directory / "recognition_index.json"
-    data = _load_json_index(index_path)
-
-    recognized = sorted({str(x) for x in (recognized or []) if x})
-
-    by_file = {}
-    for it in data.get("items", []):
-        if isinstance(it, dict) and it.get("file"):
-            by_file[str(it["file"])] = it
-
-    by_file[filename] = {
+    item = {
         "file": filename,
         "timestamp": timestamp_iso,
-        "recognized": recognized,
+        "recognized": sorted({str(x) for x in (recognized or []) if x}),
         "unknown_person_found": bool(unknown_person_found),
         "objects": objects or {},
         "plates": plates or [],
         "camera_entity": camera_entity,
     }
-
-    existing_files = {p.name for p in directory.glob("recognition_*") if p.is_file()}
-    existing_files.discard("recognition_latest.jpg")
-    existing_files.discard("recognition.jpg")
-    existing_files.add(filename)
-
-    by_file = {k: v for k, v in by_file.items() if k in existing_files}
-
-    def _key(it: dict):
-        ts = it.get("timestamp") or ""
-        return (ts, it.get("file") or "")
-
-    items = sorted(by_file.values(), key=_key, reverse=True)[: max(1, int(keep))]
-    data["updated_at"] = _utc_iso_now()
-    data["items"] = items
-    _atomic_write_json(index_path, data)
-    return data
+    if image_url:
+        # lazy snapshot: only served (rendered) by the snapshot view
+        item["image_url"] = image_url
+    return item
 
 
 def _expand_box(box: dict, pad: float = 0.06) -> dict:
@@ -588,8 +671,8 @@ def _norm_to_pixels(box: dict, img_w: int, img_h: int):
     return (left, top, right, bottom)
 
 
-def _apply_roi_and_get_bytes(img: Image.Image, roi: dict) -> Tuple[bytes, Tuple[int, int], Image.Image]:
-    w, h = img.size
+def _roi_to_pixels(roi: dict, w: int, h: int) -> Tuple[int, int, int, int]:
+    """Normalized ROI dict -> pixel box (left, top, right, bottom); invalid ROI -> full frame."""
     x_min = _clamp(float(roi.get("x_min", 0.0)))
     y_min = _clamp(float(roi.get("y_min", 0.0)))
     x_max = _clamp(float(roi.get("x_max", 1.0)))
@@ -598,17 +681,39 @@ def _apply_roi_and_get_bytes(img: Image.Image, roi: dict) -> Tuple[bytes, Tuple[
     if x_max <= x_min or y_max <= y_min:
         x_min, y_min, x_max, y_max = 0.0, 0.0, 1.0, 1.0
 
-    left, top, right, bottom = _norm_to_pixels(
+    return _norm_to_pixels(
         {"x_min": x_min, "y_min": y_min, "x_max": x_max, "y_max": y_max},
         w,
         h,
     )
 
-    cropped = img.crop((left, top, right, bottom)).convert("RGB")
 
-    with io.BytesIO() as out:
-        cropped.save(out, format="JPEG", quality=90)
-        return out.getvalue(), (left, top), cropped
+# -----------------------------
+# Multi-ROI mosaic
+# -----------------------------
+def _build_roi_mosaic(
+    rects: list[tuple[float, float, float, float]],
+    full_w: int,
+    full_h: int,
+    union_px: Tuple[int, int, int, int],
+) -> AFRMosaic | None:
+    """Pack normalized ROI rectangles into a mosaic; None if it is not smaller than the union crop."""
+    try:
+        px = [
+            _roi_to_pixels({"x_min": x0, "y_min": y0, "x_max": x1, "y_max": y1}, full_w, full_h)
+            for x0, y0, x1, y1 in rects
+        ]
+        px = merge_overlapping(px)
+        if len(px) < 2:
+            return None
+        mosaic = AFRMosaic.pack(px, full_w, full_h)
+        union_area = (union_px[2] - union_px[0]) * (union_px[3] - union_px[1])
+        if mosaic.area >= union_area:
+            return None
+        return mosaic
+    except Exception as e:
+        _LOGGER.debug("ROI mosaic failed, using union crop: %s", e)
+        return None
 
 
 # -----------------------------
@@ -651,26 +756,6 @@ def font_level_to_scale(level: int) -> float:
     return table[level]
 
 
-@lru_cache(maxsize=64)
-def _load_font(font_size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
-    """Load and cache fonts by size.
-
-    This function is called for every drawn label; caching avoids repeated
-    filesystem access and font parsing.
-    """
-    try:
-        # truetype is preferred (better glyph coverage and size scaling)
-        return ImageFont.truetype(str(FONT_PATH), int(font_size))
-    except Exception as e:
-        # Avoid spamming logs if the font is missing on the target system.
-        # Log only once per distinct exception message.
-        key = f"{type(e).__name__}:{e}"
-        if not getattr(_load_font, "_warned", set()).__contains__(key):
-            _load_font._warned = getattr(_load_font, "_warned", set()) | {key}  # type: ignore[attr-defined]
-            _LOGGER.warning("Font truetype load failed (%s): %s", FONT_PATH, e)
-        return ImageFont.load_default()
-
-
 def draw_box_scaled(
     img: Image.Image,
     box_norm,
@@ -684,114 +769,21 @@ def draw_box_scaled(
     font_scale: float = 0.02,
     occupied_labels: list[tuple[int, int, int, int]] | None = None,
 ):
-    """
-    Draw a bounding box + label.
+    """Draw ONE bounding box + label (see AFRAnnotator for several boxes on one layer).
 
-    Anti-collisione label (pulita):
-    - prova SOPRA
-    - se collide -> prova SOTTO
-    - se collide -> prova DENTRO
-    Stop. Niente label che "volano" lontano.
+    Anti-collisione label: sopra -> sotto -> dentro.
     """
-    if occupied_labels is None:
-        occupied_labels = []
-
-    def _intersects(a, b) -> bool:
-        ax1, ay1, ax2, ay2 = a
-        bx1, by1, bx2, by2 = b
-        return not (ax2 <= bx1 or bx2 <= ax1 or ay2 <= by1 or by2 <= ay1)
-
-    if img.mode != "RGBA":
-        img = img.convert("RGBA")
-
-    y_min, x_min, y_max, x_max = box_norm
-
-    left = int(x_min * img_w)
-    top = int(y_min * img_h)
-    right = int(x_max * img_w)
-    bottom = int(y_max * img_h)
-
-    if thickness is None:
-        thickness = max(2, int(min(img_w, img_h) * 0.004))
-
-    fs = max(0.005, min(0.10, float(font_scale or 0.02)))
-    font_size = max(6, int(min(img_w, img_h) * fs))
-    font = _load_font(font_size)
-
-    overlay = Image.new("RGBA", img.size, (0, 0, 0, 0))
-    odraw = ImageDraw.Draw(overlay)
-
-    outline_rgba = with_alpha(color, box_opacity)
-    for i in range(thickness):
-        odraw.rectangle([left - i, top - i, right + i, bottom + i], outline=outline_rgba)
-
-    if not text:
-        return Image.alpha_composite(img, overlay)
-
-    lines = str(text).split("\n")
-    pad = max(3, int(font_size * 0.25))
-    line_gap = max(2, int(font_size * 0.20))
-
-    line_sizes = []
-    max_w = 0
-    total_h = 0
-    for line in lines:
-        bbox = odraw.textbbox((0, 0), line, font=font)
-        w = bbox[2] - bbox[0]
-        h = bbox[3] - bbox[1]
-        line_sizes.append((w, h))
-        max_w = max(max_w, w)
-        total_h += h
-    total_h += line_gap * (len(lines) - 1)
-
-    def _label_rect_for(tx: int, ty: int) -> tuple[int, int, int, int]:
-        bg_left = max(0, int(tx - pad))
-        bg_top = max(0, int(ty - pad))
-        bg_right = min(img_w, int(tx + max_w + pad))
-        bg_bottom = min(img_h, int(ty + total_h + pad))
-        return (bg_left, bg_top, bg_right, bg_bottom)
-
-    candidates = [
-        (left, top - (total_h + 2 * pad)),  # sopra
-        (left, bottom + pad),               # sotto
-        (left, top + pad),                  # dentro
-    ]
-
-    chosen_x, chosen_y = candidates[-1]
-    chosen_rect = _label_rect_for(chosen_x, chosen_y)
-
-    for tx, ty in candidates:
-        tx = max(0, min(img_w - (max_w + pad), tx))
-        ty = max(0, min(img_h - (total_h + pad), ty))
-        rect = _label_rect_for(tx, ty)
-
-        if rect[2] <= rect[0] or rect[3] <= rect[1]:
-            continue
-        if any(_intersects(rect, r) for r in occupied_labels):
-            continue
-
-        chosen_x, chosen_y, chosen_rect = tx, ty, rect
-        break
-
-    bg_rgba = with_alpha((0, 0, 0), label_opacity)
-    # odraw.rectangle(list(chosen_rect), fill=bg_rgba)
-    # raggio proporzionale al font (tweak a piacere)
-    radius = max(3, int(font_size * 0.35))
-
-    try:
-        odraw.rounded_rectangle(list(chosen_rect), radius=radius, fill=bg_rgba)
-    except Exception:
-        # fallback nel caso la tua versione Pillow non supporti rounded_rectangle
-        odraw.rectangle(list(chosen_rect), fill=bg_rgba)
-
-    y = chosen_y
-    for (line, (_w, h)) in zip(lines, line_sizes):
-        odraw.text((chosen_x, y), line, font=font, fill=(255, 255, 255, 255))
-        y += h + line_gap
-
-    occupied_labels.append(chosen_rect)
-
-    return Image.alpha_composite(img, overlay)
+    annot = AFRAnnotator(img, occupied_labels)
+    annot.box(
+        box_norm,
+        text,
+        color,
+        thickness=thickness,
+        box_opacity=box_opacity,
+        label_opacity=label_opacity,
+        font_scale=font_scale,
+    )
+    return annot.render()
 
 
 def get_objects(response: dict):
@@ -842,18 +834,49 @@ class AFRProcessor:
         # Merge defaults so initial behavior matches UI defaults even if entry.options is empty.
         self._opt = merge_defaults(options or {})
 
-        # per-frame state
-        self._image: Optional[Image.Image] = None
-        self._image_width: int = 0
-        self._image_height: int = 0
+        # NOTE: no per-frame state lives on the processor. Every scan builds its own
+        # AFRFrameContext, so concurrent scans (different cameras) do not interfere.
+        self._usage_lock = threading.Lock()
+
+        # per-camera "unchanged frame" gate (signature + result of the last analysed frame)
+        self._frame_gate = AFRFrameGate()
 
-        self._objects = []
-        self._labels = []
-        self._targets_found = []
-        self._faces = []
-        self._person_labels = []
-        self._confidence_details = {}
-        self._person_found = False
+        # recent face matches (skip search_faces_by_image for the same face moments later)
+        self._face_cache = AFRFaceCache()
+        # planner direct searches: head region -> match + face box (own key space)
+        self._head_cache = AFRFaceCache()
+        # recent plate reads per vehicle crop (parked cars cost no detect_text)
+        self._plate_cache = AFRPlateCache()
+        self._configure_caches()
+        # fingerprint of the collection face ids seen by the last faces_index refresh
+        self._faces_fingerprint: Optional[int] = None
+
+        # per-camera person / vehicle tracks (stable ids + carried identities)
+        self._tracker = AFRObjectTracker()
+
+        # bytes actually sent to AWS, per operation
+        self._payload_stats = AFRPayloadStats()
+
+        # per-camera analysis scale learned from observed face / person sizes
+        self._resolution = AFRResolutionPlanner()
+
+        # per-camera detection heatmaps -> auto-learned ROI proposals (created on first scan)
+        self._heatmap: Optional[AFRRoiHeatmap] = None
+
+        # False once Rekognition rejected Settings.GeneralLabels (region / SDK): filter locally
+        self._label_settings_supported = True
+
+        # per-scan choice of the cheapest face calls (+ calls saved since startup)
+        self._planner = AFRCallPlanner()
+
+        # lazy_render: raw frames + detection sidecars, annotated on first request
+        self._snapshots = AFRSnapshotStore(Path(hass.config.path(AFR_SNAPSHOT_DIRNAME)))
+
+        # recognition history: in memory, persisted as snapshot + append-only journal
+        self._index = AFRRecognitionIndex(Path(hass.config.path("www", AFR_SCAN_DIRNAME)))
+
+        # write-behind: ordered background persistence of snapshots / index / S3 uploads
+        self._writer = AFRWriteBehind(on_done=self._publish_writer_stats)
 
         # Optional Cloud Gallery (S3)
         self._s3_client = None
@@ -880,13 +903,30 @@ class AFRProcessor:
         for k in ("roi_x_min", "roi_y_min", "roi_x_max", "roi_y_max"):
             opt.pop(k, None)
         self._opt = opt
+        self._configure_caches()
+
+    def _configure_caches(self) -> None:
+        for cache, conf_ttl, def_ttl, conf_size, def_size in (
+            (self._face_cache, CONF_FACE_CACHE_TTL, DEFAULT_FACE_CACHE_TTL, CONF_FACE_CACHE_SIZE, DEFAULT_FACE_CACHE_SIZE),
+            (self._head_cache, CONF_FACE_CACHE_TTL, DEFAULT_FACE_CACHE_TTL, CONF_FACE_CACHE_SIZE, DEFAULT_FACE_CACHE_SIZE),
+            (self._plate_cache, CONF_PLATE_CACHE_TTL, DEFAULT_PLATE_CACHE_TTL, CONF_PLATE_CACHE_SIZE, DEFAULT_PLATE_CACHE_SIZE),
+        ):
+            try:
+                ttl = float(self._opt.get(conf_ttl, def_ttl) or 0)
+                size = int(self._opt.get(conf_size, def_size) or 0)
+            except (TypeError, ValueError):
+                ttl, size = float(def_ttl), def_size
+            cache.configure(max_entries=size, ttl=ttl)
 
     async def async_bootstrap(self) -> None:
         try:
             folder = folder = self._scan_dir()
             always_latest = bool(self._opt.get("always_save_latest_file"))
+            await self.hass.async_add_executor_job(
+                self._sweep_retention, folder, int(self._opt.get("max_saved_files") or 10)
+            )
             index_data, last_result = await self.hass.async_add_executor_job(
-                _read_bootstrap_from_disk, folder, always_latest
+                _read_bootstrap_from_disk, folder, always_latest, self._index, self._snapshot_exists
             )
             self.hass.data.setdefault(DOMAIN, {})
             self.hass.data[DOMAIN]["index"] = index_data
@@ -926,8 +966,9 @@ class AFRProcessor:
         if not self._collection_id:
             return None
 
-        def _build() -> dict:
+        def _build() -> tuple[dict, int]:
             persons: Dict[str, int] = {}
+            face_ids: list[str] = []
 
             kwargs: Dict[str, Any] = {
                 "CollectionId": self._collection_id,
@@ -940,23 +981,34 @@ class AFRProcessor:
                 for face in resp.get("Faces", []) or []:
                     name = (face.get("ExternalImageId") or "Unknown").strip() or "Unknown"
                     persons[name] = persons.get(name, 0) + 1
+                    face_ids.append(str(face.get("FaceId") or ""))
 
                 token = resp.get("NextToken")
                 if not token:
                     break
                 kwargs["NextToken"] = token
 
-            return {
+            faces_index = {
                 "updated_at": _utc_iso_now(),
                 "persons": {k: {"count": v} for k, v in sorted(persons.items())},
             }
+            return faces_index, hash(tuple(sorted(face_ids)))
 
         try:
-            faces_index = await self.hass.async_add_executor_job(_build)
+            faces_index, fingerprint = await self.hass.async_add_executor_job(_build)
         except Exception as e:
             _LOGGER.warning("%s: refresh_faces_index failed: %s", DOMAIN, e)
             return None
 
+        # collection changed (faces added/removed/renamed): cached identities are stale
+        if fingerprint != self._faces_fingerprint:
+            if self._faces_fingerprint is not None:
+                _LOGGER.debug("%s: collection changed, face cache invalidated", DOMAIN)
+            self._faces_fingerprint = fingerprint
+            self._face_cache.invalidate()
+            self._head_cache.invalidate()
+            self._publish_cache_stats()
+
         try:
             self.hass.loop.call_soon_threadsafe(publish_faces_update, self.hass, faces_index)
         except Exception:
@@ -996,26 +1048,18 @@ class AFRProcessor:
         # usage counters (scan +1)
         self._usage_increment(scans_delta=1, aws_calls_delta=0)
 
-        # reset per-frame
-        self._faces = []
-        self._person_labels = []
-        self._confidence_details = {}
-        self._person_found = False
-        self._targets_found = []
-        self._objects = []
-        self._labels = []
-
-        # 1) open + ROI (per-camera, configured via panel -> entry.options['roi_by_camera'])
+        # 1) decode once + ROI (per-camera, configured via panel -> entry.options['roi_by_camera'])
         # IMPORTANT behavior:
         # - Rekognition runs ONLY on the ROI-cropped image (to reduce costs and false positives).
         # - The saved/annotated snapshot remains the FULL frame.
         #   Therefore every bounding box returned by AWS (relative to the ROI crop)
         #   is re-mapped back onto the full-frame normalized coordinates.
+        # - The JPEG is decoded ONCE (AFRFrame). ROI/scale/crops are views of that buffer and
+        #   JPEG encoding happens only for AWS payloads and files written to disk.
         try:
-            full_img = Image.open(io.BytesIO(bytearray(image)))
-            self._image = full_img
-            full_w, full_h = full_img.size
-            self._image_width, self._image_height = full_w, full_h
+            frame = AFRFrame.from_bytes(image)
+            ctx = AFRFrameContext(camera_entity=camera_entity, frame=frame)
+            full_w, full_h = frame.width, frame.height
 
             # Compute a single bounding ROI that contains all configured ROIs for this camera.
             # If none configured, keep full frame.
@@ -1059,60 +1103,28 @@ class AFRProcessor:
                     x_min, y_min, x_max, y_max = 0.0, 0.0, 1.0, 1.0
 
             roi = {"x_min": x_min, "y_min": y_min, "x_max": x_max, "y_max": y_max}
-
-            # Work image for AWS (ROI crop). Keep FULL frame for output.
-            roi_bytes, (roi_left_px, roi_top_px), roi_img = _apply_roi_and_get_bytes(full_img, roi)
-            roi_w_px, roi_h_px = roi_img.size
-            image = roi_bytes
+            union_px = _roi_to_pixels(roi, full_w, full_h)
+
+            # Work image for AWS (ROI crop, or packed ROI mosaic). Keep FULL frame for output.
+            mosaic = None
+            roi_mode = str(self._opt.get(CONF_ROI_MODE, DEFAULT_ROI_MODE) or "").strip().lower()
+            if roi_mode == ROI_MODE_MOSAIC and len(xs) > 1:
+                mosaic = _build_roi_mosaic(list(zip(xs, ys, x2s, y2s)), full_w, full_h, union_px)
+            if mosaic is not None:
+                frame.set_mosaic(mosaic, union_px)
+            elif roi_mode == ROI_MODE_MASK and xs:
+                frame.set_mask(
+                    union_px,
+                    [
+                        _roi_to_pixels({"x_min": x0, "y_min": y0, "x_max": x1, "y_max": y1}, full_w, full_h)
+                        for x0, y0, x1, y1 in zip(xs, ys, x2s, y2s)
+                    ],
+                )
+            else:
+                frame.set_roi(union_px)
 
             # Store mapping context for this frame (work->full). Used to remap ALL AWS bounding boxes.
-            self._roi_ctx = {
-                "roi_left_px": int(roi_left_px),
-                "roi_top_px": int(roi_top_px),
-                "roi_w_px": int(roi_w_px),
-                "roi_h_px": int(roi_h_px),
-                "full_w": int(full_w),
-                "full_h": int(full_h),
-            }
-
-            def _map_box_work_to_full(bb: dict) -> dict:
-                """Map a normalized bounding box from ROI-work image to full-frame normalized coords."""
-                try:
-                    rx = float(self._roi_ctx.get("roi_left_px", 0))
-                    ry = float(self._roi_ctx.get("roi_top_px", 0))
-                    rw = float(self._roi_ctx.get("roi_w_px", full_w))
-                    rh = float(self._roi_ctx.get("roi_h_px", full_h))
-                    fw = float(self._roi_ctx.get("full_w", full_w))
-                    fh = float(self._roi_ctx.get("full_h", full_h))
-
-                    x_min_w = float(bb.get("x_min", 0.0))
-                    y_min_w = float(bb.get("y_min", 0.0))
-                    x_max_w = float(bb.get("x_max", 1.0))
-                    y_max_w = float(bb.get("y_max", 1.0))
-
-                    x_min_f = _clamp((rx + x_min_w * rw) / fw)
-                    y_min_f = _clamp((ry + y_min_w * rh) / fh)
-                    x_max_f = _clamp((rx + x_max_w * rw) / fw)
-                    y_max_f = _clamp((ry + y_max_w * rh) / fh)
-
-                    # Guard degenerate mapping
-                    if x_max_f <= x_min_f:
-                        x_max_f = _clamp(x_min_f + 0.001)
-                    if y_max_f <= y_min_f:
-                        y_max_f = _clamp(y_min_f + 0.001)
-
-                    return {
-                        "x_min": x_min_f,
-                        "y_min": y_min_f,
-                        "x_max": x_max_f,
-                        "y_max": y_max_f,
-                        "width": _clamp(x_max_f - x_min_f),
-                        "height": _clamp(y_max_f - y_min_f),
-                    }
-                except Exception:
-                    return bb
-
-            self._map_box_work_to_full = _map_box_work_to_full
+            ctx.set_roi_ctx()
         except Exception as e:
             _LOGGER.error("ROI/open error: %s", e)
             return AFRProcessResult(
@@ -1123,25 +1135,67 @@ class AFRProcessor:
         # 2) scale (analysis only)
         # NOTE: scaling now affects ONLY the ROI-work image sent to AWS.
         # The saved snapshot remains full resolution.
-        scale = float(self._opt.get("scale", 1.0) or 1.0)
+        scale, scale_adaptive = self._analysis_scale(camera_entity)
         if scale and scale != 1.0:
             try:
-                # Re-open ROI-work bytes to scale deterministically
-                roi_work = Image.open(io.BytesIO(bytearray(image))).convert("RGB")
-                rw, rh = roi_work.size
-                newsize = (max(1, int(rw * scale)), max(1, int(rh * scale)))
-                roi_work = roi_work.resize(newsize, Image.LANCZOS)
-                with io.BytesIO() as out:
-                    roi_work.save(out, format="JPEG", quality=90)
-                    image = out.getvalue()
+                frame.set_work_scale(scale)
             except Exception as e:
                 _LOGGER.warning("Scale failed (ignored): %s", e)
 
-        # 3) detect_labels (+1 AWS call)
+        # 2b) frame gate: if the ROI is unchanged since the last analysed frame of this camera,
+        # reuse that result and skip every AWS call.
+        gate_sig = None
+        gate_diff = None
+        gate_threshold = float(self._opt.get(CONF_FRAME_GATE_THRESHOLD, DEFAULT_FRAME_GATE_THRESHOLD) or 0.0)
+        if gate_threshold > 0:
+            try:
+                gate_max_age = float(self._opt.get(CONF_FRAME_GATE_MAX_AGE, DEFAULT_FRAME_GATE_MAX_AGE) or 0.0)
+                gate_sig = luma_signature(frame.roi_image)
+                prev_result, gate_diff = self._frame_gate.check(camera_entity, gate_sig, gate_threshold, gate_max_age)
+            except Exception as e:
+                _LOGGER.debug("frame gate failed (ignored): %s", e)
+                prev_result = None
+
+            if prev_result:
+                self._usage_increment(gate_skips_delta=1)
+                reused = dict(prev_result)
+                reused["timestamp"] = _utc_iso_now()
+                reused["frame_gate"] = {"skipped": True, "diff": round(float(gate_diff or 0.0), 3)}
+                _LOGGER.debug("frame gate: %s unchanged (diff=%.3f%%), AWS skipped", camera_entity, gate_diff or 0.0)
+                return AFRProcessResult(
+                    last_result=reused,
+                    index_data=self.hass.data.get(DOMAIN, {}).get("index", {"updated_at": None, "items": []}),
+                )
+
+        # Single JPEG payload of the work image (fitted to the labels budget),
+        # shared by detect_labels / detect_faces.
         try:
-            resp_labels = self._rekognition.detect_labels(Image={"Bytes": image})
-            self._usage_increment(scans_delta=0, aws_calls_delta=1)
-            self._objects, self._labels = get_objects(resp_labels)
+            image = frame.work_payload(self._payload_budget(API_LABELS)).data
+        except Exception as e:
+            _LOGGER.error("ROI/encode error: %s", e)
+            return AFRProcessResult(
+                last_result={},
+                index_data=self.hass.data.get(DOMAIN, {}).get("index", {"updated_at": None, "items": []}),
+            )
+
+        # 3) detect_labels (+1 AWS call), filtered server-side by the configured targets
+        # (skipped by the planner in face_only mode)
+        planner_enabled = bool(self._opt.get(CONF_CALL_PLANNER, DEFAULT_CALL_PLANNER))
+        plan = self._planner.begin(
+            enabled=planner_enabled,
+            face_only=bool(self._opt.get(CONF_FACE_ONLY, DEFAULT_FACE_ONLY)),
+            scan_cars=bool(self._opt.get("scan_cars", False)),
+            has_collection=bool(self._collection_id),
+        )
+        label_request = self._label_request()
+        try:
+            if plan.labels:
+                self._record_payload("detect_labels", image)
+                resp_labels = self._detect_labels(image, label_request)
+                self._usage_increment(scans_delta=0, aws_calls_delta=1)
+                ctx.objects, ctx.labels = get_objects(resp_labels)
+            else:
+                ctx.objects, ctx.labels = [], []
         except botocore.exceptions.ClientError as e:
             _LOGGER.error("detect_labels error: %s", e)
             return AFRProcessResult(
@@ -1150,21 +1204,26 @@ class AFRProcessor:
             )
 
         # Re-map ALL object bounding boxes from ROI-work coordinates back to full-frame coordinates.
-        mapper = getattr(self, "_map_box_work_to_full", None)
-        if callable(mapper):
-            for obj in (self._objects or []):
-                bb = obj.get("bounding_box")
-                if isinstance(bb, dict) and bb:
-                    bb2 = mapper(bb)
-                    obj["bounding_box"] = bb2
-                    # refresh centroid (used for UX/debug)
-                    try:
-                        obj["centroid"] = {
-                            "x": round((float(bb2["x_min"]) + float(bb2["x_max"])) / 2.0, 4),
-                            "y": round((float(bb2["y_min"]) + float(bb2["y_max"])) / 2.0, 4),
-                        }
-                    except Exception:
-                        pass
+        # (mosaic: boxes lying only on the gutter between tiles are dropped;
+        #  mask: boxes whose centroid falls in a blanked area are dropped)
+        mapped_objects = []
+        for obj in (ctx.objects or []):
+            bb = obj.get("bounding_box")
+            if isinstance(bb, dict) and bb:
+                bb2 = ctx.map_box_work_to_full(bb)
+                if bb2 is None or not frame.in_mask(bb2):
+                    continue
+                obj["bounding_box"] = bb2
+                # refresh centroid (used for UX/debug)
+                try:
+                    obj["centroid"] = {
+                        "x": round((float(bb2["x_min"]) + float(bb2["x_max"])) / 2.0, 4),
+                        "y": round((float(bb2["y_min"]) + float(bb2["y_max"])) / 2.0, 4),
+                    }
+                except Exception:
+                    pass
+            mapped_objects.append(obj)
+        ctx.objects = mapped_objects
 
         # 4) filter targets
         excluded_object_labels = {
@@ -1180,307 +1239,117 @@ class AFRProcessor:
             if str(k).strip()
         }
 
-        self._targets_found = []
-        for obj in self._objects:
+        ctx.targets_found = []
+        for obj in ctx.objects:
             name = str(obj.get("name", "")).strip().lower()
             conf = float(obj.get("confidence", 0.0))
             if not name:
                 continue
             if name in exclude_targets:
                 continue
+            if label_request.targets is not None and name not in label_request.targets:
+                continue
             min_conf = float(targets_confidence.get(name, default_min_conf))
             if conf >= min_conf:
-                self._targets_found.append(obj)
+                ctx.targets_found.append(obj)
 
-        persons = [o for o in self._targets_found if o.get("name") == "person"]
-        self._person_found = len(persons) > 0
+        persons = [o for o in ctx.targets_found if o.get("name") == "person"]
+        ctx.person_found = len(persons) > 0
 
         # 4b) --- vehicle scan gate ---
         scan_cars = bool(self._opt.get("scan_cars", False))
-        detected_plates: list[dict] = []
-        vehicle_overlays: list[dict] = []
-
+        show_boxes = bool(self._opt.get("show_boxes", True))
 
-        if scan_cars and self._image is not None:
-            _LOGGER.warning("SCAN_CARS: ENABLED")
+        # 4c) tracking: stable ids for persons / vehicles across scans of this camera
+        vehicles = [o for o in ctx.targets_found if str(o.get("name", "")).lower() in self._vehicle_labels()]
+        self._track_objects(ctx, persons, vehicles if scan_cars else [])
 
-            vehicle_labels = {
-                str(x).strip().lower()
-                for x in (self._opt.get("vehicle_labels") or ["car", "vehicle", "truck", "bus", "motorcycle"])
+        # persons whose tracked identity is still confident: no face search needed for them
+        carried_persons: dict[str, dict] = {}
+        for p in persons:
+            ident = self._carried_identity(ctx, p)
+            if ident and ident.get("name"):
+                carried_persons[p["track_id"]] = ident
+        plan = self._planner.plan_faces(
+            plan,
+            enabled=planner_enabled,
+            persons=persons,
+            carried_track_ids=set(carried_persons),
+            frame_height=frame.height,
+            min_face_px=float(self._opt.get(CONF_MIN_FACE_PX, DEFAULT_MIN_FACE_PX) or DEFAULT_MIN_FACE_PX),
+            # direct search returns no Quality / Pose: quality gates need detect_faces
+            allow_direct=not self._face_gate().needs_details,
+        )
+        faces_needed = plan.faces != FACES_NONE
+
+        # 5) independent branches (they only depend on the labels result):
+        # faces (detect_faces + searches) || vehicles/plates (detect_text) || snapshot base (RGBA);
+        # lazy_render stores the raw frame: no RGBA conversion in the scan
+        branches = run_branches(
+            {
+                "faces": (lambda: self._faces_stage(ctx, image, plan)) if faces_needed else None,
+                "plates": (lambda: self._plates_stage(ctx)) if scan_cars else None,
+                "snapshot": ctx.frame.rgba if show_boxes and not self._lazy_render_enabled() else None,
             }
+        )
+        recognized_names_set = branches["faces"] or set()
+        detected_plates, vehicle_overlays = branches["plates"] or ([], [])
+        self._planner.record(plan)
+        self.hass.data.setdefault(DOMAIN, {})["planner_stats"] = self._planner.stats()
+        _LOGGER.debug("scan plan %s: %s", camera_entity, plan.describe())
 
-            vehicle_min_conf = float(self._opt.get("vehicle_min_confidence", 70.0) or 70.0)
-            plate_min_conf = float(self._opt.get("plate_min_confidence", 70.0) or 70.0)
-
-            _LOGGER.warning(
-                "SCAN_CARS: vehicle_labels=%s vehicle_min_conf=%.1f plate_min_conf=%.1f",
-                vehicle_labels,
-                vehicle_min_conf,
-                plate_min_conf,
-            )
-
-            vehicles = [
-                o for o in self._targets_found
-                if str(o.get("name", "")).lower() in vehicle_labels
-            ]
-
-            def _plate_owner(plate: str) -> str | None:
-                try:
-                    items = (self.hass.data.get(DOMAIN, {}).get("plates", {}) or {}).get("items", {}) or {}
-                    v = items.get(plate)
-                    if isinstance(v, str):
-                        v = v.strip()
-                        return v or None
-                    if isinstance(v, dict):
-                        n = (v.get("name") or v.get("owner") or v.get("person") or "").strip()
-                        return n or None
-                except Exception:
-                    pass
-                return None
-
-
-            def _veh_key(v: dict):
-                bb = v.get("bounding_box") or {}
-                area = (float(bb.get("x_max", 0)) - float(bb.get("x_min", 0))) * (
-                    float(bb.get("y_max", 0)) - float(bb.get("y_min", 0))
-                )
-                return (area, float(v.get("confidence", 0.0) or 0.0))
-
-            vehicles_sorted = sorted(vehicles, key=_veh_key, reverse=True)
-
-            # --- ABS area filter + top-N largest vehicles (conf -> area -> topN) ---
-            vehicle_area_abs_min = float(
-                self._opt.get(CONF_VEHICLE_AREA_ABS_MIN, DEFAULT_VEHICLE_AREA_ABS_MIN) or DEFAULT_VEHICLE_AREA_ABS_MIN
-            )
-            max_vehicles_to_scan = int(
-                self._opt.get(CONF_MAX_VEHICLES_TO_SCAN, DEFAULT_MAX_VEHICLES_TO_SCAN) or DEFAULT_MAX_VEHICLES_TO_SCAN
-            )
-
-            def _veh_area(v: dict) -> float:
-                bb = v.get("bounding_box") or {}
-                return max(0.0, float(bb.get("x_max", 0.0)) - float(bb.get("x_min", 0.0))) * max(
-                    0.0, float(bb.get("y_max", 0.0)) - float(bb.get("y_min", 0.0))
-                )
-
-            before_n = len(vehicles_sorted)
-
-            # 1) filter by confidence first
-            vehicles_sorted = [v for v in vehicles_sorted if float(v.get("confidence", 0.0) or 0.0) >= vehicle_min_conf]
-            after_conf_n = len(vehicles_sorted)
-
-            # 2) filter by absolute area
-            vehicles_sorted = [v for v in vehicles_sorted if _veh_area(v) >= vehicle_area_abs_min]
-            after_area_n = len(vehicles_sorted)
-
-            # 3) take top-N largest (already sorted by your _veh_key)
-            if max_vehicles_to_scan > 0:
-                vehicles_sorted = vehicles_sorted[:max_vehicles_to_scan]
-
-            _LOGGER.warning(
-                "SCAN_CARS: conf_min=%.1f kept=%d/%d | area_abs_min=%.4f kept=%d | topN=%d => final=%d",
-                vehicle_min_conf,
-                after_conf_n,
-                before_n,
-                vehicle_area_abs_min,
-                after_area_n,
-                max_vehicles_to_scan,
-                len(vehicles_sorted),
-            )
-
-
-            for idx, v in enumerate(vehicles_sorted):
-                vconf = float(v.get("confidence", 0.0) or 0.0)
-                if vconf < vehicle_min_conf:
-                    _LOGGER.warning("SCAN_CARS: #%d skip vconf=%.1f < %.1f", idx, vconf, vehicle_min_conf)
-                    continue
-
-                label_text = "vehicle"
-                plate_value = None
-                plate_owner = None
-
-                vb = v.get("bounding_box")
-                if not vb:
-                    _LOGGER.warning("SCAN_CARS: #%d skip no bounding_box", idx)
-                    continue
-
-                area = (float(vb.get("x_max", 0)) - float(vb.get("x_min", 0))) * (
-                    float(vb.get("y_max", 0)) - float(vb.get("y_min", 0))
-                )
-                _LOGGER.warning(
-                    "SCAN_CARS: #%d vehicle=%s vconf=%.1f area=%.4f box=%s",
-                    idx, v.get("name"), vconf, area, vb
-                )
-
-                crop_bytes = _crop_vehicle_for_plate(self._image, vb)
-                _LOGGER.warning("SCAN_CARS: #%d crop_bytes=%d", idx, len(crop_bytes or b""))
-
-                if not crop_bytes:
-                    _LOGGER.warning("SCAN_CARS: #%d skip empty crop", idx)
-                    continue
-
-                # +1 AWS call (detect_text)
-                self._usage_increment(scans_delta=0, aws_calls_delta=1)
-                _LOGGER.warning("SCAN_CARS: #%d running detect_text", idx)
-                txt_resp = self._detect_text_on_image(crop_bytes)
-
-                if not txt_resp:
-                    _LOGGER.warning("SCAN_CARS: #%d detect_text returned None", idx)
-                    continue
-
-                detections = txt_resp.get("TextDetections") or []
-                _LOGGER.warning("SCAN_CARS: #%d detect_text detections=%d", idx, len(detections))
-
-                plate, pconf, geom = _pick_best_plate_from_detect_text(txt_resp, min_conf=plate_min_conf)
-
-                # refine: se ho geometry, crop stretto sulla targa e rilancio detect_text
-                if plate and geom:
-                    try:
-                        crop_img = Image.open(io.BytesIO(crop_bytes)).convert("RGB")
-                        refine_bytes = _crop_by_geometry(crop_img, geom, pad=0.35)
-
-                        self._usage_increment(scans_delta=0, aws_calls_delta=1)
-                        txt2 = self._detect_text_on_image(refine_bytes)
-                        if txt2:
-                            plate2, pconf2, _ = _pick_best_plate_from_detect_text(txt2, min_conf=plate_min_conf)
-                            if plate2 and (len(plate2) >= len(plate)):
-                                plate, pconf = plate2, pconf2
-                    except Exception:
-                        pass
-                if plate:
-                    plate_value = plate
-
-                    # lookup nome associato alla targa
-                    items = (self.hass.data.get(DOMAIN, {}).get("plates", {}) or {}).get("items", {}) or {}
-                    plate_entry = items.get(plate)   # <-- NON usare 'v' qui
-
-                    if isinstance(plate_entry, str):
-                        plate_owner = plate_entry.strip() or None
-                    elif isinstance(plate_entry, dict):
-                        plate_owner = (plate_entry.get("name") or plate_entry.get("owner") or "").strip() or None
-
-                    label_text = plate_owner or plate
-                else:
-                    label_text = "vehicle"
-
-
-
-                # ✅ un solo log finale (niente duplicati "finti")
-                _LOGGER.warning("SCAN_CARS: #%d plate_candidate=%s conf=%.1f", idx, plate, float(pconf or 0.0))
-
-                if plate:
-                    detected_plates.append(
-                        {
-                            "plate": plate,
-                            "confidence": round(float(pconf), 2),
-                            "owner": plate_owner, 
-                            "vehicle_label": str(v.get("name")),
-                            "vehicle_confidence": round(float(vconf), 2),
-                        }
-                    )
-                
-                vehicle_overlays.append(
-                    {
-                        "bounding_box": vb,
-                        "text": label_text,
-                        "vehicle_label": str(v.get("name") or "vehicle"),
-                        "vehicle_confidence": round(float(vconf), 2),
-                        "plate": plate_value,
-                        "owner": plate_owner,
-                    }
-                )
-
-
-        # 5) detect_faces only if person (+1 AWS call)
-        faces_detected = []
-        if self._person_found:
-            try:
-                faces_resp = self._rekognition.detect_faces(Image={"Bytes": image}, Attributes=["DEFAULT"])
-                self._usage_increment(scans_delta=0, aws_calls_delta=1)
-                for fd in faces_resp.get("FaceDetails", []):
-                    bb = fd.get("BoundingBox")
-                    if not bb:
-                        continue
-                    x_min = float(bb["Left"])
-                    y_min = float(bb["Top"])
-                    x_max = x_min + float(bb["Width"])
-                    y_max = y_min + float(bb["Height"])
-                    faces_detected.append(
-                        {
-                            "bounding_box": {
-                                "x_min": _clamp(x_min),
-                                "y_min": _clamp(y_min),
-                                "x_max": _clamp(x_max),
-                                "y_max": _clamp(y_max),
-                            }
-                        }
-                    )
-
-                # Re-map face boxes from ROI-work coords -> full-frame coords
-                mapper = getattr(self, "_map_box_work_to_full", None)
-                if callable(mapper):
-                    for f in faces_detected:
-                        bb = f.get("bounding_box")
-                        if isinstance(bb, dict) and bb:
-                            f["bounding_box"] = mapper(bb)
-            except Exception as e:
-                _LOGGER.error("detect_faces error: %s", e)
-
-        # 6) per-face search
-        recognized_names_set = set()
-        for face in faces_detected:
-            match = None
-            if self._collection_id:
-                face_bytes = self._crop_face_bytes(face["bounding_box"])
-                if face_bytes:
-                    self._usage_increment(scans_delta=0, aws_calls_delta=1)
-                    match = self._search_face_in_collection(face_bytes, threshold=80.0)
-
-            if match:
-                face["name"] = match["name"]
-                face["confidence"] = match["similarity"]
-                recognized_names_set.add(match["name"])
-                prev = self._confidence_details.get(match["name"])
-                if prev is None or match["similarity"] > prev:
-                    self._confidence_details[match["name"]] = match["similarity"]
-            else:
-                face["name"] = "Unknown"
-                face["confidence"] = 0.0
-
-            self._faces.append(face)
-
-        faces_detected_count = len(faces_detected)
-        faces_unknown_count = sum(1 for f in (self._faces or []) if f.get("name") == "Unknown")
+        # faces rejected by the quality gate were never searched: they are not "Unknown" faces,
+        # but their person still has no recognized face (see 6b: same rule as no face at all)
+        faces_unknown_count = sum(1 for f in (ctx.faces or []) if f.get("name") == "Unknown")
 
-        # 7) associate person boxes with best face
+        # 6) associate person boxes with best face
         for p in persons:
             bb = p.get("bounding_box") or {}
             pb = {"x_min": bb.get("x_min"), "y_min": bb.get("y_min"), "x_max": bb.get("x_max"), "y_max": bb.get("y_max")}
             best = None
-            for f in self._faces:
+            for f in ctx.faces:
                 fc = _center_of_box(f["bounding_box"])
-                if _point_in_box(pb, fc) and f.get("name") and f["name"] != "Unknown":
+                if _point_in_box(pb, fc) and f.get("name") and f["name"] not in _UNIDENTIFIED_FACE_NAMES:
                     if best is None or f["confidence"] > best["confidence"]:
                         best = {"name": f["name"], "confidence": f["confidence"]}
 
-            self._person_labels.append(
+            track = ctx.tracks.get(p.get("track_id"))
+            tracked = False
+            if best is None and p.get("track_id") in carried_persons:
+                # identity carried forward from a previous scan of the same track
+                carried = carried_persons[p["track_id"]]
+                best = {"name": carried["name"], "confidence": track.identity_confidence}
+                tracked = True
+                recognized_names_set.add(best["name"])
+                prev = ctx.confidence_details.get(best["name"])
+                if prev is None or best["confidence"] > prev:
+                    ctx.confidence_details[best["name"]] = best["confidence"]
+            elif best is not None and track is not None:
+                self._tracker.set_identity(track, {"name": best["name"]}, float(best["confidence"] or 0.0))
+
+            ctx.person_labels.append(
                 {
                     "bounding_box": pb,
                     "person_confidence": float(p.get("confidence", 0.0)),
                     "matched_name": best["name"] if best else None,
                     "matched_similarity": best["confidence"] if best else None,
+                    "track_id": p.get("track_id"),
+                    "tracked": tracked,
                 }
             )
 
-        # 7b) persons WITHOUT recognized face inside
+        # 6b) persons WITHOUT recognized face inside
         persons_without_recognized_face = []
         for p in persons:
             pb = p.get("bounding_box") or {}
             if not pb:
                 continue
 
-            has_recognized_face = False
-            for f in (self._faces or []):
-                if f.get("name") and f.get("name") != "Unknown":
+            # gated (unsearchable) faces and persons skipped by the planner as too small
+            # count like a person whose face was not seen: the alert still fires
+            has_recognized_face = p.get("track_id") in carried_persons
+            for f in (ctx.faces or []):
+                if f.get("name") and f.get("name") not in _UNIDENTIFIED_FACE_NAMES:
                     fc = _center_of_box(f["bounding_box"])
                     if _point_in_box(pb, fc):
                         has_recognized_face = True
@@ -1489,77 +1358,60 @@ class AFRProcessor:
             if not has_recognized_face:
                 persons_without_recognized_face.append(p)
 
-        # 8) save annotated image + update index
+        if not plan.labels:
+            # face_only skipped detect_labels: there are no person boxes. Every face that was not
+            # recognized (Unknown or gated) stands in for a person, so alerts keep working
+            persons_without_recognized_face = [
+                {"name": "person", "bounding_box": f["bounding_box"], "confidence": float(f.get("confidence") or 0.0)}
+                for f in (ctx.faces or [])
+                if f.get("name") in _UNIDENTIFIED_FACE_NAMES and f.get("bounding_box")
+            ]
+
+        # 7) save annotated image + update index
         save_folder = folder = self._scan_dir()
         save_format = (self._opt.get("save_file_format") or "jpg").lower()
         save_timestamped = bool(self._opt.get("save_timestamped_file"))
         always_latest = bool(self._opt.get("always_save_latest_file"))
         max_saved = int(self._opt.get("max_saved_files") or 10)
 
-        show_boxes = bool(self._opt.get("show_boxes", True))
-
         font_level = int(self._opt.get(CONF_LABEL_FONT_LEVEL, DEFAULT_LABEL_FONT_LEVEL))
         label_font_scale = font_level_to_scale(font_level)
 
         max_red_boxes = int(self._opt.get("max_red_boxes") or 6)
         min_red_area = float(self._opt.get("min_red_box_area") or 0.03)
 
-        saved_file = None
-        objects_summary = self._get_object_summary_for_index(excluded_object_labels, exclude_targets, recognized_names_set)
-
-        if show_boxes and self._image is not None:
-            saved_file = self._save_image(
-                directory=save_folder,
-                recognized_names=sorted(recognized_names_set),
-                objects_summary=objects_summary,
-                save_format=save_format,
-                save_timestamped=save_timestamped,
-                always_latest=always_latest,
-                max_saved=max_saved,
-                label_font_scale=label_font_scale,
-                max_red_boxes=max_red_boxes,
-                min_red_area=min_red_area,
-                persons_without_recognized_face=persons_without_recognized_face,
-                vehicle_overlays=vehicle_overlays if scan_cars else None,
-            )
-        else:
-            try:
-                save_folder.mkdir(parents=True, exist_ok=True)
-            except Exception:
-                pass
+        objects_summary = self._get_object_summary_for_index(ctx, excluded_object_labels, exclude_targets, recognized_names_set)
 
-        # 9) last_result + index_data
+        # 8) last_result + index_data
         recognized_names = sorted(recognized_names_set)
         unknown_person_found = bool(persons_without_recognized_face) or (faces_unknown_count > 0)
         alert = bool(persons_without_recognized_face) and not recognized_names
 
         ts_iso = _utc_iso_now()
 
-        index_data = self.hass.data.get(DOMAIN, {}).get("index", {"updated_at": None, "items": []})
-        if saved_file and save_timestamped:
-            index_data = _update_recognition_index(
-                directory=save_folder,
-                filename=saved_file,
-                timestamp_iso=ts_iso,
-                recognized=recognized_names,
-                unknown_person_found=unknown_person_found,
-                keep=max_saved,
-                objects=objects_summary,
-                plates=detected_plates if scan_cars else None,
-                camera_entity=camera_entity,
-            )
+        # file name decided now: with write-behind the result is published before the file exists
+        stamp = _snapshot_stamp(camera_entity)
+        ext = save_format if save_format in ("jpg", "png") else "jpg"
+        planned_file = None
+        if show_boxes:
+            planned_file = f"recognition_{stamp}.{ext}" if save_timestamped else "recognition_latest.jpg"
+        lazy = bool(planned_file) and self._lazy_render_enabled()
+
+        def _urls(file: Optional[str]) -> tuple[Optional[str], Optional[str]]:
+            if lazy and file:
+                return snapshot_url(file), (snapshot_url(LATEST_NAME) if always_latest else None)
+            base = _folder_to_local_base(save_folder)
+            return (f"{base}/{file}" if file else None), (f"{base}/recognition_latest.jpg" if always_latest else None)
 
-        base = _folder_to_local_base(save_folder)
-        image_url = f"{base}/{saved_file}" if saved_file else None
-        latest_url = f"{base}/recognition_latest.jpg" if always_latest else None
+        image_url, latest_url = _urls(planned_file)
 
         last_result = {
-            "id": Path(saved_file).stem if saved_file else None,
+            "id": Path(planned_file).stem if planned_file else None,
             "timestamp": ts_iso,
             "recognized": recognized_names,
             "unknown_person_found": unknown_person_found,
             "alert": alert,
-            "file": saved_file,
+            "file": planned_file,
             "image_url": image_url,
             "latest_url": latest_url,
             "objects": objects_summary or {},
@@ -1572,16 +1424,106 @@ class AFRProcessor:
             last_result["plates"] = detected_plates
             last_result["vehicles"] = vehicle_overlays
 
-        # Optional Cloud Gallery upload (S3)
+        last_result["analysis_scale"] = scale
+        last_result["plan"] = plan.as_dict()
+        if scale_adaptive:
+            self._observe_sizes(ctx, persons)
+        self._learn_roi(ctx, persons, vehicles if scan_cars else [])
+
+        if gate_sig is not None:
+            last_result["frame_gate"] = {
+                "skipped": False,
+                "diff": round(float(gate_diff), 3) if gate_diff is not None else None,
+            }
+            self._frame_gate.remember(camera_entity, gate_sig, last_result)
+
+        # 9) persist: annotated image (or raw + sidecar), index, retention, S3
+        def _persist() -> tuple[Optional[str], dict]:
+            saved_file = None
+            if show_boxes:
+                saved_file = self._save_image(
+                    ctx,
+                    directory=save_folder,
+                    recognized_names=recognized_names,
+                    objects_summary=objects_summary,
+                    save_format=save_format,
+                    save_timestamped=save_timestamped,
+                    always_latest=always_latest,
+                    label_font_scale=label_font_scale,
+                    max_red_boxes=max_red_boxes,
+                    min_red_area=min_red_area,
+                    persons_without_recognized_face=persons_without_recognized_face,
+                    vehicle_overlays=vehicle_overlays if scan_cars else None,
+                    stamp=stamp,
+                )
+            else:
+                try:
+                    save_folder.mkdir(parents=True, exist_ok=True)
+                except Exception:
+                    pass
+
+            index_data = self.hass.data.get(DOMAIN, {}).get("index", {"updated_at": None, "items": []})
+            if saved_file and save_timestamped:
+                evicted = self._index.add(
+                    _recognition_index_item(
+                        filename=saved_file,
+                        timestamp_iso=ts_iso,
+                        recognized=recognized_names,
+                        unknown_person_found=unknown_person_found,
+                        objects=objects_summary,
+                        plates=detected_plates if scan_cars else None,
+                        camera_entity=camera_entity,
+                        image_url=snapshot_url(saved_file) if lazy else None,
+                    ),
+                    keep=max_saved,
+                )
+                index_data = self._index.view()
+                # retention: exactly what fell off the index (no folder scan)
+                self._drop_snapshots(evicted)
+
+            # Optional Cloud Gallery upload (S3)
+            try:
+                self._cloud_gallery_upload_sync(
+                    directory=save_folder,
+                    saved_file=saved_file,
+                    always_latest=always_latest,
+                )
+            except Exception:
+                pass
+
+            return saved_file, index_data
+
+        def _write() -> tuple[Optional[str], dict, dict]:
+            saved_file, index_data = _persist()
+            final = dict(last_result)
+            if saved_file != planned_file:
+                # write failed / fell back to latest: report what is actually on disk
+                final["file"] = saved_file
+                final["id"] = Path(saved_file).stem if saved_file else None
+                final["image_url"], final["latest_url"] = _urls(saved_file)
+            return saved_file, index_data, final
+
+        # every write runs on the writer thread (FIFO), whatever the mode
+        if bool(self._opt.get(CONF_WRITE_BEHIND, DEFAULT_WRITE_BEHIND)):
+            pending_result = dict(last_result)
+            pending_result["snapshot_pending"] = True
+
+            def _write_behind() -> None:
+                _saved, index_data, final = _write()
+                final["snapshot_pending"] = False
+                try:
+                    self.hass.loop.call_soon_threadsafe(publish_snapshot_saved, self.hass, final, index_data)
+                except Exception:
+                    pass
+
+            self._writer.submit(_write_behind)
+            current_index = self.hass.data.get(DOMAIN, {}).get("index", {"updated_at": None, "items": []})
+            return AFRProcessResult(last_result=pending_result, index_data=current_index)
+
         try:
-            self._cloud_gallery_upload_sync(
-                directory=save_folder,
-                saved_file=saved_file,
-                always_latest=always_latest,
-            )
+            _saved, index_data, last_result = self._writer.submit(_write).result()
         except Exception:
-            pass
-
+            index_data = self.hass.data.get(DOMAIN, {}).get("index", {"updated_at": None, "items": []})
         return AFRProcessResult(last_result=last_result, index_data=index_data)
 
     def _cloud_gallery_upload_sync(self, directory: Path, saved_file: Optional[str], always_latest: bool) -> None:
@@ -1606,7 +1548,8 @@ class AFRProcessor:
         if not prefix:
             prefix = AFR_SCAN_DIRNAME
 
-        # Upload index (if present)
+        # Upload index (if present); the journal is folded into the snapshot first
+        self._index.write_snapshot()
         index_path = directory / "recognition_index.json"
         if index_path.exists():
             _s3_upload_file_sync(self._s3_client, bucket, f"{prefix}/recognition_index.json", index_path)
@@ -1626,11 +1569,24 @@ class AFRProcessor:
     # --------------------------
     # helpers
     # --------------------------
-    def _usage_increment(self, scans_delta: int = 0, aws_calls_delta: int = 0) -> None:
+    def _usage_increment(self, scans_delta: int = 0, aws_calls_delta: int = 0, gate_skips_delta: int = 0) -> None:
+        # Scans may run concurrently on executor threads: serialize counter updates.
+        with self._usage_lock:
+            self._usage_increment_locked(
+                scans_delta=scans_delta,
+                aws_calls_delta=aws_calls_delta,
+                gate_skips_delta=gate_skips_delta,
+            )
+
+    def _usage_increment_locked(self, scans_delta: int = 0, aws_calls_delta: int = 0, gate_skips_delta: int = 0) -> None:
         try:
             store = self.hass.data.get(DOMAIN, {}).get("usage_store")
             if store:
-                store.increment(scans_delta=scans_delta, aws_calls_delta=aws_calls_delta)
+                store.increment(
+                    scans_delta=scans_delta,
+                    aws_calls_delta=aws_calls_delta,
+                    gate_skips_delta=gate_skips_delta,
+                )
                 return
 
             data = self.hass.data.setdefault(DOMAIN, {})
@@ -1642,6 +1598,8 @@ class AFRProcessor:
                     "aws_calls_month": 0,
                     "last_month_scans": 0,
                     "last_month_api_calls": 0,
+                    "gate_skips_month": 0,
+                    "last_month_gate_skips": 0,
                 },
             )
 
@@ -1649,71 +1607,926 @@ class AFRProcessor:
             if usage.get("month") != cur:
                 usage["last_month_scans"] = int(usage.get("scans_month", 0))
                 usage["last_month_api_calls"] = int(usage.get("aws_calls_month", 0))
+                usage["last_month_gate_skips"] = int(usage.get("gate_skips_month", 0))
                 usage["scans_month"] = 0
                 usage["aws_calls_month"] = 0
+                usage["gate_skips_month"] = 0
                 usage["month"] = cur
 
             usage["scans_month"] = int(usage.get("scans_month", 0)) + int(scans_delta or 0)
             usage["aws_calls_month"] = int(usage.get("aws_calls_month", 0)) + int(aws_calls_delta or 0)
+            usage["gate_skips_month"] = int(usage.get("gate_skips_month", 0)) + int(gate_skips_delta or 0)
         except Exception:
             pass
 
-    def _crop_face_bytes(self, face_box_norm: dict) -> bytes:
-        if self._image is None:
-            return b""
+    def _faces_stage(self, ctx: AFRFrameContext, image: bytes, plan: Optional[AFRScanPlan] = None) -> set[str]:
+        """Face branch: detect_faces on the work image + per-face collection searches.
 
-        expanded = _expand_box(face_box_norm, pad=0.15)
-        crop_px = _norm_to_pixels(expanded, self._image_width, self._image_height)
-        face_img = self._image.convert("RGB").crop(crop_px)
-
-        min_side = 160
-        if face_img.size[0] < min_side or face_img.size[1] < min_side:
-            scale = max(min_side / face_img.size[0], min_side / face_img.size[1])
-            new_size = (int(face_img.size[0] * scale), int(face_img.size[1] * scale))
-            face_img = face_img.resize(new_size, Image.LANCZOS)
+        With a "direct" plan a single search on the person's head region replaces both.
+        Fills ctx.faces / ctx.confidence_details and returns the recognized names.
+        """
+        if plan is not None and plan.faces == FACES_DIRECT and plan.direct_person is not None:
+            faces_detected, matches = self._direct_face_search(ctx, plan.direct_person)
+            return self._merge_face_matches(ctx, faces_detected, matches)
 
-        with io.BytesIO() as out:
-            face_img.save(out, format="JPEG", quality=90)
-            return out.getvalue()
+        # detect_faces (+1 AWS call)
+        faces_detected = []
+        try:
+            self._record_payload("detect_faces", image)
+            faces_resp = self._rekognition.detect_faces(Image={"Bytes": image}, Attributes=["DEFAULT"])
+            self._usage_increment(scans_delta=0, aws_calls_delta=1)
+            for fd in faces_resp.get("FaceDetails", []):
+                bb = fd.get("BoundingBox")
+                if not bb:
+                    continue
+                x_min = float(bb["Left"])
+                y_min = float(bb["Top"])
+                x_max = x_min + float(bb["Width"])
+                y_max = y_min + float(bb["Height"])
+                faces_detected.append(
+                    {
+                        "bounding_box": {
+                            "x_min": _clamp(x_min),
+                            "y_min": _clamp(y_min),
+                            "x_max": _clamp(x_max),
+                            "y_max": _clamp(y_max),
+                        },
+                        "quality": face_quality(fd),
+                    }
+                )
 
-    def _search_face_in_collection(self, face_bytes: bytes, threshold: float = 80.0):
-        if not self._collection_id or not face_bytes:
-            return None
+            # Re-map face boxes from ROI-work coords -> full-frame coords
+            for f in faces_detected:
+                bb = f.get("bounding_box")
+                if isinstance(bb, dict) and bb:
+                    f["bounding_box"] = ctx.map_box_work_to_full(bb)
+            faces_detected = [
+                f for f in faces_detected if f.get("bounding_box") and ctx.frame.in_mask(f["bounding_box"])
+            ]
+        except Exception as e:
+            _LOGGER.error("detect_faces error: %s", e)
+
+        # faces inside a person track with a confident identity reuse it (no search)
+        carried = [self._carried_face_match(ctx, f) for f in faces_detected]
+
+        # tiny / blurry / turned-away faces: "unsearchable", no search call
+        gate = self._face_gate()
+        for f, m in zip(faces_detected, carried):
+            if m is None:
+                reason = gate.reject_reason(self._face_px(ctx, f["bounding_box"]), f.get("quality"))
+                if reason:
+                    f["unsearchable"] = reason
+        gated = sum(1 for f in faces_detected if f.get("unsearchable"))
+        if gated and plan is not None:
+            plan.saved += gated
+            plan.notes.append(f"{gated} face(s) unsearchable")
+        to_search = [f for f, m in zip(faces_detected, carried) if m is None and not f.get("unsearchable")]
+
+        # per-face search (bounded concurrent fan-out, merged back in face order)
+        searched = iter(self._search_faces(ctx, to_search))
+        matches = [
+            m if m is not None else (None if f.get("unsearchable") else next(searched))
+            for f, m in zip(faces_detected, carried)
+        ]
+        return self._merge_face_matches(ctx, faces_detected, matches)
+
+    def _face_gate(self) -> FaceGate:
         try:
-            resp = self._rekognition.search_faces_by_image(
-                CollectionId=self._collection_id,
-                Image={"Bytes": face_bytes},
-                MaxFaces=1,
-                FaceMatchThreshold=threshold,
+            return FaceGate(
+                min_px=float(self._opt.get(CONF_FACE_GATE_MIN_PX, DEFAULT_FACE_GATE_MIN_PX) or 0.0),
+                min_sharpness=float(self._opt.get(CONF_FACE_GATE_MIN_SHARPNESS, DEFAULT_FACE_GATE_MIN_SHARPNESS) or 0.0),
+                max_yaw=float(self._opt.get(CONF_FACE_GATE_MAX_YAW, DEFAULT_FACE_GATE_MAX_YAW) or 90.0),
+                max_pitch=float(self._opt.get(CONF_FACE_GATE_MAX_PITCH, DEFAULT_FACE_GATE_MAX_PITCH) or 90.0),
+                min_confidence=float(self._opt.get(CONF_FACE_GATE_MIN_CONFIDENCE, DEFAULT_FACE_GATE_MIN_CONFIDENCE) or 0.0),
             )
-            matches = resp.get("FaceMatches", [])
-            if not matches:
-                return None
-            m = matches[0]
-            name = m["Face"].get("ExternalImageId", "Unknown")
-            sim = float(m.get("Similarity", 0.0))
-            return {"name": name, "similarity": round(sim, 2)}
-        except botocore.exceptions.ClientError as e:
-            _LOGGER.error("search_faces_by_image error: %s", e)
-            return None
-        except Exception as e:
-            _LOGGER.error("search_faces_by_image generic error: %s", e)
-            return None
+        except (TypeError, ValueError):
+            return FaceGate(min_px=float(DEFAULT_FACE_GATE_MIN_PX))
 
-    def _detect_text_on_image(self, image_bytes: bytes) -> dict | None:
+    @staticmethod
+    def _face_px(ctx: AFRFrameContext, box: dict) -> float:
+        """Smaller side of a full-frame face box, in source pixels."""
         try:
-            resp = self._rekognition.detect_text(Image={"Bytes": image_bytes})
-            return resp
-        except botocore.exceptions.ClientError as e:
-            _LOGGER.error("detect_text error: %s", e)
+            return min(
+                (float(box["x_max"]) - float(box["x_min"])) * ctx.frame.width,
+                (float(box["y_max"]) - float(box["y_min"])) * ctx.frame.height,
+            )
+        except (KeyError, TypeError, ValueError):
+            return 0.0
+
+    def _merge_face_matches(self, ctx: AFRFrameContext, faces_detected: list[dict], matches: list) -> set[str]:
+        recognized_names_set: set[str] = set()
+        for face, match in zip(faces_detected, matches):
+            if match:
+                face["name"] = match["name"]
+                face["confidence"] = match["similarity"]
+                recognized_names_set.add(match["name"])
+                prev = ctx.confidence_details.get(match["name"])
+                if prev is None or match["similarity"] > prev:
+                    ctx.confidence_details[match["name"]] = match["similarity"]
+            elif face.get("unsearchable"):
+                face["name"] = FACE_UNSEARCHABLE
+                face["confidence"] = 0.0
+            else:
+                face["name"] = "Unknown"
+                face["confidence"] = 0.0
+
+            ctx.faces.append(face)
+
+        return recognized_names_set
+
+    def _plates_stage(self, ctx: AFRFrameContext) -> tuple[list[dict], list[dict]]:
+        """Vehicle / plate branch (scan_cars). Returns (detected_plates, vehicle_overlays)."""
+        detected_plates: list[dict] = []
+        vehicle_overlays: list[dict] = []
+
+        _LOGGER.warning("SCAN_CARS: ENABLED")
+
+        vehicle_labels = self._vehicle_labels()
+
+        vehicle_min_conf = float(self._opt.get("vehicle_min_confidence", 70.0) or 70.0)
+        plate_min_conf = float(self._opt.get("plate_min_confidence", 70.0) or 70.0)
+
+        _LOGGER.warning(
+            "SCAN_CARS: vehicle_labels=%s vehicle_min_conf=%.1f plate_min_conf=%.1f",
+            vehicle_labels,
+            vehicle_min_conf,
+            plate_min_conf,
+        )
+
+        vehicles = [
+            o for o in ctx.targets_found
+            if str(o.get("name", "")).lower() in vehicle_labels
+        ]
+
+        def _plate_owner(plate: str) -> str | None:
+            try:
+                items = (self.hass.data.get(DOMAIN, {}).get("plates", {}) or {}).get("items", {}) or {}
+                v = items.get(plate)
+                if isinstance(v, str):
+                    v = v.strip()
+                    return v or None
+                if isinstance(v, dict):
+                    n = (v.get("name") or v.get("owner") or v.get("person") or "").strip()
+                    return n or None
+            except Exception:
+                pass
+            return None
+
+
+        def _veh_key(v: dict):
+            bb = v.get("bounding_box") or {}
+            area = (float(bb.get("x_max", 0)) - float(bb.get("x_min", 0))) * (
+                float(bb.get("y_max", 0)) - float(bb.get("y_min", 0))
+            )
+            return (area, float(v.get("confidence", 0.0) or 0.0))
+
+        vehicles_sorted = sorted(vehicles, key=_veh_key, reverse=True)
+
+        # --- ABS area filter + top-N largest vehicles (conf -> area -> topN) ---
+        vehicle_area_abs_min = float(
+            self._opt.get(CONF_VEHICLE_AREA_ABS_MIN, DEFAULT_VEHICLE_AREA_ABS_MIN) or DEFAULT_VEHICLE_AREA_ABS_MIN
+        )
+        max_vehicles_to_scan = int(
+            self._opt.get(CONF_MAX_VEHICLES_TO_SCAN, DEFAULT_MAX_VEHICLES_TO_SCAN) or DEFAULT_MAX_VEHICLES_TO_SCAN
+        )
+
+        def _veh_area(v: dict) -> float:
+            bb = v.get("bounding_box") or {}
+            return max(0.0, float(bb.get("x_max", 0.0)) - float(bb.get("x_min", 0.0))) * max(
+                0.0, float(bb.get("y_max", 0.0)) - float(bb.get("y_min", 0.0))
+            )
+
+        before_n = len(vehicles_sorted)
+
+        # 1) filter by confidence first
+        vehicles_sorted = [v for v in vehicles_sorted if float(v.get("confidence", 0.0) or 0.0) >= vehicle_min_conf]
+        after_conf_n = len(vehicles_sorted)
+
+        # 2) filter by absolute area
+        vehicles_sorted = [v for v in vehicles_sorted if _veh_area(v) >= vehicle_area_abs_min]
+        after_area_n = len(vehicles_sorted)
+
+        # 3) take top-N largest (already sorted by your _veh_key)
+        if max_vehicles_to_scan > 0:
+            vehicles_sorted = vehicles_sorted[:max_vehicles_to_scan]
+
+        _LOGGER.warning(
+            "SCAN_CARS: conf_min=%.1f kept=%d/%d | area_abs_min=%.4f kept=%d | topN=%d => final=%d",
+            vehicle_min_conf,
+            after_conf_n,
+            before_n,
+            vehicle_area_abs_min,
+            after_area_n,
+            max_vehicles_to_scan,
+            len(vehicles_sorted),
+        )
+
+
+        # tracked vehicles whose plate was already read with enough confidence: no detect_text
+        tracked_results: dict[int, tuple[str | None, float]] = {}
+        for idx, v in enumerate(vehicles_sorted):
+            ident = self._carried_identity(ctx, v)
+            if ident and ident.get("plate"):
+                track = ctx.tracks[v["track_id"]]
+                tracked_results[idx] = (ident["plate"], track.identity_confidence)
+
+        # plate cache: same vehicle crop (parked car) read recently -> no detect_text
+        cached_results: dict[int, tuple[str | None, float]] = {}
+        crop_hashes: dict[int, int] = {}
+        if self._plate_cache.enabled:
+            for idx, v in enumerate(vehicles_sorted):
+                vb = v.get("bounding_box")
+                if idx in tracked_results or not vb:
+                    continue
+                try:
+                    crop_hashes[idx] = dhash(_crop_vehicle_for_plate(ctx.frame.image, vb))
+                except Exception:
+                    continue
+                hit = self._plate_cache.get(ctx.camera_entity, vb, crop_hashes[idx])
+                if hit:
+                    cached_results[idx] = (hit.get("plate"), float(hit.get("confidence") or 0.0))
+            self._publish_cache_stats()
+
+        # "regions" mode: one detect_text for all vehicles (tiny plates -> per-crop fallback)
+        region_results: dict[int, tuple[str | None, float]] = {}
+        plate_read_mode = str(self._opt.get(CONF_PLATE_READ_MODE, DEFAULT_PLATE_READ_MODE) or "").strip().lower()
+        pending = [
+            (idx, v)
+            for idx, v in enumerate(vehicles_sorted)
+            if idx not in tracked_results and idx not in cached_results
+        ]
+        if plate_read_mode == PLATE_READ_MODE_REGIONS and pending:
+            res_by_pos = self._read_plates_by_regions(ctx, [v for _, v in pending], plate_min_conf)
+            region_results = {pending[pos][0]: res for pos, res in res_by_pos.items()}
+
+        for idx, v in enumerate(vehicles_sorted):
+            vconf = float(v.get("confidence", 0.0) or 0.0)
+            if vconf < vehicle_min_conf:
+                _LOGGER.warning("SCAN_CARS: #%d skip vconf=%.1f < %.1f", idx, vconf, vehicle_min_conf)
+                continue
+
+            label_text = "vehicle"
+            plate_value = None
+            plate_owner = None
+
+            vb = v.get("bounding_box")
+            if not vb:
+                _LOGGER.warning("SCAN_CARS: #%d skip no bounding_box", idx)
+                continue
+
+            area = (float(vb.get("x_max", 0)) - float(vb.get("x_min", 0))) * (
+                float(vb.get("y_max", 0)) - float(vb.get("y_min", 0))
+            )
+            _LOGGER.warning(
+                "SCAN_CARS: #%d vehicle=%s vconf=%.1f area=%.4f box=%s",
+                idx, v.get("name"), vconf, area, vb
+            )
+
+            track = ctx.tracks.get(v.get("track_id"))
+            tracked = idx in tracked_results
+            cached = idx in cached_results
+            if tracked:
+                plate, pconf = tracked_results[idx]
+                _LOGGER.debug("SCAN_CARS: #%d plate carried by track %s", idx, v.get("track_id"))
+            elif cached:
+                plate, pconf = cached_results[idx]
+                _LOGGER.debug("SCAN_CARS: #%d plate from cache", idx)
+            else:
+                if idx in region_results:
+                    plate, pconf = region_results[idx]
+                    _LOGGER.debug("SCAN_CARS: #%d plate from regions pass", idx)
+                else:
+                    res = self._read_plate_per_crop(ctx, idx, vb, plate_min_conf)
+                    if res is None:
+                        continue
+                    plate, pconf = res
+                if idx in crop_hashes:
+                    self._plate_cache.put(
+                        ctx.camera_entity,
+                        vb,
+                        crop_hashes[idx],
+                        {"plate": plate, "confidence": float(pconf or 0.0)},
+                    )
+
+            if plate and track is not None and not tracked:
+                self._tracker.set_identity(track, {"plate": plate}, float(pconf or 0.0))
+
+            if plate:
+                plate_value = plate
+
+                # lookup nome associato alla targa
+                items = (self.hass.data.get(DOMAIN, {}).get("plates", {}) or {}).get("items", {}) or {}
+                plate_entry = items.get(plate)   # <-- NON usare 'v' qui
+
+                if isinstance(plate_entry, str):
+                    plate_owner = plate_entry.strip() or None
+                elif isinstance(plate_entry, dict):
+                    plate_owner = (plate_entry.get("name") or plate_entry.get("owner") or "").strip() or None
+
+                label_text = plate_owner or plate
+            else:
+                label_text = "vehicle"
+
+
+
+            # ✅ un solo log finale (niente duplicati "finti")
+            _LOGGER.warning("SCAN_CARS: #%d plate_candidate=%s conf=%.1f", idx, plate, float(pconf or 0.0))
+
+            if plate:
+                detected_plates.append(
+                    {
+                        "plate": plate,
+                        "confidence": round(float(pconf), 2),
+                        "owner": plate_owner, 
+                        "vehicle_label": str(v.get("name")),
+                        "vehicle_confidence": round(float(vconf), 2),
+                    }
+                )
+            
+            vehicle_overlays.append(
+                {
+                    "bounding_box": vb,
+                    "text": label_text,
+                    "vehicle_label": str(v.get("name") or "vehicle"),
+                    "vehicle_confidence": round(float(vconf), 2),
+                    "plate": plate_value,
+                    "owner": plate_owner,
+                    "track_id": v.get("track_id"),
+                    "tracked": tracked,
+                    "cached": cached,
+                }
+            )
+
+        return detected_plates, vehicle_overlays
+
+    def _label_request(self) -> LabelRequest:
+        """detect_labels parameters for the current options (see label_filters)."""
+        try:
+            targets_confidence = {
+                str(k).strip().lower(): float(v)
+                for k, v in (self._opt.get("targets_confidence") or {}).items()
+                if str(k).strip()
+            }
+            request = plan_detect_labels(
+                targets_confidence=targets_confidence,
+                default_min_conf=float(self._opt.get("default_min_confidence", 10.0)),
+                exclude_targets=self._opt.get("exclude_targets") or [],
+                vehicle_labels=self._vehicle_labels(),
+                scan_cars=bool(self._opt.get("scan_cars", False)),
+                targets_only=bool(self._opt.get(CONF_TARGETS_ONLY, DEFAULT_TARGETS_ONLY)),
+            )
+        except (TypeError, ValueError) as e:
+            _LOGGER.debug("detect_labels pushdown disabled (bad options): %s", e)
+            return LabelRequest(params={}, targets=None)
+        if not bool(self._opt.get(CONF_LABEL_PUSHDOWN, DEFAULT_LABEL_PUSHDOWN)):
+            # plain request, targets_only still applied locally
+            return LabelRequest(params={}, targets=request.targets)
+        return request
+
+    def _detect_labels(self, image: bytes, request: LabelRequest) -> dict:
+        params = dict(request.params)
+        if request.has_settings:
+            if self._label_settings_supported:
+                try:
+                    return self._rekognition.detect_labels(Image={"Bytes": image}, **params)
+                except botocore.exceptions.ParamValidationError as e:
+                    err = e
+                except botocore.exceptions.ClientError as e:
+                    code = str((getattr(e, "response", None) or {}).get("Error", {}).get("Code", ""))
+                    if code not in ("InvalidParameterException", "ValidationException"):
+                        raise
+                    err = e
+                self._label_settings_supported = False
+                _LOGGER.warning("detect_labels: label filters rejected (%s); filtering locally from now on", err)
+            # same result, filtered after parsing (request.targets / exclude_targets)
+            params.pop("Settings", None)
+            params.pop("Features", None)
+            if request.targets is not None:
+                params.pop("MaxLabels", None)
+        return self._rekognition.detect_labels(Image={"Bytes": image}, **params)
+
+    def _vehicle_labels(self) -> set[str]:
+        return {
+            str(x).strip().lower()
+            for x in (self._opt.get("vehicle_labels") or ["car", "vehicle", "truck", "bus", "motorcycle"])
+        }
+
+    def _track_objects(self, ctx: AFRFrameContext, persons: list[dict], vehicles: list[dict]) -> None:
+        """Assign per-camera track ids (obj["track_id"]) to this scan's persons / vehicles."""
+        try:
+            self._tracker.max_age = float(self._opt.get(CONF_TRACK_MAX_AGE, DEFAULT_TRACK_MAX_AGE) or 0.0)
+            for kind, objs in (("person", persons), ("vehicle", vehicles)):
+                objs = [o for o in objs if isinstance(o.get("bounding_box"), dict) and o["bounding_box"]]
+                tracks = self._tracker.update(ctx.camera_entity, kind, [o["bounding_box"] for o in objs])
+                for obj, track in zip(objs, tracks):
+                    obj["track_id"] = track.track_id
+                    ctx.tracks[track.track_id] = track
+        except Exception as e:
+            _LOGGER.debug("tracker update failed (ignored): %s", e)
+
+    def _carried_identity(self, ctx: AFRFrameContext, obj: dict) -> dict | None:
+        """Identity of the object's track if it can be reused for this scan."""
+        track: AFRTrack | None = ctx.tracks.get(obj.get("track_id"))
+        if track is None or track.is_new:
+            return None
+        try:
+            min_conf = float(
+                self._opt.get(CONF_TRACK_REUSE_MIN_CONFIDENCE, DEFAULT_TRACK_REUSE_MIN_CONFIDENCE) or 0.0
+            )
+            max_age = float(self._opt.get(CONF_TRACK_MAX_AGE, DEFAULT_TRACK_MAX_AGE) or 0.0)
+        except (TypeError, ValueError):
+            return None
+        return track.confident_identity(min_conf, max_age)
+
+    def _carried_face_match(self, ctx: AFRFrameContext, face: dict) -> dict | None:
+        """Match for a face lying inside a person track with a reusable identity."""
+        fc = _center_of_box(face["bounding_box"])
+        for track in ctx.tracks.values():
+            if track.kind != "person" or not _point_in_box(track.box, fc):
+                continue
+            ident = self._carried_identity(ctx, {"track_id": track.track_id})
+            if ident and ident.get("name"):
+                face["tracked"] = True
+                return {"name": ident["name"], "similarity": round(track.identity_confidence, 2)}
+        return None
+
+    def _read_plate_per_crop(
+        self, ctx: AFRFrameContext, idx: int, vb: dict, plate_min_conf: float
+    ) -> tuple[str | None, float] | None:
+        """detect_text on the vehicle crop (+ refine on the plate). None if detect_text failed."""
+        crop_img = _crop_vehicle_for_plate(ctx.frame.image, vb)
+        crop_bytes = self._encode_payload(crop_img, API_TEXT)
+        _LOGGER.warning("SCAN_CARS: #%d crop_bytes=%d", idx, len(crop_bytes or b""))
+
+        if not crop_bytes:
+            _LOGGER.warning("SCAN_CARS: #%d skip empty crop", idx)
+            return None
+
+        # +1 AWS call (detect_text)
+        self._usage_increment(scans_delta=0, aws_calls_delta=1)
+        _LOGGER.warning("SCAN_CARS: #%d running detect_text", idx)
+        txt_resp = self._detect_text_on_image(crop_bytes)
+
+        if not txt_resp:
+            _LOGGER.warning("SCAN_CARS: #%d detect_text returned None", idx)
+            return None
+
+        detections = txt_resp.get("TextDetections") or []
+        _LOGGER.warning("SCAN_CARS: #%d detect_text detections=%d", idx, len(detections))
+
+        plate, pconf, geom = _pick_best_plate_from_detect_text(txt_resp, min_conf=plate_min_conf)
+
+        # refine: se ho geometry, crop stretto sulla targa e rilancio detect_text
+        if plate and geom:
+            try:
+                # refine from the in-memory crop (no JPEG round-trip)
+                refine_bytes = self._encode_payload(_crop_by_geometry(crop_img, geom, pad=0.35), API_TEXT)
+
+                self._usage_increment(scans_delta=0, aws_calls_delta=1)
+                txt2 = self._detect_text_on_image(refine_bytes)
+                if txt2:
+                    plate2, pconf2, _ = _pick_best_plate_from_detect_text(txt2, min_conf=plate_min_conf)
+                    if plate2 and (len(plate2) >= len(plate)):
+                        plate, pconf = plate2, pconf2
+            except Exception:
+                pass
+
+        return plate, pconf
+
+    def _read_plates_by_regions(
+        self, ctx: AFRFrameContext, vehicles: list[dict], plate_min_conf: float
+    ) -> dict[int, tuple[str | None, float]]:
+        """One detect_text call on the ROI work image for all vehicles.
+
+        Every vehicle plate area is passed as a RegionsOfInterest filter and LINE
+        detections are assigned back to the vehicle whose plate area contains
+        their center. Vehicles whose plate area is too small in the work image are
+        not included (the caller falls back to the per-vehicle crop for them).
+        Returns {vehicle_index: (plate|None, conf)}; {} on failure.
+        """
+        try:
+            min_px = int(self._opt.get(CONF_PLATE_REGION_MIN_PX, DEFAULT_PLATE_REGION_MIN_PX) or 0)
+        except Exception:
+            min_px = DEFAULT_PLATE_REGION_MIN_PX
+
+        work_w, _work_h = ctx.frame.work_image.size
+
+        regions: dict[int, tuple[dict, dict]] = {}  # idx -> (full-frame region, work region)
+        for idx, v in enumerate(vehicles):
+            vb = v.get("bounding_box")
+            if not vb:
+                continue
+            region = _vehicle_plate_region(vb)
+            wr = ctx.map_box_full_to_work(region)
+            if (wr["x_max"] - wr["x_min"]) * work_w < min_px or wr["y_max"] <= wr["y_min"]:
+                continue
+            regions[idx] = (region, wr)
+
+        if not regions:
+            return {}
+
+        image = ctx.frame.work_payload(self._payload_budget(API_TEXT)).data
+        items = list(regions.items())
+        detections: list[dict] = []
+        for i in range(0, len(items), _MAX_TEXT_REGIONS):
+            chunk = items[i : i + _MAX_TEXT_REGIONS]
+            rois = [
+                {
+                    "BoundingBox": {
+                        "Left": wr["x_min"],
+                        "Top": wr["y_min"],
+                        "Width": wr["x_max"] - wr["x_min"],
+                        "Height": wr["y_max"] - wr["y_min"],
+                    }
+                }
+                for _, (_, wr) in chunk
+            ]
+            # +1 AWS call (detect_text)
+            self._usage_increment(scans_delta=0, aws_calls_delta=1)
+            resp = self._detect_text_on_image(image, regions=rois)
+            if resp is None:
+                # let every vehicle take the per-crop path
+                return {}
+            detections.extend(resp.get("TextDetections") or [])
+
+        _LOGGER.debug(
+            "SCAN_CARS: regions pass vehicles=%d calls=%d detections=%d",
+            len(regions),
+            (len(items) + _MAX_TEXT_REGIONS - 1) // _MAX_TEXT_REGIONS,
+            len(detections),
+        )
+
+        per_vehicle: dict[int, list[dict]] = {idx: [] for idx in regions}
+        for det in detections:
+            if det.get("Type") != "LINE":
+                continue
+            bb = (det.get("Geometry") or {}).get("BoundingBox") or {}
+            try:
+                left = float(bb.get("Left", 0.0))
+                top = float(bb.get("Top", 0.0))
+                work_box = {
+                    "x_min": left,
+                    "y_min": top,
+                    "x_max": left + float(bb.get("Width", 0.0)),
+                    "y_max": top + float(bb.get("Height", 0.0)),
+                }
+            except Exception:
+                continue
+            full_box = ctx.map_box_work_to_full(work_box)
+            if full_box is None:
+                continue
+            center = _center_of_box(full_box)
+
+            owner = None
+            owner_area = None
+            for idx, (region, _wr) in regions.items():
+                if _point_in_box(region, center):
+                    a = _box_area(region)
+                    if owner_area is None or a < owner_area:
+                        owner, owner_area = idx, a
+            if owner is not None:
+                per_vehicle[owner].append(det)
+
+        out: dict[int, tuple[str | None, float]] = {}
+        for idx, dets in per_vehicle.items():
+            plate, pconf, _ = _pick_best_plate_from_detect_text({"TextDetections": dets}, min_conf=plate_min_conf)
+            out[idx] = (plate, pconf)
+        return out
+
+    def _crop_face_image(self, ctx: AFRFrameContext, face_box_norm: dict) -> Image.Image:
+        frame = ctx.frame
+
+        expanded = _expand_box(face_box_norm, pad=0.15)
+        crop_px = _norm_to_pixels(expanded, frame.width, frame.height)
+        face_img = frame.crop(crop_px)
+
+        min_side = 160
+        if face_img.size[0] < min_side or face_img.size[1] < min_side:
+            scale = max(min_side / face_img.size[0], min_side / face_img.size[1])
+            new_size = (int(face_img.size[0] * scale), int(face_img.size[1] * scale))
+            face_img = face_img.resize(new_size, Image.LANCZOS)
+
+        return face_img
+
+    def _crop_face_bytes(self, ctx: AFRFrameContext, face_box_norm: dict) -> bytes:
+        return self._encode_payload(self._crop_face_image(ctx, face_box_norm), API_FACES)
+
+    def _search_faces(self, ctx: AFRFrameContext, faces: list[dict]) -> list[dict | None]:
+        """Run search_faces_by_image for every face, at most N in parallel.
+
+        Returns one match (or None) per face, in the same order as `faces`, so
+        latency tracks the slowest search instead of the sum of all searches.
+        """
+        if not self._collection_id or not faces:
+            return [None] * len(faces or [])
+
+        cache = self._face_cache
+
+        def _one(face: dict) -> dict | None:
+            try:
+                box = face["bounding_box"]
+                face_img = self._crop_face_image(ctx, box)
+
+                # identity cache: same face, same camera, about the same place -> no AWS call
+                face_hash = None
+                if cache.enabled:
+                    face_hash = dhash(face_img)
+                    cached = cache.get(ctx.camera_entity, box, face_hash)
+                    if cached:
+                        face["cached"] = True
+                        return cached
+
+                face_bytes = self._encode_payload(face_img, API_FACES)
+                if not face_bytes:
+                    return None
+                self._usage_increment(scans_delta=0, aws_calls_delta=1)
+                match = self._search_face_in_collection(face_bytes, threshold=80.0)
+                if match and face_hash is not None:
+                    cache.put(ctx.camera_entity, box, face_hash, match)
+                return match
+            except Exception as e:
+                _LOGGER.error("face search error: %s", e)
+                return None
+
+        try:
+            width = int(
+                self._opt.get(CONF_FACE_SEARCH_CONCURRENCY, DEFAULT_FACE_SEARCH_CONCURRENCY)
+                or DEFAULT_FACE_SEARCH_CONCURRENCY
+            )
+        except Exception:
+            width = DEFAULT_FACE_SEARCH_CONCURRENCY
+        width = max(1, min(width, len(faces)))
+
+        if width == 1:
+            matches = [_one(f) for f in faces]
+        else:
+            with ThreadPoolExecutor(max_workers=width, thread_name_prefix="afr_face_search") as pool:
+                matches = list(pool.map(_one, faces))
+
+        self._publish_cache_stats()
+        return matches
+
+    def _analysis_scale(self, camera_entity: str) -> tuple[float, bool]:
+        """(scale, adaptive) for this camera: per-camera override > adaptive > global `scale`."""
+        base = float(self._opt.get("scale", 1.0) or 1.0)
+
+        by_camera = self._opt.get(CONF_SCALE_BY_CAMERA)
+        if isinstance(by_camera, dict) and by_camera.get(camera_entity):
+            try:
+                return float(by_camera[camera_entity]), False
+            except (TypeError, ValueError):
+                pass
+
+        if not bool(self._opt.get(CONF_ADAPTIVE_SCALE, DEFAULT_ADAPTIVE_SCALE)):
+            return base, False
+        return self._resolution.current(camera_entity, base), True
+
+    def _observe_sizes(self, ctx: AFRFrameContext, persons: list[dict]) -> None:
+        """Feed the resolution planner with this scan's face / person heights (full-frame px)."""
+        try:
+            full_h = float(ctx.frame.height)
+
+            def _h(bb: dict) -> float:
+                return (float(bb.get("y_max", 0.0)) - float(bb.get("y_min", 0.0))) * full_h
+
+            faces = [f["bounding_box"] for f in (ctx.faces or []) if f.get("bounding_box")]
+            face_heights = [_h(fb) for fb in faces]
+            # persons without a detected face: estimated face size, so a scale that lost
+            # the small faces sees them in the history and can climb back up
+            for p in persons:
+                pb = p.get("bounding_box")
+                if pb and not any(_point_in_box(pb, _center_of_box(fb)) for fb in faces):
+                    face_heights.append(_h(pb) * FACE_PER_PERSON)
+
+            base = float(self._opt.get("scale", 1.0) or 1.0)
+            new_scale = self._resolution.observe(
+                ctx.camera_entity,
+                face_heights,
+                [_h(p["bounding_box"]) for p in persons if p.get("bounding_box")],
+                float(self._opt.get(CONF_MIN_FACE_PX, DEFAULT_MIN_FACE_PX) or DEFAULT_MIN_FACE_PX),
+                base,
+            )
+            _LOGGER.debug("adaptive scale: %s -> %.3f", ctx.camera_entity, new_scale)
+        except Exception as e:
+            _LOGGER.debug("adaptive scale update failed (ignored): %s", e)
+
+    def _learn_roi(self, ctx: AFRFrameContext, persons: list[dict], vehicles: list[dict]) -> None:
+        """Add this scan's detections to the camera heatmap and publish the learned ROI proposal."""
+        try:
+            if self._heatmap is None:
+                # private: www/ (the scan folder) is served without auth
+                self._heatmap = AFRRoiHeatmap(
+                    Path(self.hass.config.path(".storage", f"{DOMAIN}_{HEATMAP_FILENAME}")),
+                    legacy_path=self._scan_dir() / HEATMAP_FILENAME,
+                )
+            heatmap = self._heatmap
+            heatmap.migrate_legacy()
+            if not bool(self._opt.get(CONF_ROI_LEARNING, DEFAULT_ROI_LEARNING)) or not heatmap.available:
+                return
+
+            camera_entity = ctx.camera_entity
+            boxes = [
+                o["bounding_box"]
+                for o in (*persons, *(ctx.faces or []), *vehicles)
+                if isinstance(o.get("bounding_box"), dict)
+            ]
+            if not boxes:
+                return
+            samples = heatmap.add(camera_entity, boxes)
+            heatmap.maybe_save()
+
+            coverage = float(self._opt.get(CONF_ROI_LEARN_COVERAGE, DEFAULT_ROI_LEARN_COVERAGE) or DEFAULT_ROI_LEARN_COVERAGE)
+            roi = heatmap.propose(camera_entity, coverage)
+            if roi is None:
+                return
+            proposal = {"id": "auto", "name": "Auto ROI", **roi, "samples": samples}
+            data = self.hass.data.setdefault(DOMAIN, {})
+            data.setdefault("roi_proposals", {})[camera_entity] = proposal
+
+            if bool(self._opt.get(CONF_ROI_AUTO_APPLY, DEFAULT_ROI_AUTO_APPLY)):
+                roi_by_camera = self._opt.get("roi_by_camera")
+                if not (isinstance(roi_by_camera, dict) and roi_by_camera.get(camera_entity)):
+                    # user-drawn ROIs are never replaced (checked again on the loop)
+                    self.hass.loop.call_soon_threadsafe(apply_roi_proposal, self.hass, camera_entity, proposal)
+        except Exception as e:
+            _LOGGER.debug("roi learning failed (ignored): %s", e)
+
+    def flush_roi_heatmap(self) -> None:
+        """Persist pending heatmap updates (blocking; run in the executor)."""
+        if self._heatmap is not None:
+            self._heatmap.maybe_save(force=True)
+
+    def _payload_budget(self, api: str) -> PayloadBudget:
+        budgets = dict(DEFAULT_PAYLOAD_BUDGETS)
+        opt_budgets = self._opt.get(CONF_PAYLOAD_BUDGETS)
+        if isinstance(opt_budgets, dict):
+            budgets.update(opt_budgets)
+        try:
+            max_bytes = int(budgets.get(api) or 0)
+        except (TypeError, ValueError):
+            max_bytes = int(DEFAULT_PAYLOAD_BUDGETS.get(api) or 0)
+        return PayloadBudget.for_api(api, max_bytes)
+
+    def _encode_payload(self, img: Image.Image, api: str) -> bytes:
+        """JPEG bytes for an AWS call, fitted to the API byte budget."""
+        payload = encode_to_budget(img, self._payload_budget(api))
+        if not payload.fits:
+            # detail floor wins over the per-API budget (the 5 MB limit always holds)
+            _LOGGER.debug("%s payload over budget at the detail floor: %d bytes %s", api, len(payload.data), payload.size)
+        return payload.data
+
+    def _record_payload(self, operation: str, data: bytes | None) -> None:
+        try:
+            self._payload_stats.record(operation, len(data or b""))
+            self.hass.data.setdefault(DOMAIN, {})["payload_stats"] = self._payload_stats.snapshot()
+        except Exception:
+            pass
+
+    def _publish_cache_stats(self) -> None:
+        try:
+            data = self.hass.data.setdefault(DOMAIN, {})
+            face, head = self._face_cache.stats(), self._head_cache.stats()
+            # both caches are invalidated together: count invalidations once
+            data["face_cache_stats"] = {
+                k: face[k] + (head.get(k, 0) if k != "invalidations" else 0) for k in face
+            }
+            data["plate_cache_stats"] = self._plate_cache.stats()
+        except Exception:
+            pass
+
+    def _direct_face_search(self, ctx: AFRFrameContext, person: dict) -> tuple[list[dict], list[dict | None]]:
+        """search_faces_by_image on a person's head region (planner: replaces detect_faces).
+
+        Rekognition searches the largest face of the image and returns its box, which is
+        mapped back to full-frame coordinates. No face in the region -> no faces.
+        """
+        if not self._collection_id:
+            return [], []
+        frame = ctx.frame
+        bb = person["bounding_box"]
+        y_min = float(bb["y_min"])
+        head = {
+            "x_min": bb["x_min"],
+            "y_min": y_min,
+            "x_max": bb["x_max"],
+            "y_max": min(float(bb["y_max"]), y_min + (float(bb["y_max"]) - y_min) * 0.45),
+        }
+
+        # same size gate as detected faces, on the face size estimated from the person
+        gate = self._face_gate()
+        est_px = (float(bb["y_max"]) - y_min) * frame.height * FACE_PER_PERSON
+        reason = gate.reject_reason(est_px)
+        if reason:
+            return [{"bounding_box": dict(head), "direct": True, "unsearchable": f"estimated {reason}"}], [None]
+
+        left, top, right, bottom = _norm_to_pixels(_expand_box(head, pad=0.1), frame.width, frame.height)
+        head_img = frame.crop((left, top, right, bottom))
+
+        # identity cache keyed on the head region; every entry keeps its face box
+        cache = self._head_cache
+        head_hash = None
+        if cache.enabled:
+            head_hash = dhash(head_img)
+            cached = cache.get(ctx.camera_entity, head, head_hash)
+            self._publish_cache_stats()
+            if cached:
+                face = {"bounding_box": dict(cached["face_box"]), "direct": True, "cached": True}
+                return [face], [{"name": cached["name"], "similarity": cached["similarity"]}]
+
+        face_bytes = self._encode_payload(head_img, API_FACES)
+        if not face_bytes:
+            return [], []
+
+        self._record_payload("search_faces_by_image", face_bytes)
+        self._usage_increment(scans_delta=0, aws_calls_delta=1)
+        try:
+            resp = self._rekognition.search_faces_by_image(
+                CollectionId=self._collection_id,
+                Image={"Bytes": face_bytes},
+                MaxFaces=1,
+                FaceMatchThreshold=80.0,
+            )
+        except botocore.exceptions.ClientError as e:
+            code = str((getattr(e, "response", None) or {}).get("Error", {}).get("Code", ""))
+            if code != "InvalidParameterException":  # "no faces in the image"
+                _LOGGER.error("search_faces_by_image (direct) error: %s", e)
+            return [], []
+        except Exception as e:
+            _LOGGER.error("search_faces_by_image (direct) generic error: %s", e)
+            return [], []
+
+        sb = resp.get("SearchedFaceBoundingBox")
+        if not sb:
+            return [], []
+        cw, ch = right - left, bottom - top
+        x0 = (left + float(sb["Left"]) * cw) / frame.width
+        y0 = (top + float(sb["Top"]) * ch) / frame.height
+        face = {
+            "bounding_box": {
+                "x_min": _clamp(x0),
+                "y_min": _clamp(y0),
+                "x_max": _clamp(x0 + float(sb["Width"]) * cw / frame.width),
+                "y_max": _clamp(y0 + float(sb["Height"]) * ch / frame.height),
+            },
+            "direct": True,
+        }
+        reason = gate.reject_reason(self._face_px(ctx, face["bounding_box"]))
+        if reason:
+            # the face actually found is below the gate: same outcome as a gated detected face
+            face["unsearchable"] = reason
+            return [face], [None]
+        match = None
+        face_matches = resp.get("FaceMatches", [])
+        if face_matches:
+            m = face_matches[0]
+            match = {"name": m["Face"].get("ExternalImageId", "Unknown"), "similarity": round(float(m.get("Similarity", 0.0)), 2)}
+            if head_hash is not None:
+                cache.put(ctx.camera_entity, head, head_hash, {**match, "face_box": face["bounding_box"]})
+        return [face], [match]
+
+    def _search_face_in_collection(self, face_bytes: bytes, threshold: float = 80.0):
+        if not self._collection_id or not face_bytes:
+            return None
+        self._record_payload("search_faces_by_image", face_bytes)
+        try:
+            resp = self._rekognition.search_faces_by_image(
+                CollectionId=self._collection_id,
+                Image={"Bytes": face_bytes},
+                MaxFaces=1,
+                FaceMatchThreshold=threshold,
+            )
+            matches = resp.get("FaceMatches", [])
+            if not matches:
+                return None
+            m = matches[0]
+            name = m["Face"].get("ExternalImageId", "Unknown")
+            sim = float(m.get("Similarity", 0.0))
+            return {"name": name, "similarity": round(sim, 2)}
+        except botocore.exceptions.ClientError as e:
+            _LOGGER.error("search_faces_by_image error: %s", e)
+            return None
+        except Exception as e:
+            _LOGGER.error("search_faces_by_image generic error: %s", e)
+            return None
+
+    def _detect_text_on_image(self, image_bytes: bytes, regions: list[dict] | None = None) -> dict | None:
+        self._record_payload("detect_text", image_bytes)
+        try:
+            kwargs: Dict[str, Any] = {"Image": {"Bytes": image_bytes}}
+            if regions:
+                kwargs["Filters"] = {"RegionsOfInterest": regions}
+            resp = self._rekognition.detect_text(**kwargs)
+            return resp
+        except botocore.exceptions.ClientError as e:
+            _LOGGER.error("detect_text error: %s", e)
             return None
         except Exception as e:
             _LOGGER.error("detect_text generic error: %s", e)
             return None
 
-    def _get_object_summary_for_index(self, excluded_labels: set, exclude_targets: set, recognized_names_set: set) -> dict:
+    def _get_object_summary_for_index(self, ctx: AFRFrameContext, excluded_labels: set, exclude_targets: set, recognized_names_set: set) -> dict:
         recognized_names_l = {str(n).strip().lower() for n in (recognized_names_set or set())}
-        counts = Counter([str(o.get("name", "")).lower() for o in (self._targets_found or [])])
+        counts = Counter([str(o.get("name", "")).lower() for o in (ctx.targets_found or [])])
 
         out = {}
         for name, count in counts.items():
@@ -1728,20 +2541,184 @@ class AFRProcessor:
             out[name] = int(count)
         return out
 
+    def _snapshot_detections(self, ctx: AFRFrameContext, vehicle_overlays: list[dict] | None) -> dict:
+        """JSON-serializable draw list of the scan (see annotate.render_detections)."""
+
+        def _box(bb: dict) -> list:
+            return [float(bb["y_min"]), float(bb["x_min"]), float(bb["y_max"]), float(bb["x_max"])]
+
+        vehicles = []
+        for vo in vehicle_overlays or []:
+            vb = vo.get("bounding_box") or {}
+            if vb:
+                vehicles.append({"box": _box(vb), "text": str(vo.get("text") or "").strip()})
+
+        persons_found = [o for o in (ctx.targets_found or []) if o.get("name") == "person"]
+        recognized_person_ids = map_recognized_faces_to_person_ids(persons_found, (ctx.faces or []))
+
+        persons = []
+        for p in persons_found:
+            pb = p.get("bounding_box")
+            if not pb:
+                continue
+            persons.append(
+                {
+                    "box": _box(pb),
+                    "area": round(_box_area(pb), 6),
+                    "confidence": float(p.get("confidence", 0.0) or 0.0),
+                    "recognized": id(p) in recognized_person_ids,
+                }
+            )
+
+        faces = []
+        for f in ctx.faces or []:
+            name = f.get("name")
+            fb = f.get("bounding_box")
+            if name and name not in _UNIDENTIFIED_FACE_NAMES and fb:
+                faces.append({"box": _box(fb), "name": str(name)})
+
+        return {"vehicles": vehicles, "persons": persons, "faces": faces}
+
+    def _render_settings(
+        self,
+        font_scale: Optional[float] = None,
+        max_red_boxes: Optional[int] = None,
+        min_red_area: Optional[float] = None,
+    ) -> dict:
+        """Current font / red-box settings (keyword arguments of render_detections)."""
+        if font_scale is None:
+            font_scale = font_level_to_scale(int(self._opt.get(CONF_LABEL_FONT_LEVEL, DEFAULT_LABEL_FONT_LEVEL)))
+        if max_red_boxes is None:
+            max_red_boxes = int(self._opt.get("max_red_boxes") or 6)
+        if min_red_area is None:
+            min_red_area = float(self._opt.get("min_red_box_area") or 0.03)
+
+        targets_conf = self._opt.get("targets_confidence") or {}
+        default_min = float(self._opt.get("default_min_confidence", 10.0) or 10.0)
+        try:
+            person_min_conf = float(targets_conf.get("person", default_min))
+        except Exception:
+            person_min_conf = default_min
+
+        try:
+            min_area = float(min_red_area or 0.0)
+        except Exception:
+            min_area = 0.0
+
+        return {
+            "font_scale": float(font_scale),
+            "person_min_conf": person_min_conf,
+            "min_red_area": min_area,
+            "max_red_boxes": int(max_red_boxes or 0),
+        }
+
+    def _lazy_render_enabled(self) -> bool:
+        # S3 scan upload needs the annotated files on disk: stay eager
+        return bool(self._opt.get(CONF_LAZY_RENDER, DEFAULT_LAZY_RENDER)) and not bool(
+            self._opt.get(CONF_CLOUD_SCAN_UPLOAD_ENABLED, False)
+        )
+
+    def _save_snapshot_lazy(
+        self,
+        ctx: AFRFrameContext,
+        detections: dict,
+        ext: str,
+        save_timestamped: bool,
+        stamp: Optional[str] = None,
+    ) -> Optional[str]:
+        try:
+            data = ctx.frame.source_bytes()
+        except Exception as e:
+            _LOGGER.error("save_image: cannot read frame bytes: %s", e)
+            return None
+
+        meta = {
+            "width": ctx.frame.width,
+            "height": ctx.frame.height,
+            "camera_entity": ctx.camera_entity,
+            "timestamp": _utc_iso_now(),
+        }
+
+        if not self._snapshots.save(LATEST_NAME, data, detections, meta):
+            return None
+        saved_name = LATEST_NAME
+
+        if save_timestamped:
+            stamp = stamp or _snapshot_stamp(ctx.camera_entity)
+            filename = f"recognition_{stamp}.{ext}"
+            if self._snapshots.save(filename, data, detections, meta):
+                saved_name = filename
+
+        return saved_name
+
+    def render_snapshot(self, filename: str) -> Optional[Path]:
+        """Annotated snapshot file for the snapshot view (blocking: run in the executor).
+
+        Lazy snapshots are rendered with the current settings (cached); snapshots
+        saved eagerly are served from the scan folder as they are.
+        """
+        if not valid_snapshot_name(filename):
+            return None
+        if self._snapshots.has(filename):
+            cache_size = int(self._opt.get(CONF_RENDER_CACHE_SIZE, DEFAULT_RENDER_CACHE_SIZE) or DEFAULT_RENDER_CACHE_SIZE)
+            out = self._snapshots.render(filename, self._render_settings(), cache_size)
+            self._publish_render_stats()
+            return out
+        p = Path(self.hass.config.path("www", AFR_SCAN_DIRNAME)) / filename
+        return p if p.is_file() else None
+
+    def _drop_snapshots(self, filenames: list[str]) -> None:
+        """Delete snapshots evicted from the index (scan folder file and/or lazy raw + renders)."""
+        directory = Path(self.hass.config.path("www", AFR_SCAN_DIRNAME))
+        for name in filenames:
+            if not valid_snapshot_name(name) or name == LATEST_NAME:
+                continue
+            try:
+                (directory / name).unlink(missing_ok=True)
+            except Exception:
+                pass
+            self._snapshots.delete(name)
+
+    def _sweep_retention(self, directory: Path, keep: int) -> None:
+        """Startup only: drop files the index does not know about (older versions, crashes)."""
+        _cleanup_old_recognition_files(directory, keep=keep, prefix="recognition_")
+        self._snapshots.prune(keep=keep)
+
+    def _snapshot_exists(self, filename: str) -> bool:
+        """Index entry still backed by a file (scan folder or lazy raw store)."""
+        return (Path(self.hass.config.path("www", AFR_SCAN_DIRNAME)) / filename).is_file() or self._snapshots.has(filename)
+
+    def flush_writes(self) -> None:
+        """Wait for queued snapshot writes and stop the writer thread (entry unload)."""
+        self._writer.shutdown()
+
+    def _publish_writer_stats(self, stats: dict) -> None:
+        try:
+            self.hass.data.setdefault(DOMAIN, {})["write_behind_stats"] = stats
+        except Exception:
+            pass
+
+    def _publish_render_stats(self) -> None:
+        try:
+            self.hass.data.setdefault(DOMAIN, {})["render_cache_stats"] = self._snapshots.cache_stats()
+        except Exception:
+            pass
+
     def _save_image(
         self,
+        ctx: AFRFrameContext,
         directory: Path,
         recognized_names: list[str],
         objects_summary: dict,
         save_format: str,
         save_timestamped: bool,
         always_latest: bool,
-        max_saved: int,
         label_font_scale: float,
         max_red_boxes: int,
         min_red_area: float,
         persons_without_recognized_face: list,
         vehicle_overlays: list[dict] | None = None,
+        stamp: Optional[str] = None,
     ) -> Optional[str]:
         try:
             directory.mkdir(parents=True, exist_ok=True)
@@ -1749,8 +2726,17 @@ class AFRProcessor:
             _LOGGER.error("save_image: cannot ensure directory exists: %s", e)
             return None
 
+        detections = self._snapshot_detections(ctx, vehicle_overlays)
+        ext = (save_format or "jpg").lower()
+        if ext not in ("jpg", "png"):
+            ext = "jpg"
+
+        if self._lazy_render_enabled():
+            # raw frame + sidecar only: rendering happens on the first HTTP request
+            return self._save_snapshot_lazy(ctx, detections, ext, save_timestamped, stamp)
+
         try:
-            img = self._image.convert("RGBA") if self._image else None
+            img = ctx.frame.rgba()
             if img is None:
                 return None
         except UnidentifiedImageError:
@@ -1760,113 +2746,20 @@ class AFRProcessor:
             _LOGGER.error("save_image: cannot convert image: %s", e)
             return None
 
-        occupied_labels: list[tuple[int, int, int, int]] = []
-
-        # --- Vehicles (FUCHSIA) ---
-        if vehicle_overlays:
-            for vo in vehicle_overlays:
-                vb = vo.get("bounding_box") or {}
-                if not vb:
-                    continue
-
-                text = str(vo.get("text") or "").strip() or "vehicle"
-
-                img = draw_box_scaled(
-                    img,
-                    (vb["y_min"], vb["x_min"], vb["y_max"], vb["x_max"]),
-                    img.width,
-                    img.height,
-                    text=text,
-                    color=FUCHSIA,
-                    font_scale=label_font_scale,
-                    occupied_labels=occupied_labels,
-                )
-
-
-        targets_conf = self._opt.get("targets_confidence") or {}
-        default_min = float(self._opt.get("default_min_confidence", 10.0) or 10.0)
-        try:
-            person_min_conf = float(targets_conf.get("person", default_min))
-        except Exception:
-            person_min_conf = default_min
-
-        try:
-            min_area = float(min_red_area or 0.0)
-        except Exception:
-            min_area = 0.0
-
-        persons = [o for o in (self._targets_found or []) if o.get("name") == "person"]
-
-        recognized_person_ids = map_recognized_faces_to_person_ids(persons, (self._faces or []))
-
-        red_candidates: list[tuple[float, float, dict, bool]] = []
-        for p in persons:
-            pb = p.get("bounding_box")
-            if not pb:
-                continue
-
-            w = max(0.0, float(pb["x_max"]) - float(pb["x_min"]))
-            h = max(0.0, float(pb["y_max"]) - float(pb["y_min"]))
-            area = w * h
-            conf = float(p.get("confidence", 0.0) or 0.0)
-
-            if area < min_area:
-                continue
-            if conf < person_min_conf:
-                continue
-
-            is_recognized = id(p) in recognized_person_ids
-            red_candidates.append((area, conf, pb, is_recognized))
-
-        red_candidates.sort(key=lambda t: (t[0], t[1]), reverse=True)
-
-        limit = int(max_red_boxes or 0)
-        if limit <= 0:
-            limit = len(red_candidates)
-
-        for _, __, pb, is_recognized in red_candidates[:limit]:
-            img = draw_box_scaled(
-                img,
-                (pb["y_min"], pb["x_min"], pb["y_max"], pb["x_max"]),
-                img.width,
-                img.height,
-                text="" if is_recognized else "person",
-                color=RED,
-                font_scale=label_font_scale,
-                occupied_labels=occupied_labels,
-            )
-
-        for f in (self._faces or []):
-            name = f.get("name")
-            if not name or name == "Unknown":
-                continue
-
-            fb = f.get("bounding_box")
-            if not fb:
-                continue
-
-            img = draw_box_scaled(
-                img,
-                (fb["y_min"], fb["x_min"], fb["y_max"], fb["x_max"]),
-                img.width,
-                img.height,
-                text=str(name),
-                color=YELLOW,
-                font_scale=label_font_scale,
-                occupied_labels=occupied_labels,
-            )
+        # every box / label goes onto one overlay, composited once at the end
+        img = render_detections(
+            img,
+            detections,
+            **self._render_settings(label_font_scale, max_red_boxes, min_red_area),
+        )
 
         # NOTE (compat/UX):
         # - We ALWAYS write the latest snapshot to recognition_latest.jpg.
-        # - If save_timestamped is enabled, we ALSO write recognition_YYYYmmdd_HHMMSS.<ext>
+        # - If save_timestamped is enabled, we ALSO write recognition_YYYYmmdd_HHMMSS_mmm_<camera>.<ext>
         #   and update recognition_index.json with those timestamped filenames.
         # - We no longer generate recognition.jpg (legacy name) because it creates confusion
         #   and breaks panel assumptions.
 
-        ext = (save_format or "jpg").lower()
-        if ext not in ("jpg", "png"):
-            ext = "jpg"
-
         rgb = None
         try:
             # Prepare RGB once for JPEG outputs (latest is always JPEG).
@@ -1892,7 +2785,7 @@ class AFRProcessor:
 
         # 2) Optionally write timestamped snapshot
         if save_timestamped:
-            stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            stamp = stamp or _snapshot_stamp(ctx.camera_entity)
             filename = f"recognition_{stamp}.{ext}"
             save_path = directory / filename
 
@@ -1908,7 +2801,5 @@ class AFRProcessor:
                 # Keep latest; just skip timestamped.
                 saved_name = "recognition_latest.jpg"
 
-        # Cleanup only timestamped files
-        _cleanup_old_recognition_files(directory, keep=max_saved, prefix="recognition_")
-
+        # retention: files evicted from the recognition index are deleted by the caller
         return saved_name
@@ -0,0 +1,230 @@
+"""In-memory recognition index persisted as snapshot + append-only journal.
+
+Previously every scan re-read recognition_index.json, globbed the scan folder
+to drop entries whose file was gone, re-sorted everything and rewrote the
+whole file (indent=2). Now:
+
+- the index lives in memory, ordered oldest -> newest (an OrderedDict keyed by
+  file); a scan appends its item and trims the oldest beyond `keep`: O(1).
+  `add` returns the files that fell off the list, so retention deletes exactly
+  those instead of globbing the scan folder
+- readers get an AFRIndexView: the newest-first items list is only built when
+  someone asks for it (ws get_index), once per change, not on every scan
+- each scan appends ONE line to recognition_index.jsonl
+- every COMPACT_EVERY journal lines the snapshot recognition_index.json is
+  rewritten atomically and the journal truncated
+- load = snapshot + journal replay. Puts are idempotent (keyed by file), so a
+  crash between snapshot write and journal truncation replays harmlessly; a
+  torn last journal line is ignored. File existence is checked once, here.
+
+recognition_index.json keeps its format (updated_at + items newest first) for
+the S3 upload / sync-down and external readers.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Mapping
+import datetime
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+INDEX_FILENAME = "recognition_index.json"
+JOURNAL_FILENAME = "recognition_index.jsonl"
+COMPACT_EVERY = 50
+
+
+def _utc_iso_now() -> str:
+    return (
+        datetime.datetime.now(datetime.timezone.utc)
+        .replace(microsecond=0)
+        .isoformat()
+        .replace("+00:00", "Z")
+    )
+
+
+def _item_key(it: dict):
+    return (it.get("timestamp") or "", it.get("file") or "")
+
+
+class AFRIndexView(Mapping):
+    """Read-only {"updated_at", "items"} of an index (what hass.data[DOMAIN]["index"] holds)."""
+
+    __slots__ = ("_index",)
+    _KEYS = ("updated_at", "items")
+
+    def __init__(self, index: "AFRRecognitionIndex") -> None:
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "updated_at":
+            return self._index.updated_at
+        if key == "items":
+            return self._index.items()
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+
+class AFRRecognitionIndex:
+    """Recognition history of the scan folder (thread-safe)."""
+
+    def __init__(self, directory: Path) -> None:
+        self._dir = directory
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, dict]" = OrderedDict()
+        # newest-first list, built on demand and dropped on every change
+        self._newest_first: Optional[List[dict]] = None
+        self._updated_at: Optional[str] = None
+        self._journal_lines = 0
+        self._loaded = False
+
+    @property
+    def snapshot_path(self) -> Path:
+        return self._dir / INDEX_FILENAME
+
+    @property
+    def journal_path(self) -> Path:
+        return self._dir / JOURNAL_FILENAME
+
+    # --------------------------
+    # Load / replay
+    # --------------------------
+    def load(self, exists: Optional[Callable[[str], bool]] = None) -> dict:
+        """(Re)build the index from snapshot + journal; entries without a file are dropped."""
+        items: Dict[str, dict] = {}
+        updated_at = None
+
+        try:
+            with self.snapshot_path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                updated_at = data.get("updated_at")
+                for it in data.get("items") or []:
+                    if isinstance(it, dict) and it.get("file"):
+                        items[str(it["file"])] = it
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            _LOGGER.warning("recognition index: unreadable snapshot %s: %s", self.snapshot_path, e)
+
+        lines = 0
+        try:
+            with self.journal_path.open("r", encoding="utf-8") as f:
+                for raw in f:
+                    lines += 1
+                    try:
+                        rec = json.loads(raw)
+                    except ValueError:
+                        # torn write (crash while appending): skip
+                        continue
+                    it = rec.get("item") if isinstance(rec, dict) else None
+                    if isinstance(it, dict) and it.get("file"):
+                        items[str(it["file"])] = it
+                        updated_at = rec.get("at") or updated_at
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            _LOGGER.warning("recognition index: journal replay failed: %s", e)
+
+        if exists is not None:
+            items = {k: v for k, v in items.items() if exists(k)}
+
+        with self._lock:
+            self._items = OrderedDict((str(it["file"]), it) for it in sorted(items.values(), key=_item_key))
+            self._newest_first = None
+            self._updated_at = updated_at or _utc_iso_now()
+            self._journal_lines = lines
+            self._loaded = True
+            return self._as_dict_locked()
+
+    # --------------------------
+    # Scan side
+    # --------------------------
+    def add(self, item: dict, keep: int) -> List[str]:
+        """Append a scan item (newest), trim to `keep`, journal it; returns the evicted files."""
+        if not self._loaded:
+            self.load()
+
+        filename = str(item["file"])
+        now = _utc_iso_now()
+        line = json.dumps({"at": now, "item": item}, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+        evicted: List[str] = []
+        with self._lock:
+            self._items.pop(filename, None)
+            self._items[filename] = item
+            while len(self._items) > max(1, int(keep)):
+                evicted.append(self._items.popitem(last=False)[0])
+            self._newest_first = None
+            self._updated_at = now
+
+            try:
+                self._dir.mkdir(parents=True, exist_ok=True)
+                with self.journal_path.open("a", encoding="utf-8") as f:
+                    f.write(line)
+                self._journal_lines += 1
+            except Exception as e:
+                _LOGGER.warning("recognition index: cannot append journal: %s", e)
+
+            if self._journal_lines >= max(COMPACT_EVERY, int(keep)):
+                self._compact_locked()
+            return evicted
+
+    def write_snapshot(self) -> None:
+        """Compact now (snapshot up to date on disk, e.g. before an S3 upload)."""
+        with self._lock:
+            if self._loaded:
+                self._compact_locked()
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return self._as_dict_locked()
+
+    def view(self) -> AFRIndexView:
+        return AFRIndexView(self)
+
+    @property
+    def updated_at(self) -> Optional[str]:
+        return self._updated_at
+
+    def items(self) -> List[dict]:
+        """Items newest first (shared list: do not mutate)."""
+        with self._lock:
+            return self._items_locked()
+
+    # --------------------------
+    # internals
+    # --------------------------
+    def _items_locked(self) -> List[dict]:
+        if self._newest_first is None:
+            self._newest_first = list(reversed(self._items.values()))
+        return self._newest_first
+
+    def _as_dict_locked(self) -> Dict[str, Any]:
+        return {"updated_at": self._updated_at, "items": list(self._items_locked())}
+
+    def _compact_locked(self) -> None:
+        tmp = self.snapshot_path.with_suffix(".json.tmp")
+        try:
+            self._dir.mkdir(parents=True, exist_ok=True)
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(self._as_dict_locked(), f, ensure_ascii=False, separators=(",", ":"))
+                f.write("\n")
+            os.replace(tmp, self.snapshot_path)
+            # snapshot first: a crash here only leaves journal entries that replay idempotently
+            with self.journal_path.open("w", encoding="utf-8"):
+                pass
+            self._journal_lines = 0
+        except Exception as e:
+            _LOGGER.warning("recognition index: compaction failed: %s", e)
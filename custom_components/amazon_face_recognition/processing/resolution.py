@@ -0,0 +1,116 @@
+"""Adaptive per-camera analysis resolution.
+
+The global `scale` option applies the same factor to every camera, but a
+close-range doorbell sees 300 px faces while a wide-angle yard camera sees
+40 px ones. For every camera the planner remembers the pixel height (full
+frame) of recently detected faces, plus an estimate (person height x
+FACE_PER_PERSON) for every person whose face was NOT detected: a scale that is
+too low loses exactly the small faces, and without those estimates the history
+would only hold the faces still found and never ask to go back up. It then
+picks the smallest analysis scale that keeps a "small" face (20th percentile)
+above `min_face_px`.
+
+Scales are powers of two (1/4, 1/2, 1): JPEG draft decoding produces exactly
+these sizes (DCT scaling 1/2, 1/4, 1/8), so the analysis image needs no extra
+full decode + resample.
+Hysteresis: the scale goes up immediately when faces would fall below the
+minimum, and goes down only after DOWN_CONFIRMATIONS consecutive scans agree.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+import threading
+from typing import Deque, Dict, Iterable, Optional
+
+SCALE_STEPS = (0.25, 0.5, 1.0)
+HISTORY = 50
+MIN_SAMPLES = 5
+DOWN_CONFIRMATIONS = 3
+# margin over the minimum face size (a face at the limit is a bad face)
+MARGIN = 1.2
+# face height / person height (head ~ 1/7.5 of the body)
+FACE_PER_PERSON = 0.13
+
+
+@dataclass(slots=True)
+class _CameraState:
+    faces: Deque[float] = field(default_factory=lambda: deque(maxlen=HISTORY))
+    persons: Deque[float] = field(default_factory=lambda: deque(maxlen=HISTORY))
+    scale: Optional[float] = None
+    down_votes: int = 0
+
+
+def _percentile(values: Iterable[float], pct: float) -> float:
+    vals = sorted(values)
+    if not vals:
+        return 0.0
+    k = max(0, min(len(vals) - 1, int(round((len(vals) - 1) * pct))))
+    return vals[k]
+
+
+def _quantize_up(scale: float) -> float:
+    for step in SCALE_STEPS:
+        if step >= scale:
+            return step
+    return SCALE_STEPS[-1]
+
+
+class AFRResolutionPlanner:
+    """Per-camera analysis scale learned from observed face / person sizes."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cameras: Dict[str, _CameraState] = {}
+
+    def current(self, camera_entity: str, default_scale: float) -> float:
+        with self._lock:
+            st = self._cameras.get(camera_entity)
+            if st is None or st.scale is None:
+                return float(default_scale)
+            return st.scale
+
+    def observe(
+        self,
+        camera_entity: str,
+        face_heights_px: Iterable[float],
+        person_heights_px: Iterable[float],
+        min_face_px: float,
+        default_scale: float,
+    ) -> float:
+        """Record this scan's sizes (full-frame pixels) and return the scale for the next scan."""
+        with self._lock:
+            st = self._cameras.setdefault(camera_entity, _CameraState())
+            st.faces.extend(float(h) for h in face_heights_px if h and h > 0)
+            st.persons.extend(float(h) for h in person_heights_px if h and h > 0)
+            if st.scale is None:
+                st.scale = _quantize_up(float(default_scale))
+
+            if len(st.faces) >= MIN_SAMPLES:
+                small_face = _percentile(st.faces, 0.2)
+            elif len(st.persons) >= MIN_SAMPLES:
+                small_face = _percentile(st.persons, 0.2) * FACE_PER_PERSON
+            else:
+                return st.scale
+
+            wanted = _quantize_up(min(1.0, (float(min_face_px) * MARGIN) / max(1.0, small_face)))
+            if wanted > st.scale:
+                st.scale = wanted
+                st.down_votes = 0
+            elif wanted < st.scale:
+                st.down_votes += 1
+                if st.down_votes >= DOWN_CONFIRMATIONS:
+                    # one step at a time
+                    st.scale = SCALE_STEPS[max(0, SCALE_STEPS.index(st.scale) - 1)]
+                    st.down_votes = 0
+            else:
+                st.down_votes = 0
+            return st.scale
+
+    def forget(self, camera_entity: Optional[str] = None) -> None:
+        with self._lock:
+            if camera_entity is None:
+                self._cameras.clear()
+            else:
+                self._cameras.pop(camera_entity, None)
@@ -0,0 +1,183 @@
+"""Per-camera detection heatmaps and auto-learned ROI proposals.
+
+Every scan adds the full-frame boxes of detected persons, faces and vehicles
+to a small per-camera grid (GRID x GRID cells, float32). From that history a
+tighter analysis ROI is proposed: the rectangle that keeps `coverage` of the
+accumulated detection mass along each axis, padded by one cell.
+
+Heatmaps are persisted as a compressed .npz (one array per camera) under
+/config/.storage, NOT in the scan folder: www/ is served without auth under
+/local/ and the heatmap is a record of camera activity. Saved at most every
+SAVE_INTERVAL seconds. A heatmap left in the scan folder by older versions is
+moved on first load.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ships with Home Assistant
+    np = None
+
+_LOGGER = logging.getLogger(__name__)
+
+GRID = 32
+MIN_SAMPLES = 50
+SAVE_INTERVAL = 60.0
+HEATMAP_FILENAME = "roi_heatmap.npz"
+
+# npz member names: "cam_<entity id with '.' -> '-'>" ('-' never appears in entity ids)
+_KEY_PREFIX = "cam_"
+
+
+def _cells(v0: float, v1: float) -> tuple[int, int]:
+    a = max(0, min(GRID - 1, int(v0 * GRID)))
+    b = max(a + 1, min(GRID, int(np.ceil(v1 * GRID))))
+    return a, b
+
+
+def _trim(profile, coverage: float) -> tuple[int, int]:
+    """Smallest [lo, hi) keeping `coverage` of the mass (equal tails trimmed)."""
+    cdf = np.cumsum(profile)
+    total = float(cdf[-1])
+    tail = total * (1.0 - coverage) / 2.0
+    lo = int(np.searchsorted(cdf, tail, side="right"))
+    hi = int(np.searchsorted(cdf, total - tail, side="left")) + 1
+    return max(0, lo), min(len(profile), max(hi, lo + 1))
+
+
+class AFRRoiHeatmap:
+    """Thread-safe per-camera detection heatmaps (see module docstring)."""
+
+    def __init__(self, path: Path, legacy_path: Optional[Path] = None) -> None:
+        self._path = Path(path)
+        self._legacy_path = Path(legacy_path) if legacy_path is not None else None
+        self._lock = threading.Lock()
+        self._maps: Dict[str, "np.ndarray"] = {}
+        self._samples: Dict[str, int] = {}
+        self._loaded = False
+        self._dirty = False
+        self._saved_at = 0.0
+
+    @property
+    def available(self) -> bool:
+        return np is not None
+
+    def _load_locked(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        self._migrate_legacy_locked()
+        if not self._path.exists():
+            return
+        try:
+            with np.load(self._path) as data:
+                for key in data.files:
+                    if key.startswith(_KEY_PREFIX):
+                        cam = key[len(_KEY_PREFIX):].replace("-", ".")
+                        arr = data[key].astype(np.float32)
+                        if arr.shape == (GRID, GRID):
+                            self._maps[cam] = arr
+                            n_key = f"n_{key}"
+                            self._samples[cam] = int(data[n_key]) if n_key in data.files else 0
+        except Exception as e:
+            _LOGGER.warning("roi heatmap: failed to load %s: %s", self._path, e)
+
+    def migrate_legacy(self) -> None:
+        """Take the heatmap out of www/ even while learning is off (cheap after the first call)."""
+        with self._lock:
+            self._migrate_legacy_locked()
+
+    def _migrate_legacy_locked(self) -> None:
+        """Move (or drop, if already migrated) the publicly served heatmap of older versions."""
+        legacy, self._legacy_path = self._legacy_path, None
+        if legacy is None or not legacy.exists():
+            return
+        try:
+            if self._path.exists():
+                legacy.unlink()
+            else:
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(legacy, self._path)
+        except Exception as e:
+            _LOGGER.warning("roi heatmap: cannot move %s out of www: %s", legacy, e)
+
+    def add(self, camera_entity: str, boxes: Iterable[dict]) -> int:
+        """Accumulate normalized full-frame boxes; returns the camera sample count."""
+        if np is None:
+            return 0
+        with self._lock:
+            self._load_locked()
+            hm = self._maps.get(camera_entity)
+            if hm is None:
+                hm = self._maps[camera_entity] = np.zeros((GRID, GRID), dtype=np.float32)
+            n = 0
+            for bb in boxes:
+                try:
+                    x0, x1 = _cells(float(bb["x_min"]), float(bb["x_max"]))
+                    y0, y1 = _cells(float(bb["y_min"]), float(bb["y_max"]))
+                except Exception:
+                    continue
+                # one unit of mass per detection, spread over its cells
+                hm[y0:y1, x0:x1] += 1.0 / float((x1 - x0) * (y1 - y0))
+                n += 1
+            if n:
+                self._samples[camera_entity] = self._samples.get(camera_entity, 0) + n
+                self._dirty = True
+            return self._samples.get(camera_entity, 0)
+
+    def propose(self, camera_entity: str, coverage: float = 0.99) -> Optional[dict]:
+        """ROI {x, y, w, h} (normalized) covering `coverage` of past detections, or None."""
+        if np is None:
+            return None
+        with self._lock:
+            self._load_locked()
+            hm = self._maps.get(camera_entity)
+            if hm is None or self._samples.get(camera_entity, 0) < MIN_SAMPLES or float(hm.sum()) <= 0:
+                return None
+            coverage = max(0.5, min(1.0, float(coverage)))
+            x0, x1 = _trim(hm.sum(axis=0), coverage)
+            y0, y1 = _trim(hm.sum(axis=1), coverage)
+
+        # one cell of margin around the learned area
+        x0, y0 = max(0, x0 - 1), max(0, y0 - 1)
+        x1, y1 = min(GRID, x1 + 1), min(GRID, y1 + 1)
+        return {
+            "x": round(x0 / GRID, 4),
+            "y": round(y0 / GRID, 4),
+            "w": round((x1 - x0) / GRID, 4),
+            "h": round((y1 - y0) / GRID, 4),
+        }
+
+    def samples(self, camera_entity: str) -> int:
+        with self._lock:
+            self._load_locked()
+            return self._samples.get(camera_entity, 0)
+
+    def maybe_save(self, force: bool = False) -> None:
+        if np is None:
+            return
+        with self._lock:
+            if not self._dirty or (not force and time.monotonic() - self._saved_at < SAVE_INTERVAL):
+                return
+            arrays = {}
+            for cam, hm in self._maps.items():
+                key = _KEY_PREFIX + cam.replace(".", "-")
+                arrays[key] = hm
+                arrays[f"n_{key}"] = np.array(self._samples.get(cam, 0))
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._path.with_name(self._path.name + ".tmp.npz")
+            np.savez_compressed(tmp, **arrays)
+            tmp.replace(self._path)
+        except Exception as e:
+            _LOGGER.warning("roi heatmap: failed to save %s: %s", self._path, e)
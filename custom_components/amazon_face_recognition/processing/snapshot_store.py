@@ -0,0 +1,205 @@
+"""Raw snapshots + detection sidecars, rendered on demand (lazy_render).
+
+Instead of drawing and encoding an annotated JPEG per scan, the scan stores
+
+    raw/<file>.frame   original camera bytes (no decode / re-encode)
+    raw/<file>.json    detection list + frame metadata (see annotate.render_detections)
+
+and the snapshot view renders `<file>` on first request. Rendered images are
+kept in render/ as `<stem>-<settings signature>.<ext>`: changing the label font
+or red-box settings produces a new signature, so history is re-rendered with
+the new look without rescanning. The render cache is a bounded LRU on file
+mtime (a cache hit touches the file).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import logging
+import os
+from pathlib import Path
+import re
+import threading
+from typing import Any, Dict, Mapping, Optional, Set
+
+from PIL import Image
+
+from .annotate import render_detections
+
+_LOGGER = logging.getLogger(__name__)
+
+SNAPSHOT_URL_BASE = "/api/amazon_face_recognition/snapshot"
+LATEST_NAME = "recognition_latest.jpg"
+
+_NAME_RE = re.compile(r"^recognition_[0-9A-Za-z_]+\.(jpg|png)$")
+
+
+def valid_snapshot_name(name: str) -> bool:
+    """Only scan snapshot names (no paths) are served."""
+    return bool(_NAME_RE.match(name or ""))
+
+
+def snapshot_url(name: str) -> str:
+    return f"{SNAPSHOT_URL_BASE}/{name}"
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class AFRSnapshotStore:
+    """raw/ (frames + sidecars) and render/ (LRU cache) under one root folder."""
+
+    def __init__(self, root: Path) -> None:
+        self.raw_dir = root / "raw"
+        self.render_dir = root / "render"
+        self._lock = threading.Lock()
+
+    # --------------------------
+    # Scan side
+    # --------------------------
+    def save(self, name: str, frame_bytes: bytes, detections: Mapping[str, Any], meta: Mapping[str, Any]) -> bool:
+        """Store the raw frame + sidecar of snapshot `name`; drops its stale renders.
+
+        Runs under the render lock: a render in progress cannot read the old
+        frame and publish it after the drop (stale recognition_latest-<sig>).
+        """
+        sidecar = json.dumps({"file": name, **dict(meta), "detections": detections}, separators=(",", ":"))
+        with self._lock:
+            try:
+                self.raw_dir.mkdir(parents=True, exist_ok=True)
+                # frame first: a sidecar always points to a complete frame
+                _atomic_write(self.raw_dir / f"{name}.frame", frame_bytes)
+                _atomic_write(self.raw_dir / f"{name}.json", sidecar.encode("utf-8"))
+            except Exception as e:
+                _LOGGER.error("snapshot_store: cannot save %s: %s", name, e)
+                return False
+            self._drop_renders(Path(name).stem)
+        return True
+
+    def files(self) -> Set[str]:
+        """Snapshot names with a stored sidecar (latest excluded)."""
+        try:
+            names = {p.name[: -len(".json")] for p in self.raw_dir.glob("recognition_*.json")}
+        except Exception:
+            return set()
+        names.discard(LATEST_NAME)
+        return names
+
+    def prune(self, keep: int) -> None:
+        """Keep the `keep` most recent timestamped snapshots (and their renders)."""
+        try:
+            keep = int(keep)
+            if keep < 1:
+                return
+            sidecars = sorted(
+                (p for p in self.raw_dir.glob("recognition_*.json") if p.name != f"{LATEST_NAME}.json"),
+                key=lambda p: p.stat().st_mtime,
+                reverse=True,
+            )
+        except Exception:
+            return
+        with self._lock:
+            for p in sidecars[keep:]:
+                name = p.name[: -len(".json")]
+                for f in (p, self.raw_dir / f"{name}.frame"):
+                    try:
+                        f.unlink(missing_ok=True)
+                    except Exception:
+                        pass
+                self._drop_renders(Path(name).stem)
+
+    def delete(self, name: str) -> None:
+        """Remove snapshot `name` (frame, sidecar, renders)."""
+        with self._lock:
+            for f in (self.raw_dir / f"{name}.json", self.raw_dir / f"{name}.frame"):
+                try:
+                    f.unlink(missing_ok=True)
+                except Exception:
+                    pass
+            self._drop_renders(Path(name).stem)
+
+    # --------------------------
+    # Render side
+    # --------------------------
+    def has(self, name: str) -> bool:
+        return (self.raw_dir / f"{name}.json").is_file()
+
+    def render(self, name: str, settings: Mapping[str, Any], cache_size: int) -> Optional[Path]:
+        """Path of the annotated `name` for these render settings (rendered on a cache miss)."""
+        if not valid_snapshot_name(name) or not self.has(name):
+            return None
+
+        sig = hashlib.sha1(json.dumps(dict(settings), sort_keys=True).encode("utf-8")).hexdigest()[:10]
+        ext = Path(name).suffix.lower()
+        out = self.render_dir / f"{Path(name).stem}-{sig}{ext}"
+
+        with self._lock:
+            if out.is_file():
+                try:
+                    os.utime(out)  # LRU touch
+                except Exception:
+                    pass
+                return out
+
+            try:
+                sidecar = json.loads((self.raw_dir / f"{name}.json").read_text(encoding="utf-8"))
+                with Image.open(io.BytesIO((self.raw_dir / f"{name}.frame").read_bytes())) as src:
+                    img = src.convert("RGBA")
+                img = render_detections(img, sidecar.get("detections") or {}, **settings)
+
+                self.render_dir.mkdir(parents=True, exist_ok=True)
+                buf = io.BytesIO()
+                if ext == ".png":
+                    img.save(buf, format="PNG", optimize=True)
+                else:
+                    img.convert("RGB").save(buf, format="JPEG", quality=85, subsampling=2)
+                _atomic_write(out, buf.getvalue())
+            except Exception as e:
+                _LOGGER.warning("snapshot_store: cannot render %s: %s", name, e)
+                return None
+
+            self._evict(cache_size)
+        return out
+
+    def cache_stats(self) -> Dict[str, int]:
+        rendered = total = 0
+        # under the lock: _evict / _drop_renders cannot unlink between glob and stat
+        with self._lock:
+            try:
+                paths = list(self.render_dir.glob("recognition_*"))
+            except Exception:
+                paths = []
+            for p in paths:
+                try:
+                    total += p.stat().st_size
+                except OSError:
+                    continue
+                rendered += 1
+        return {"rendered": rendered, "bytes": total}
+
+    def _evict(self, cache_size: int) -> None:
+        try:
+            files = sorted(
+                (p for p in self.render_dir.glob("recognition_*") if p.is_file() and not p.name.endswith(".tmp")),
+                key=lambda p: p.stat().st_mtime,
+                reverse=True,
+            )
+        except Exception:
+            return
+        for p in files[max(1, int(cache_size)):]:
+            try:
+                p.unlink(missing_ok=True)
+            except Exception:
+                pass
+
+    def _drop_renders(self, stem: str) -> None:
+        try:
+            for p in self.render_dir.glob(f"{stem}-*"):
+                p.unlink(missing_ok=True)
+        except Exception:
+            pass
@@ -0,0 +1,48 @@
+"""Tiny fork/join helper for the scan pipeline.
+
+After detect_labels the remaining work splits into independent branches
+(faces, vehicles/plates, snapshot preparation) that only depend on the label
+result. They are mostly waiting on AWS round-trips, so running them on threads
+makes a scan cost max(branch) instead of sum(branch).
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import logging
+from typing import Any, Callable, Dict, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def run_branches(
+    branches: Dict[str, Optional[Callable[[], Any]]],
+    *,
+    thread_name_prefix: str = "afr_stage",
+) -> Dict[str, Any]:
+    """Run independent branches concurrently and join them.
+
+    - `None` branches are skipped (their result is None)
+    - a single branch runs inline on the calling thread
+    - a failing branch is logged and yields None; the others are unaffected
+    """
+    active = {name: fn for name, fn in branches.items() if fn is not None}
+    results: Dict[str, Any] = {name: None for name in branches}
+
+    def _guard(name: str, fn: Callable[[], Any]) -> Any:
+        try:
+            return fn()
+        except Exception as e:
+            _LOGGER.error("scan stage '%s' failed: %s", name, e)
+            return None
+
+    if len(active) <= 1:
+        for name, fn in active.items():
+            results[name] = _guard(name, fn)
+        return results
+
+    with ThreadPoolExecutor(max_workers=len(active), thread_name_prefix=thread_name_prefix) as pool:
+        futures = {name: pool.submit(_guard, name, fn) for name, fn in active.items()}
+        for name, fut in futures.items():
+            results[name] = fut.result()
+    return results
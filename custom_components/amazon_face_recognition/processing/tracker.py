@@ -0,0 +1,175 @@
+"""Lightweight per-camera object tracker (persons / vehicles).
+
+Scans are otherwise stateless: the same car parked in the driveway is a brand
+new object on every scan. The tracker gives person and vehicle boxes a stable
+track id across consecutive scans of the same camera:
+
+- detections are matched to live tracks greedily by IoU (>= IOU_MIN)
+- unmatched ones fall back to the closest centroid (<= CENTROID_MAX_DIST)
+- remaining detections open new tracks
+- tracks not seen for MAX_MISSED scans or `max_age` seconds are dropped
+
+A track may carry an identity (recognized face name, plate) together with its
+confidence; the processor reuses it instead of paying AWS again while the track
+stays alive and the identity is confident and recent enough.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import threading
+import time
+from typing import Dict, List, Optional
+
+IOU_MIN = 0.3
+CENTROID_MAX_DIST = 0.08
+MAX_MISSED = 2
+
+
+def _iou(a: dict, b: dict) -> float:
+    ix = min(float(a["x_max"]), float(b["x_max"])) - max(float(a["x_min"]), float(b["x_min"]))
+    iy = min(float(a["y_max"]), float(b["y_max"])) - max(float(a["y_min"]), float(b["y_min"]))
+    if ix <= 0 or iy <= 0:
+        return 0.0
+    inter = ix * iy
+    area_a = (float(a["x_max"]) - float(a["x_min"])) * (float(a["y_max"]) - float(a["y_min"]))
+    area_b = (float(b["x_max"]) - float(b["x_min"])) * (float(b["y_max"]) - float(b["y_min"]))
+    union = area_a + area_b - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _centroid_dist(a: dict, b: dict) -> float:
+    ax = (float(a["x_min"]) + float(a["x_max"])) / 2.0
+    ay = (float(a["y_min"]) + float(a["y_max"])) / 2.0
+    bx = (float(b["x_min"]) + float(b["x_max"])) / 2.0
+    by = (float(b["y_min"]) + float(b["y_max"])) / 2.0
+    return ((ax - bx) ** 2 + (ay - by) ** 2) ** 0.5
+
+
+@dataclass(slots=True)
+class AFRTrack:
+    track_id: str
+    kind: str
+    box: dict
+    first_seen: float
+    last_seen: float
+    hits: int = 1
+    missed: int = 0
+
+    # resolved identity (e.g. {"name": ..} or {"plate": ..}) + confidence (0..100)
+    identity: Optional[dict] = None
+    identity_confidence: float = 0.0
+    identity_at: float = 0.0
+
+    @property
+    def is_new(self) -> bool:
+        return self.hits <= 1
+
+    def confident_identity(self, min_confidence: float, max_age: float) -> Optional[dict]:
+        """Identity worth reusing (None -> the caller must ask AWS again)."""
+        if not self.identity or min_confidence <= 0:
+            return None
+        if self.identity_confidence < min_confidence:
+            return None
+        if max_age > 0 and (time.monotonic() - self.identity_at) > max_age:
+            return None
+        return self.identity
+
+
+@dataclass(slots=True)
+class _CameraTracks:
+    tracks: Dict[str, AFRTrack] = field(default_factory=dict)
+    next_id: int = 1
+
+
+class AFRObjectTracker:
+    """IoU + centroid tracker, one independent track set per camera."""
+
+    def __init__(self, max_age: float = 120.0) -> None:
+        self._lock = threading.Lock()
+        self._cameras: Dict[str, _CameraTracks] = {}
+        self.max_age = float(max_age)
+
+    def update(self, camera_entity: str, kind: str, boxes: List[dict]) -> List[AFRTrack]:
+        """Match this scan's boxes of one kind; returns one track per box (same order)."""
+        now = time.monotonic()
+        with self._lock:
+            cam = self._cameras.setdefault(camera_entity, _CameraTracks())
+            live = [t for t in cam.tracks.values() if t.kind == kind]
+
+            assigned: Dict[int, AFRTrack] = {}
+            used: set[str] = set()
+
+            # 1) greedy IoU matching (best pairs first)
+            pairs = []
+            for i, box in enumerate(boxes):
+                for t in live:
+                    iou = _iou(box, t.box)
+                    if iou >= IOU_MIN:
+                        pairs.append((iou, i, t))
+            for _iou_v, i, t in sorted(pairs, key=lambda p: p[0], reverse=True):
+                if i in assigned or t.track_id in used:
+                    continue
+                assigned[i] = t
+                used.add(t.track_id)
+
+            # 2) centroid fallback for the leftovers
+            for i, box in enumerate(boxes):
+                if i in assigned:
+                    continue
+                best = None
+                for t in live:
+                    if t.track_id in used:
+                        continue
+                    d = _centroid_dist(box, t.box)
+                    if d <= CENTROID_MAX_DIST and (best is None or d < best[0]):
+                        best = (d, t)
+                if best is not None:
+                    assigned[i] = best[1]
+                    used.add(best[1].track_id)
+
+            out: List[AFRTrack] = []
+            for i, box in enumerate(boxes):
+                t = assigned.get(i)
+                if t is None:
+                    t = AFRTrack(
+                        track_id=f"{kind}-{cam.next_id}",
+                        kind=kind,
+                        box=dict(box),
+                        first_seen=now,
+                        last_seen=now,
+                    )
+                    cam.next_id += 1
+                    cam.tracks[t.track_id] = t
+                else:
+                    t.box = dict(box)
+                    t.last_seen = now
+                    t.hits += 1
+                    t.missed = 0
+                out.append(t)
+
+            # age tracks of this kind that were not seen in this scan
+            for t in live:
+                if t.track_id in used:
+                    continue
+                t.missed += 1
+                if t.missed > MAX_MISSED or (self.max_age > 0 and now - t.last_seen > self.max_age):
+                    cam.tracks.pop(t.track_id, None)
+
+            return out
+
+    def set_identity(self, track: AFRTrack, identity: dict, confidence: float) -> None:
+        with self._lock:
+            # never downgrade a confident identity with a weaker read
+            if track.identity and track.identity != identity and float(confidence) < track.identity_confidence:
+                return
+            track.identity = dict(identity)
+            track.identity_confidence = float(confidence)
+            track.identity_at = time.monotonic()
+
+    def forget(self, camera_entity: Optional[str] = None) -> None:
+        with self._lock:
+            if camera_entity is None:
+                self._cameras.clear()
+            else:
+                self._cameras.pop(camera_entity, None)
@@ -0,0 +1,96 @@
+"""Ordered write-behind for scan artifacts.
+
+The scan result (sensors, card, automations) is published as soon as
+recognition completes; snapshot encode, index update, retention and the
+optional S3 upload run afterwards on ONE background thread, in submission
+order (so index / retention updates never interleave).
+
+Every write goes through the writer thread, also when write-behind is off
+(the scan then waits for its own job), so ordering never depends on the mode.
+Backpressure: when MAX_PENDING jobs are already queued (slow disk / network),
+`submit` blocks the scan until a slot frees up ("blocked" in stats).
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+MAX_PENDING = 8
+
+
+class AFRWriteBehind:
+    """Single-thread FIFO writer (created lazily, restarted after shutdown)."""
+
+    def __init__(self, on_done: Optional[Callable[[Dict[str, float]], None]] = None) -> None:
+        self._on_done = on_done
+        self._lock = threading.Lock()
+        self._slot_free = threading.Condition(self._lock)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._last: Optional[Future] = None
+        self._stats: Dict[str, float] = {"written": 0, "failed": 0, "blocked": 0, "max_lag_ms": 0.0}
+
+    def submit(self, job: Callable[[], Any]) -> Future:
+        """Queue `job` (FIFO); blocks while the backlog is full. The future holds job's result."""
+        queued_at = time.monotonic()
+
+        def _run() -> Any:
+            lag_ms = (time.monotonic() - queued_at) * 1000.0
+            ok = False
+            try:
+                result = job()
+                ok = True
+                return result
+            except Exception as e:
+                _LOGGER.error("write-behind job failed: %s", e)
+                raise
+            finally:
+                with self._lock:
+                    self._pending -= 1
+                    self._stats["written" if ok else "failed"] += 1
+                    self._stats["max_lag_ms"] = max(self._stats["max_lag_ms"], round(lag_ms, 1))
+                    self._slot_free.notify()
+                if self._on_done is not None:
+                    try:
+                        self._on_done(self.stats())
+                    except Exception:
+                        pass
+
+        with self._lock:
+            if self._pending >= MAX_PENDING:
+                self._stats["blocked"] += 1
+                while self._pending >= MAX_PENDING:
+                    self._slot_free.wait()
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="afr_writer")
+            self._pending += 1
+            self._last = self._executor.submit(_run)
+            return self._last
+
+    def flush(self, timeout: Optional[float] = 30.0) -> None:
+        """Block until every queued job has run (FIFO: waiting on the last one is enough)."""
+        with self._lock:
+            last = self._last
+        if last is None:
+            return
+        try:
+            last.result(timeout=timeout)
+        except Exception as e:
+            _LOGGER.warning("write-behind flush: %s", e)
+
+    def shutdown(self) -> None:
+        self.flush()
+        with self._lock:
+            executor, self._executor, self._last = self._executor, None, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {**self._stats, "pending": self._pending}
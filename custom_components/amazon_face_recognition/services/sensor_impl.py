@@ -326,6 +326,13 @@ class AFRSensor(SensorEntity):
             current_month_scans = int(usage.get("scans_month") or 0)
             last_month_scans = int(usage.get("last_month_scans") or 0)
 
+            # frame gate: scans answered from the previous result (no AWS call)
+            current_month_gate_skips = int(usage.get("gate_skips_month") or 0)
+            last_month_gate_skips = int(usage.get("last_month_gate_skips") or 0)
+            gate_skip_ratio = (
+                round(current_month_gate_skips / current_month_scans, 4) if current_month_scans else 0.0
+            )
+
             aws_api_cost = 0.0
             proc = self._get_processor()
             if proc is not None:
@@ -342,11 +349,49 @@ class AFRSensor(SensorEntity):
                 return attrs
 
 
+            # scan admission counters (latest-wins queue), summed over cameras
+            queue_totals = {"requested": 0, "processed": 0, "coalesced": 0, "dropped": 0}
+            for cam_stats in (data.get("scan_queue_stats") or {}).values():
+                if isinstance(cam_stats, dict):
+                    for qk in queue_totals:
+                        queue_totals[qk] += int(cam_stats.get(qk) or 0)
+
+            # face identity cache (search_faces_by_image avoided)
+            face_cache = data.get("face_cache_stats") or {}
+            face_cache_hits = int(face_cache.get("hits") or 0)
+            face_cache_misses = int(face_cache.get("misses") or 0)
+            face_cache_lookups = face_cache_hits + face_cache_misses
+
+            # plate read cache (detect_text avoided)
+            plate_cache = data.get("plate_cache_stats") or {}
+
             return {
                 "month": usage.get("month"),
+                "face_cache_hits": face_cache_hits,
+                "face_cache_misses": face_cache_misses,
+                "face_cache_hit_ratio": round(face_cache_hits / face_cache_lookups, 4) if face_cache_lookups else 0.0,
+                "face_cache_invalidations": int(face_cache.get("invalidations") or 0),
+                "plate_cache_hits": int(plate_cache.get("hits") or 0),
+                "plate_cache_misses": int(plate_cache.get("misses") or 0),
+                # bytes sent to AWS per operation since startup: {op: {calls, bytes, last_bytes, max_bytes}}
+                "payload_bytes": dict(data.get("payload_stats") or {}),
+                # AWS calls avoided by the call planner since startup
+                "planner_calls_saved": int((data.get("planner_stats") or {}).get("calls_saved") or 0),
+                # lazy_render: annotated snapshots currently in the render cache
+                "render_cache_files": int((data.get("render_cache_stats") or {}).get("rendered") or 0),
+                # write-behind: snapshot writes queued / worst queue wait since startup
+                "snapshot_writes_pending": int((data.get("write_behind_stats") or {}).get("pending") or 0),
+                "snapshot_write_max_lag_ms": float((data.get("write_behind_stats") or {}).get("max_lag_ms") or 0.0),
+                "scan_requests": queue_totals["requested"],
+                "scan_requests_processed": queue_totals["processed"],
+                "scan_requests_coalesced": queue_totals["coalesced"],
+                "scan_requests_dropped": queue_totals["dropped"],
                 "last_month_scans": last_month_scans,
                 "current_month_scans": current_month_scans,
                 "current_month_api_call": current_month_api_call,
+                "current_month_gate_skips": current_month_gate_skips,
+                "last_month_gate_skips": last_month_gate_skips,
+                "gate_skip_ratio": gate_skip_ratio,
                 "last_month_api_call": last_month_api_call,
                 "aws_api_cost": aws_api_cost,
                 "current_month_cost": f"{current_month_cost:.2f}$",
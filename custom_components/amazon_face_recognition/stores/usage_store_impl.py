@@ -21,6 +21,8 @@ DEFAULT_USAGE: dict[str, Any] = {
     "aws_calls_month": 0,
     "last_month_scans": 0,
     "last_month_api_calls": 0,
+    "gate_skips_month": 0,
+    "last_month_gate_skips": 0,
 }
 
 
@@ -33,8 +35,10 @@ def _rollover_if_needed(usage: dict[str, Any]) -> None:
     if usage.get("month") != cur:
         usage["last_month_scans"] = int(usage.get("scans_month") or 0)
         usage["last_month_api_calls"] = int(usage.get("aws_calls_month") or 0)
+        usage["last_month_gate_skips"] = int(usage.get("gate_skips_month") or 0)
         usage["scans_month"] = 0
         usage["aws_calls_month"] = 0
+        usage["gate_skips_month"] = 0
         usage["month"] = cur
 
 
@@ -75,7 +79,7 @@ class AFRUsageStore:
 
         self._save_cancel = async_call_later(self.hass, 2.0, _do_save)
 
-    def increment(self, scans_delta: int = 0, aws_calls_delta: int = 0) -> None:
+    def increment(self, scans_delta: int = 0, aws_calls_delta: int = 0, gate_skips_delta: int = 0) -> None:
         data = self.hass.data.setdefault(DOMAIN, {})
         usage = data.setdefault("usage", dict(DEFAULT_USAGE))
 
@@ -83,5 +87,6 @@ class AFRUsageStore:
 
         usage["scans_month"] = int(usage.get("scans_month") or 0) + int(scans_delta or 0)
         usage["aws_calls_month"] = int(usage.get("aws_calls_month") or 0) + int(aws_calls_delta or 0)
+        usage["gate_skips_month"] = int(usage.get("gate_skips_month") or 0) + int(gate_skips_delta or 0)
 
         self.schedule_save()